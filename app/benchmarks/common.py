@@ -0,0 +1,53 @@
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+def load_cases(path: str) -> List[Dict[str, Any]]:
+    """
+    Loads benchmark cases from a JSON file holding a list of
+    {"query": str, "docs": [str, ...]} objects.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        cases = json.load(file)
+
+    if not isinstance(cases, list) or not all('query' in case and 'docs' in case for case in cases):
+        raise ValueError("Benchmark data must be a list of {'query': ..., 'docs': [...]} objects.")
+    return cases
+
+def timed(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, float]:
+    """
+    Calls a function and returns its result with the elapsed time in milliseconds.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+def latency_summary(samples_ms: Sequence[float]) -> str:
+    """
+    Formats mean/p50/p95 of a list of latencies in milliseconds.
+    """
+    ordered = sorted(samples_ms)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return f"mean={statistics.fmean(ordered):.1f}ms p50={statistics.median(ordered):.1f}ms p95={p95:.1f}ms"
+
+def ranking_agreement(reference: Sequence[Hashable], candidate: Sequence[Hashable], k: int) -> Dict[str, float]:
+    """
+    Compares two rankings of the same items.
+
+    Returns:
+        'top_k_overlap': fraction of the reference top-k also in the candidate top-k.
+        'spearman': Spearman rank correlation over the items present in both rankings.
+    """
+    top_k_overlap = len(set(reference[:k]) & set(candidate[:k])) / max(1, min(k, len(reference)))
+
+    common = [item for item in reference if item in set(candidate)]
+    if len(common) < 2:
+        return {'top_k_overlap': top_k_overlap, 'spearman': 1.0}
+
+    candidate_order = [item for item in candidate if item in set(common)]
+    candidate_rank = {item: rank for rank, item in enumerate(candidate_order)}
+    n = len(common)
+    squared_diffs = sum((rank - candidate_rank[item]) ** 2 for rank, item in enumerate(common))
+    spearman = 1 - 6 * squared_diffs / (n * (n * n - 1))
+    return {'top_k_overlap': top_k_overlap, 'spearman': spearman}
@@ -0,0 +1,180 @@
+"""
+A stand-in Ollama server that plays the role of several hosts at once.
+
+Every port serves its own fake host implementing the parts of the Ollama
+API the app uses: /api/chat (streamed and not), /api/tags and
+/api/version. A host serves only `--slots` requests at a time, like a
+single CPU box running one model, and answers with canned text at a fixed
+rate. Hosts listed in `--failing-ports` answer every chat request with
+HTTP 500, which exercises the client's failover; a host that should be
+down is simply not started.
+
+Each host also mimics how Ollama spends time before the first word:
+- the model is loaded on the first request, again once `keep_alive` has
+  expired, and again whenever `num_ctx` changes (`load_duration`);
+- the prompt is evaluated at `--prompt-tokens-per-second`, except for the
+  prefix it shares with the previous prompt, which is reused
+  (`prompt_eval_count` and `prompt_eval_duration`).
+Tokens are approximated as four characters.
+
+Run from the `app` directory:
+    python -m benchmarks.fake_ollama --ports 11501 11502 11503 --words-per-second 50
+
+and point the app at it with
+    LLM_HOSTS=http://127.0.0.1:11501,http://127.0.0.1:11502,http://127.0.0.1:11503
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = (
+    "This is a canned answer from a stand-in Ollama host. It has no model behind it, "
+    "so it repeats the same words whatever the question was."
+)
+CHARS_PER_TOKEN = 4
+OLLAMA_DEFAULT_KEEP_ALIVE = 300.0
+OLLAMA_DEFAULT_NUM_CTX = 2048
+DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+def keep_alive_seconds(keep_alive: Any) -> float:
+    """
+    Parses an Ollama keep_alive value (seconds, or a duration such as '30m'). Negative means forever.
+    """
+    if keep_alive is None:
+        return OLLAMA_DEFAULT_KEEP_ALIVE
+    if isinstance(keep_alive, (int, float)):
+        seconds = float(keep_alive)
+    else:
+        match = re.fullmatch(r"(-?\d+(?:\.\d+)?)(ms|s|m|h)", keep_alive.strip())
+        if match is None:
+            return OLLAMA_DEFAULT_KEEP_ALIVE
+        seconds = float(match.group(1)) * DURATION_UNITS[match.group(2)]
+    return float('inf') if seconds < 0 else seconds
+
+def render_prompt(body: Dict[str, Any]) -> str:
+    """
+    Flattens the messages and tools of a chat request the way a chat template would.
+    """
+    tools = json.dumps(body['tools']) if body.get('tools') else ''
+    return tools + ''.join(f"<|{message.get('role')}|>{message.get('content') or ''}" for message in body.get('messages') or [])
+
+def build_app(args: argparse.Namespace, port: int) -> FastAPI:
+    """
+    Builds the FastAPI app of one fake host.
+    """
+    app = FastAPI()
+    semaphore = asyncio.Semaphore(args.slots)
+    failing = port in args.failing_ports
+    words = (REPLY.split() * (args.reply_words // len(REPLY.split()) + 1))[:args.reply_words]
+    reply = [f"[{port}]"] + words
+    model_state: Dict[str, Any] = {'loaded_until': 0.0, 'num_ctx': None, 'prompt': ''}
+
+    async def prepare(body: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Loads the model if needed and evaluates the uncached part of the prompt.
+        """
+        num_ctx = (body.get('options') or {}).get('num_ctx') or OLLAMA_DEFAULT_NUM_CTX
+        load_seconds = 0.0
+        if time.monotonic() >= model_state['loaded_until'] or num_ctx != model_state['num_ctx']:
+            load_seconds = args.load_seconds
+            model_state.update(num_ctx=num_ctx, prompt='')
+            await asyncio.sleep(load_seconds)
+
+        prompt = render_prompt(body)[-num_ctx * CHARS_PER_TOKEN:]
+        cached = len(os.path.commonprefix([prompt, model_state['prompt']]))
+        evaluated = (len(prompt) - cached) // CHARS_PER_TOKEN
+        prompt_seconds = evaluated / args.prompt_tokens_per_second
+        await asyncio.sleep(prompt_seconds)
+        model_state['prompt'] = prompt
+        model_state['loaded_until'] = time.monotonic() + keep_alive_seconds(body.get('keep_alive'))
+        return {
+            'load_duration': int(load_seconds * 1e9),
+            'prompt_eval_count': evaluated,
+            'prompt_eval_duration': int(prompt_seconds * 1e9),
+        }
+
+    def chunk(model: str, content: str, done: bool, timings: Optional[Dict[str, int]] = None, done_reason: str = 'stop') -> Dict[str, Any]:
+        message = {
+            'model': model,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'message': {'role': 'assistant', 'content': content},
+            'done': done,
+        }
+        if done:
+            message.update({'done_reason': done_reason, 'eval_count': len(reply), **(timings or {})})
+        return message
+
+    async def generate() -> AsyncIterator[str]:
+        for word in reply:
+            if args.words_per_second > 0:
+                await asyncio.sleep(1 / args.words_per_second)
+            yield word + ' '
+
+    @app.get('/api/version')
+    async def version():
+        return {'version': '0.0.0-fake'}
+
+    @app.get('/api/tags')
+    async def tags():
+        return {'models': [{'name': 'llama3.2:latest', 'model': 'llama3.2:latest', 'size': 0, 'digest': 'fake'}]}
+
+    @app.post('/api/chat')
+    async def chat(request: Request):
+        body = await request.json()
+        model = body.get('model', 'llama3.2')
+        if failing:
+            return JSONResponse(status_code=500, content={'error': f'fake host {port} is failing'})
+
+        if not body.get('messages'):
+            async with semaphore:
+                timings = await prepare(body)
+            return chunk(model, '', done=True, timings=timings, done_reason='load')
+
+        if not body.get('stream', True):
+            async with semaphore:
+                timings = await prepare(body)
+                content = ''.join([piece async for piece in generate()])
+            return chunk(model, content.strip(), done=True, timings=timings)
+
+        async def lines() -> AsyncIterator[str]:
+            async with semaphore:
+                timings = await prepare(body)
+                async for piece in generate():
+                    yield json.dumps(chunk(model, piece, done=False)) + '\n'
+            yield json.dumps(chunk(model, '', done=True, timings=timings)) + '\n'
+
+        return StreamingResponse(lines(), media_type='application/x-ndjson')
+
+    return app
+
+async def serve(args: argparse.Namespace) -> None:
+    servers: List[uvicorn.Server] = [
+        uvicorn.Server(uvicorn.Config(build_app(args, port), host=args.host, port=port, log_level='warning'))
+        for port in args.ports
+    ]
+    print(f"{time.strftime('%H:%M:%S')} serving fake Ollama hosts on {args.host}:{args.ports} (failing: {args.failing_ports})")
+    await asyncio.gather(*(server.serve() for server in servers))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind")
+    parser.add_argument('--ports', type=int, nargs='+', default=[11501, 11502, 11503], help="One fake host per port")
+    parser.add_argument('--failing-ports', type=int, nargs='*', default=[], help="Ports whose chat requests fail with HTTP 500")
+    parser.add_argument('--slots', type=int, default=1, help="Requests a host serves at a time; they share one prompt cache")
+    parser.add_argument('--load-seconds', type=float, default=2.0, help="Time to load the model")
+    parser.add_argument('--prompt-tokens-per-second', type=float, default=2000.0, help="Prompt evaluation speed")
+    parser.add_argument('--words-per-second', type=float, default=50.0, help="Generation speed; 0 answers instantly")
+    parser.add_argument('--reply-words', type=int, default=40, help="Words per reply")
+    asyncio.run(serve(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
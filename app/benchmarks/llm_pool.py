@@ -0,0 +1,65 @@
+"""
+Measures LLM throughput of a pool of Ollama hosts.
+
+Sends `--requests` chat requests, `--concurrency` at a time, through
+LLMClient and reports the request latency, the overall throughput and how
+the requests were spread across the hosts. Running it once with a single
+host and once with several shows how throughput scales with the pool.
+
+Run from the `app` directory, for example against the stand-in hosts of
+`benchmarks.fake_ollama`:
+    python -m benchmarks.llm_pool --hosts http://127.0.0.1:11501
+    python -m benchmarks.llm_pool --hosts http://127.0.0.1:11501 http://127.0.0.1:11502 http://127.0.0.1:11503
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from benchmarks.common import latency_summary
+from utils.llm_client import LLMClient
+
+async def timed_chat(client: LLMClient, semaphore: asyncio.Semaphore, index: int, stream: bool) -> float:
+    messages = [{'role': 'user', 'content': f"Benchmark request {index}: say something."}]
+    async with semaphore:
+        start = time.perf_counter()
+        if stream:
+            async for _ in client.stream_content(messages=messages):
+                pass
+        else:
+            await client.chat(messages=messages)
+        return (time.perf_counter() - start) * 1000
+
+async def run(args: argparse.Namespace) -> None:
+    client = LLMClient(
+        hosts=args.hosts,
+        model_name=args.model,
+        max_concurrency_per_host=args.max_concurrency_per_host,
+        health_check_interval=0,
+    )
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    start = time.perf_counter()
+    latencies: List[float] = await asyncio.gather(
+        *(timed_chat(client, semaphore, index, args.stream) for index in range(args.requests))
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"hosts={len(args.hosts)} requests={args.requests} concurrency={args.concurrency} stream={args.stream}")
+    print(f"latency: {latency_summary(latencies)}")
+    print(f"throughput: {args.requests / elapsed:.2f} requests/s over {elapsed:.1f}s")
+    for status in client.status():
+        print(f"  {status['host']}: requests={status['requests']} failures={status['failures']} healthy={status['healthy']}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', nargs='+', required=True, help="Ollama host URLs")
+    parser.add_argument('--model', default='llama3.2', help="Ollama model to call")
+    parser.add_argument('--requests', type=int, default=60, help="Number of chat requests")
+    parser.add_argument('--concurrency', type=int, default=12, help="Requests in flight at a time")
+    parser.add_argument('--max-concurrency-per-host', type=int, default=1, help="Requests sent to one host at a time")
+    parser.add_argument('--stream', action='store_true', help="Stream the responses")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures the prefill cost of DocSummarizer calls under two prompt layouts.
+
+- document-first: the document is pasted ahead of the instructions in a
+  single user message, so consecutive prompts differ from their first
+  token and nothing can be reused.
+- system-prefix: the instructions are a fixed system message and the
+  document comes last, which is the layout DocSummarizer uses. The
+  instructions are evaluated once and reused by later calls.
+
+For every call it reports Ollama's `prompt_eval_duration` (time spent
+evaluating the prompt), `prompt_eval_count` and `load_duration`. The model
+is loaded with LLMClient.warm_up before the first call unless
+`--no-warm-up` is given, and every call uses the client's `keep_alive`
+and `num_ctx`.
+
+Run from the `app` directory with Ollama serving the model, or against
+`benchmarks.fake_ollama`:
+    python -m benchmarks.prompt_prefill --data cases.json --host http://127.0.0.1:11434
+
+The data file holds a list of {"query": str, "docs": [str, ...]} objects,
+for example pages collected with `scrape_web`; the queries are not used.
+"""
+import argparse
+import asyncio
+import statistics
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import load_cases
+from utils.llm_client import LLMClient
+from utils.summary.gen_summary import EXTRACTIVE_SYSTEM_PROMPT, DocSummarizer
+
+def document_first(summarizer: DocSummarizer, document: str) -> List[Dict[str, str]]:
+    return [{'role': 'user', 'content': f"{summarizer._construct_prompt(document)}\n\n{EXTRACTIVE_SYSTEM_PROMPT}"}]
+
+def system_prefix(summarizer: DocSummarizer, document: str) -> List[Dict[str, str]]:
+    return [
+        {'role': 'system', 'content': EXTRACTIVE_SYSTEM_PROMPT},
+        {'role': 'user', 'content': summarizer._construct_prompt(document)},
+    ]
+
+LAYOUTS: Dict[str, Callable[[DocSummarizer, str], List[Dict[str, str]]]] = {
+    'document-first': document_first,
+    'system-prefix': system_prefix,
+}
+
+async def run_layout(args: argparse.Namespace, layout: str, documents: List[str]) -> Dict[str, List[float]]:
+    client = LLMClient(hosts=[args.host], model_name=args.model, health_check_interval=0, num_ctx=args.num_ctx)
+    summarizer = DocSummarizer(model_name=args.model, use_cache=False)
+    if not args.no_warm_up:
+        await client.warm_up()
+
+    samples: Dict[str, List[float]] = {'prefill_ms': [], 'prompt_tokens': [], 'load_ms': []}
+    for document in documents:
+        response: Any = await client.chat(
+            messages=LAYOUTS[layout](summarizer, document),
+            options={'temperature': 0.1, 'num_predict': args.num_predict},
+        )
+        samples['prefill_ms'].append((response.get('prompt_eval_duration') or 0) / 1e6)
+        samples['prompt_tokens'].append(response.get('prompt_eval_count') or 0)
+        samples['load_ms'].append((response.get('load_duration') or 0) / 1e6)
+    return samples
+
+async def run(args: argparse.Namespace) -> None:
+    documents = [doc[:args.max_chars] for case in load_cases(args.data) for doc in case['docs'] if doc.strip()]
+    print(f"documents={len(documents)} model={args.model} num_ctx={args.num_ctx} warm_up={not args.no_warm_up}")
+    for layout in LAYOUTS:
+        samples = await run_layout(args, layout, documents)
+        print(
+            f"{layout:>15}: prefill mean={statistics.fmean(samples['prefill_ms']):.1f}ms "
+            f"p50={statistics.median(samples['prefill_ms']):.1f}ms "
+            f"evaluated tokens={statistics.fmean(samples['prompt_tokens']):.0f}/call "
+            f"load total={sum(samples['load_ms']):.0f}ms"
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', required=True, help="JSON file with benchmark cases")
+    parser.add_argument('--host', default=None, help="Ollama host URL; defaults to OLLAMA_HOST or the ollama default")
+    parser.add_argument('--model', default='llama3.2', help="Ollama model to call")
+    parser.add_argument('--num-ctx', type=int, default=8192, help="Context window of every call")
+    parser.add_argument('--num-predict', type=int, default=8, help="Tokens generated per call; prefill is what is measured")
+    parser.add_argument('--max-chars', type=int, default=6000, help="Characters of each document sent")
+    parser.add_argument('--no-warm-up', action='store_true', help="Do not load the model before the first call")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
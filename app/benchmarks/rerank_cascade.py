@@ -0,0 +1,60 @@
+"""
+Compares DocReranker's cascade mode against the full fusion mode.
+
+Reports per-query rerank latency for both modes and how closely the cascade
+ranking of the documents agrees with the fusion ranking.
+
+Run from the `app` directory:
+    python -m benchmarks.rerank_cascade --data cases.json --top-k 5
+
+The data file holds a list of {"query": str, "docs": [str, ...]} objects,
+for example pages collected with `scrape_web`.
+"""
+import argparse
+import statistics
+
+from benchmarks.common import latency_summary, load_cases, ranking_agreement, timed
+from utils.doc_reranker import DEFAULT_MODEL_NAMES, DocReranker
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', required=True, help="JSON file with benchmark cases")
+    parser.add_argument('--top-k', type=int, default=5, help="Documents rescored by the heavy model")
+    parser.add_argument('--threshold', type=float, default=None, help="Cheap-model cut threshold")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case and mode")
+    parser.add_argument('--models', nargs='+', default=DEFAULT_MODEL_NAMES, help="CrossEncoders, heaviest first")
+    args = parser.parse_args()
+
+    cases = load_cases(args.data)
+    reranker = DocReranker(
+        model_names=args.models,
+        cascade_top_k=args.top_k,
+        cascade_threshold=args.threshold,
+    )
+
+    latencies = {'fusion': [], 'cascade': []}
+    overlaps, spearmans = [], []
+    for case in cases:
+        rankings = {}
+        for mode in latencies:
+            reranker.mode = mode
+            reranker.rerank_with_indices(case['query'], case['docs'])
+            for _ in range(args.repeat):
+                results, elapsed_ms = timed(reranker.rerank_with_indices, case['query'], case['docs'])
+                latencies[mode].append(elapsed_ms)
+            # Documents are compared by index: the condensed text of a document differs between modes.
+            rankings[mode] = [doc_index for doc_index, _, _ in results]
+
+        agreement = ranking_agreement(rankings['fusion'], rankings['cascade'], args.top_k)
+        overlaps.append(agreement['top_k_overlap'])
+        spearmans.append(agreement['spearman'])
+
+    print(f"cases={len(cases)} top_k={args.top_k} threshold={args.threshold}")
+    for mode, samples in latencies.items():
+        print(f"{mode:>8}: {latency_summary(samples)}")
+    speedup = statistics.fmean(latencies['fusion']) / statistics.fmean(latencies['cascade'])
+    print(f" speedup: {speedup:.2f}x")
+    print(f"agreement: top-{args.top_k} overlap={statistics.fmean(overlaps):.3f} spearman={statistics.fmean(spearmans):.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Checks that the ONNX Runtime CrossEncoders agree with the PyTorch ones and
+compares their throughput.
+
+For every model the torch CrossEncoder, the fp32 ONNX export and the int8
+quantized export score the same (query, document) pairs. The script reports
+the largest score difference, ranking agreement per query and pairs scored
+per second, and exits with status 1 if a backend falls outside the parity
+tolerances.
+
+Run from the `app` directory:
+    python -m benchmarks.rerank_onnx --data cases.json
+
+The data file holds a list of {"query": str, "docs": [str, ...]} objects,
+for example pages collected with `scrape_web`. A quick parity check that
+needs no data or downloads runs with the test suite:
+    python -m pytest tests/test_onnx_cross_encoder.py
+"""
+import argparse
+import statistics
+import sys
+
+import numpy as np
+from sentence_transformers import CrossEncoder
+
+from benchmarks.common import load_cases, ranking_agreement, timed
+from utils.doc_reranker import DEFAULT_MODEL_NAMES
+from utils.onnx_cross_encoder import OnnxCrossEncoder
+
+def score_cases(model, cases, batch_size):
+    return [
+        np.asarray(model.predict([(case['query'], doc) for doc in case['docs']], batch_size=batch_size, show_progress_bar=False))
+        for case in cases
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', required=True, help="JSON file with benchmark cases")
+    parser.add_argument('--models', nargs='+', default=DEFAULT_MODEL_NAMES, help="CrossEncoders to compare")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per backend")
+    parser.add_argument('--top-k', type=int, default=5, help="Cut-off for the top-k overlap")
+    parser.add_argument('--fp32-tolerance', type=float, default=1e-3, help="Maximum score difference for fp32 ONNX")
+    parser.add_argument('--min-spearman', type=float, default=0.9, help="Minimum mean Spearman for int8 ONNX")
+    args = parser.parse_args()
+
+    cases = load_cases(args.data)
+    num_pairs = sum(len(case['docs']) for case in cases)
+    failed = False
+
+    for model_name in args.models:
+        backends = {
+            'torch': CrossEncoder(model_name),
+            'onnx-fp32': OnnxCrossEncoder(model_name, quantize=False),
+            'onnx-int8': OnnxCrossEncoder(model_name, quantize=True),
+        }
+
+        print(f"\n{model_name} ({num_pairs} pairs)")
+        reference = None
+        for backend_name, model in backends.items():
+            scores = score_cases(model, cases, args.batch_size)
+            elapsed = [timed(score_cases, model, cases, args.batch_size)[1] for _ in range(args.repeat)]
+            throughput = num_pairs / (statistics.median(elapsed) / 1000)
+
+            if reference is None:
+                reference = scores
+                print(f"{backend_name:>10}: {throughput:8.1f} pairs/s")
+                continue
+
+            # Cases without documents have nothing to compare.
+            compared = [(a, b) for a, b in zip(reference, scores) if len(a)]
+            max_diff = max((float(np.max(np.abs(a - b))) for a, b in compared), default=0.0)
+            agreements = [
+                ranking_agreement(list(np.argsort(-a, kind='stable')), list(np.argsort(-b, kind='stable')), args.top_k)
+                for a, b in compared
+            ]
+            spearman = statistics.fmean([agreement['spearman'] for agreement in agreements] or [1.0])
+            overlap = statistics.fmean([agreement['top_k_overlap'] for agreement in agreements] or [1.0])
+            print(
+                f"{backend_name:>10}: {throughput:8.1f} pairs/s  max|diff|={max_diff:.5f}  "
+                f"spearman={spearman:.3f}  top-{args.top_k} overlap={overlap:.3f}"
+            )
+
+            if backend_name == 'onnx-fp32' and max_diff > args.fp32_tolerance:
+                print(f"  PARITY FAILED: fp32 difference above {args.fp32_tolerance}")
+                failed = True
+            if backend_name == 'onnx-int8' and spearman < args.min_spearman:
+                print(f"  PARITY FAILED: int8 Spearman below {args.min_spearman}")
+                failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
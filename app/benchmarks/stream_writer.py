@@ -0,0 +1,86 @@
+"""
+Compares streaming an answer one frame per token with the StreamWriter.
+
+- per-token: every token is sent as its own frame followed by
+  `asyncio.sleep(0.01)`, as the chat endpoint used to do.
+- coalesced: tokens are written to a StreamWriter, which batches them into
+  `token` frames.
+
+The LLM is simulated as a generator emitting `--tokens` tokens at
+`--tokens-per-second`, and the client as a websocket whose every frame
+costs `--frame-ms` milliseconds to send. For each mode it reports the
+frames sent, the total time, and the delay between a token being produced
+and it being sent.
+
+Run from the `app` directory:
+    python -m benchmarks.stream_writer --tokens 800 --tokens-per-second 60
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+from benchmarks.common import latency_summary
+from utils.stream_writer import StreamWriter
+
+class SimulatedWebSocket:
+    """
+    Records frames, taking `frame_seconds` to send each one.
+    """
+
+    def __init__(self, frame_seconds: float):
+        self.frame_seconds = frame_seconds
+        self.frames = 0
+        self.token_delays_ms: List[float] = []
+
+    async def _send(self, tokens: List[Any]) -> None:
+        await asyncio.sleep(self.frame_seconds)
+        self.frames += 1
+        now = time.perf_counter()
+        self.token_delays_ms.extend((now - produced) * 1000 for produced in tokens)
+
+    async def send_text(self, data: str) -> None:
+        await self._send([float(data.rstrip('|').split('@')[1])])
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        await self._send([float(token.split('@')[1]) for token in data.get('content', '').split('|') if token])
+
+async def generate(tokens: int, tokens_per_second: float) -> AsyncIterator[str]:
+    for _ in range(tokens):
+        await asyncio.sleep(1 / tokens_per_second)
+        yield f"tok@{time.perf_counter()}|"
+
+async def per_token(args: argparse.Namespace, websocket: SimulatedWebSocket) -> None:
+    async for token in generate(args.tokens, args.tokens_per_second):
+        await websocket.send_text(token)
+        await asyncio.sleep(0.01)
+    await websocket.send_json({'type': 'stream_end'})
+
+async def coalesced(args: argparse.Namespace, websocket: SimulatedWebSocket) -> None:
+    stream = StreamWriter(websocket, flush_interval=args.flush_interval, flush_bytes=args.flush_bytes)
+    async for token in generate(args.tokens, args.tokens_per_second):
+        await stream.write(token)
+    await stream.end()
+    await stream.drain()
+    await stream.close()
+
+async def run(args: argparse.Namespace) -> None:
+    print(f"tokens={args.tokens} tokens/s={args.tokens_per_second} frame cost={args.frame_ms}ms")
+    for name, mode in (('per-token', per_token), ('coalesced', coalesced)):
+        websocket = SimulatedWebSocket(args.frame_ms / 1000)
+        start = time.perf_counter()
+        await mode(args, websocket)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: frames={websocket.frames} total={elapsed:.2f}s token delay {latency_summary(websocket.token_delays_ms)}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=800, help="Tokens in the simulated answer")
+    parser.add_argument('--tokens-per-second', type=float, default=60, help="Rate at which the simulated LLM emits tokens")
+    parser.add_argument('--frame-ms', type=float, default=1.0, help="Time the client takes to accept one frame")
+    parser.add_argument('--flush-interval', type=float, default=0.05, help="StreamWriter flush interval in seconds")
+    parser.add_argument('--flush-bytes', type=int, default=512, help="StreamWriter flush threshold in bytes")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
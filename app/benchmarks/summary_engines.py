@@ -0,0 +1,93 @@
+"""
+Compares DocSummarizer's extractive engine against the LLM engine.
+
+Reports per-document latency for both engines and, with the LLM summary as
+reference, the ROUGE-1 F1 of the extractive summary. Also reports how much
+of each engine's output is copied verbatim from the page, which is what the
+summarization prompt asks for.
+
+Run from the `app` directory with Ollama serving the summarization model:
+    python -m benchmarks.summary_engines --data cases.json --max-words 300
+
+The data file holds a list of {"query": str, "docs": [str, ...]} objects,
+for example pages collected with `scrape_web`; the queries are not used.
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import time
+from collections import Counter
+from typing import List
+
+from benchmarks.common import latency_summary, load_cases
+from utils.summary.extractive import split_sentences
+from utils.summary.gen_summary import DocSummarizer
+
+def rouge1_f1(reference: str, candidate: str) -> float:
+    """
+    Unigram overlap F1 between two texts.
+    """
+    reference_counts = Counter(re.findall(r"\w+", reference.lower()))
+    candidate_counts = Counter(re.findall(r"\w+", candidate.lower()))
+    overlap = sum((reference_counts & candidate_counts).values())
+    if overlap == 0:
+        return 0.0
+    precision = overlap / sum(candidate_counts.values())
+    recall = overlap / sum(reference_counts.values())
+    return 2 * precision * recall / (precision + recall)
+
+def verbatim_rate(document: str, summary: str) -> float:
+    """
+    Fraction of the summary's sentences that appear verbatim in the document.
+    """
+    normalized_document = ' '.join(document.split())
+    sentences = split_sentences(summary)
+    if not sentences:
+        return 0.0
+    return sum(' '.join(sentence.split()) in normalized_document for sentence in sentences) / len(sentences)
+
+async def timed_summary(summarizer: DocSummarizer, document: str):
+    start = time.perf_counter()
+    summary = await summarizer.summarize(document)
+    return summary, (time.perf_counter() - start) * 1000
+
+async def run(args: argparse.Namespace) -> None:
+    documents: List[str] = [doc for case in load_cases(args.data) for doc in case['docs'] if doc.strip()]
+    engines = {
+        'llm': DocSummarizer(model_name=args.model, engine='llm', use_cache=False),
+        'extractive': DocSummarizer(model_name=args.model, engine='extractive', extractive_max_words=args.max_words),
+    }
+
+    latencies = {name: [] for name in engines}
+    verbatim = {name: [] for name in engines}
+    words = {name: [] for name in engines}
+    rouge = []
+    for document in documents:
+        summaries = {}
+        for name, summarizer in engines.items():
+            summaries[name], elapsed_ms = await timed_summary(summarizer, document)
+            latencies[name].append(elapsed_ms)
+            verbatim[name].append(verbatim_rate(document, summaries[name]))
+            words[name].append(len(summaries[name].split()))
+        rouge.append(rouge1_f1(summaries['llm'], summaries['extractive']))
+
+    print(f"documents={len(documents)} model={args.model} max_words={args.max_words}")
+    for name in engines:
+        print(
+            f"{name:>10}: {latency_summary(latencies[name])} "
+            f"words={statistics.fmean(words[name]):.0f} verbatim={statistics.fmean(verbatim[name]):.3f}"
+        )
+    speedup = statistics.fmean(latencies['llm']) / statistics.fmean(latencies['extractive'])
+    print(f"   speedup: {speedup:.1f}x")
+    print(f"rouge-1 f1 (extractive vs llm): {statistics.fmean(rouge):.3f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', required=True, help="JSON file with benchmark cases")
+    parser.add_argument('--model', default='llama3.2', help="Ollama model of the LLM engine")
+    parser.add_argument('--max-words', type=int, default=300, help="Word budget of extractive summaries")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
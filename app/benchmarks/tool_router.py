@@ -0,0 +1,89 @@
+"""
+Compares the local ToolRouter with the routing LLM call it replaces.
+
+For every query it asks both for a tool, then reports how many queries the
+router decided without the LLM (coverage), how often those decisions match
+the LLM's, and the latency of each.
+
+Run from the `app` directory with Ollama serving the routing model:
+    python -m benchmarks.tool_router --data benchmarks/routing_cases.json
+
+The data file holds a list of {"query": str, "docs": [str, ...]} objects;
+only the queries are used. A query may carry an "expected_tool" field, in
+which case both routers are also scored against it, and the precision of
+the router's own decisions is reported: the number `--min-margin` trades
+against coverage. benchmarks/routing_cases.json is the labelled set the
+default tool_router_min_margin was chosen on.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import latency_summary, load_cases
+from utils.llm_client import LLMClient
+from utils.model_registry import build_embedder
+from utils.tool_router import DEFAULT_MIN_MARGIN, ToolRouter
+
+def load_tools() -> List[Dict[str, Any]]:
+    with open('routes/tools.json', 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+async def llm_route(client: LLMClient, model: str, query: str, tools: List[Dict[str, Any]]) -> Optional[str]:
+    response = await client.chat(model=model, messages=[{'role': 'user', 'content': query}], tools=tools)
+    tool_calls = response['message'].get('tool_calls') or []
+    return tool_calls[0]['function']['name'] if tool_calls else None
+
+async def run(args: argparse.Namespace) -> None:
+    cases: List[Dict[str, Any]] = load_cases(args.data)
+    router = ToolRouter(build_embedder(), min_margin=args.min_margin)
+    client = LLMClient(model_name=args.model, health_check_interval=0)
+    tools = load_tools()
+
+    router_ms, llm_ms = [], []
+    decided = agreed = 0
+    correct = {'router+llm': 0, 'llm': 0}
+    expected_count = labelled_decided = router_correct = 0
+    for case in cases:
+        start = time.perf_counter()
+        decision = router.route(case['query'])
+        router_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        llm_tool = await llm_route(client, args.model, case['query'], tools)
+        llm_ms.append((time.perf_counter() - start) * 1000)
+
+        routed_tool = decision.tool if decision is not None else llm_tool
+        if decision is not None:
+            decided += 1
+            agreed += decision.tool == llm_tool
+        if case.get('expected_tool'):
+            expected_count += 1
+            correct['router+llm'] += routed_tool == case['expected_tool']
+            correct['llm'] += llm_tool == case['expected_tool']
+            if decision is not None:
+                labelled_decided += 1
+                router_correct += decision.tool == case['expected_tool']
+
+    print(f"queries={len(cases)} model={args.model} min_margin={args.min_margin}")
+    print(f"router: {latency_summary(router_ms)} sources={router.stats()}")
+    print(f"   llm: {latency_summary(llm_ms)}")
+    print(f"coverage: {decided / len(cases):.1%} decided without the LLM")
+    if decided:
+        print(f"agreement with the LLM on those: {agreed / decided:.1%}")
+    if expected_count:
+        for name, count in correct.items():
+            print(f"accuracy ({name}): {count / expected_count:.1%} of {expected_count} labelled queries")
+        if labelled_decided:
+            print(f"precision (router decisions): {router_correct / labelled_decided:.1%} of {labelled_decided} labelled queries")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='benchmarks/routing_cases.json', help="JSON file with benchmark cases")
+    parser.add_argument('--model', default='llama3.2', help="Ollama model of the routing call")
+    parser.add_argument('--min-margin', type=float, default=DEFAULT_MIN_MARGIN, help="Similarity lead the router needs to decide")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import uvicorn
 
-from routes import conversation
+from models import init_db
+from routes import conversation, health
+from utils import close_http_client, shutdown_extraction_executor, get_model_registry, get_llm_client, close_llm_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    model_registry = get_model_registry()
+    model_registry.start()
+    get_llm_client().start_health_checks()
+    yield
+    await model_registry.stop()
+    await close_llm_client()
+    await close_http_client()
+    shutdown_extraction_executor()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 app.include_router(conversation.router)
+app.include_router(health.router)
 
 templates = Jinja2Templates(directory='templates')
 
@@ -1,2 +1,8 @@
 from .database import engine, SessionLocal
-from . import tables
\ No newline at end of file
+from . import tables
+
+def init_db():
+    """
+    Creates the database tables that do not exist yet.
+    """
+    tables.Base.metadata.create_all(bind=engine)
\ No newline at end of file
@@ -1,18 +1,23 @@
 import json
 import logging
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List, Optional
 import asyncio
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
 from sqlalchemy.orm import Session
 import ollama
 
-from models import tables, engine, SessionLocal
-from utils import gen_query, make_custom_search, scrape_web, DocSummarizer, LLMSummaryGenerator, DocReranker
+from models import tables, SessionLocal
+from utils import gen_query_variants, search_many, SearchBudget, SearchSettings, scrape_web_stream, build_doc_summarizer, SummarizerSettings, LLMSummaryGenerator, get_llm_client, get_model_registry, ModelLoadError, ScrapeSettings, build_context_packer, build_near_duplicate_filter, iter_answer_chunks, is_cacheable_question, is_standalone_search, start_speculative_search, build_stream_writer
 
-summary = DocSummarizer()
+context_packer = build_context_packer()
+summary = build_doc_summarizer(context_packer)
+summary_settings = SummarizerSettings()
 llm_generator = LLMSummaryGenerator()
-reranker = DocReranker()
+scrape_settings = ScrapeSettings()
+search_settings = SearchSettings()
+near_duplicate_filter = build_near_duplicate_filter()
 
 #--- Logging Setup ---#
 logging.basicConfig(
@@ -27,10 +32,48 @@ router = APIRouter(
     tags="chat"
 )
 
-tables.Base.metadata.create_all(bind=engine)
+@lru_cache(maxsize=1)
+def get_tools() -> List[Dict]:
+    """
+    Loads the tool definitions offered to the routing LLM call, once.
+    """
+    with open('routes/tools.json', 'r', encoding='utf-8') as file:
+        return json.load(file)
 
-with open('routes/tools.json', 'r', encoding='utf-8') as file:
-    tool = json.load(file)
+async def route_locally(question: str, prior_messages: int) -> Optional[List[Dict]]:
+    """
+    Picks the tool calls for the latest user message with the local ToolRouter, in milliseconds.
+
+    Returns None while the router is not loaded, or when it is disabled or
+    unsure, in which case the routing LLM call decides. A web search is also
+    left to the LLM when earlier messages exist, since only the LLM turns a
+    follow-up like "How old is he?" into a standalone search query, unless
+    the message is a search of its own such as "latest news on the Mars rover".
+    """
+    tool_router = get_model_registry().loaded_tool_router()
+    if tool_router is None:
+        return None
+
+    decision = await asyncio.to_thread(tool_router.route, question)
+    if decision is None:
+        return None
+    if decision.tool == 'gen_query' and prior_messages > 0 and not is_standalone_search(question):
+        logging.info("Leaving the search query of a follow-up message to the LLM.")
+        return None
+    logging.info(f"Routed to {decision.tool} by {decision.source} (confidence {decision.confidence:.3f})")
+    arguments = {'query': question} if decision.tool == 'gen_query' else {}
+    return [{'function': {'name': decision.tool, 'arguments': arguments}}]
+
+async def route_with_llm(messages: List[Dict]) -> List[Dict]:
+    """
+    Picks the tool calls for the conversation with a tool-calling LLM request.
+    """
+    response = await get_llm_client().chat(
+        model='llama3.2',
+        messages=messages,
+        tools=get_tools(),
+    )
+    return response['message'].get('tool_calls') or []
 
 def get_db():
     db = SessionLocal()
@@ -48,6 +91,7 @@ async def chat_endpoint(
     conversation_id: int | None = Query(None, alias="conversation_id")):
         
     await websocket.accept()
+    stream = build_stream_writer(websocket)
     current_conversation_id: int = -1
     user_message = []
     
@@ -96,6 +140,7 @@ async def chat_endpoint(
         
         while True:
             user_message = await websocket.receive_text()
+            question = user_message
             
             user_message = tables.Message(
                 conversation_id=conversation_id,
@@ -112,97 +157,163 @@ async def chat_endpoint(
             ollama_messages = [{'role': msg.author, 'content': msg.description} for msg in chat_history]
 
             llm_response_content = ""
+            speculation = None
+            search_budget = SearchBudget(search_settings.search_max_requests)
             try:
-                response_generator = ollama.chat(
-                    model='llama3.2',
-                    messages=ollama_messages,
-                    tools=tool,
-                )
+                llm_client = get_llm_client()
+                tool_calls = await route_locally(question, prior_messages=len(chat_history) - 1)
+                if tool_calls is None:
+                    tool_calls = await route_with_llm(ollama_messages)
                 
-                if response_generator ['message'].get('tool_calls'):
-                    available_functions = {
-                        "gen_query": gen_query,
-                    }
-                    
-                    for tool_call in response_generator['message']['tool_calls']:
+                if tool_calls:
+                    for tool_call in tool_calls:
                         function_name = tool_call['function']['name']
                         function_args = tool_call['function']['arguments']
                         
                         if function_name == 'respond_directly':
-                            response = ollama.chat(
+                            response = llm_client.stream_content(
                                 model='llama3.2',
                                 messages=ollama_messages,
-                                stream=True
                             )
                             
-                            for chunk in response:
-                                content = chunk['message']['content']
+                            async for content in response:
                                 llm_response_content += content
-                                await websocket.send_text(content)
-                                await asyncio.sleep(0.01)
+                                await stream.write(content)
                             
-                            await websocket.send_json({
-                                "type": "stream_end",
-                            }) 
+                            await stream.end()
                         
                         elif function_name == 'gen_query':
-                            function_to_call = available_functions[function_name]
-                            tool_output = function_to_call(**function_args)
+                            answer_cache = None
+                            if is_cacheable_question(question, prior_messages=len(chat_history) - 1):
+                                answer_cache = await get_model_registry().get_answer_cache()
+                            cached_answer = None
+                            if answer_cache is not None:
+                                cached_answer = await asyncio.to_thread(answer_cache.lookup, question)
+                            
+                            if cached_answer is not None:
+                                await stream.think("Found an answer to a closely related question")
+                                for chunk in iter_answer_chunks(cached_answer['answer']):
+                                    llm_response_content += chunk
+                                    await stream.write(chunk)
+                                
+                                await stream.end()
+                                continue
+                            
+                            # Search the raw question in the background while the slower query expansion call runs.
+                            speculation = start_speculative_search(
+                                question,
+                                budget=search_budget,
+                                hedge_after=scrape_settings.scrape_hedge_after_seconds,
+                                max_bytes=scrape_settings.scrape_max_page_bytes,
+                            )
+                            query_variants = await gen_query_variants(function_args['query'], count=search_settings.search_query_variants)
+                            tool_output = query_variants[0] if query_variants else function_args['query']
                             
-                            await websocket.send_json({
-                                "type": "think",
-                                "message": tool_output,
-                            })
-                            await asyncio.sleep(0.01)
+                            await stream.think(tool_output)
                              
-                            url_list = make_custom_search(tool_output)
-                            if not url_list:
-                                url_list = make_custom_search(function_args['query'])
+                            local_index = await get_model_registry().get_local_index()
+                            local_hits = []
+                            scraped = []
+                            if local_index is not None:
+                                local_hits = local_index.relevant(await asyncio.to_thread(local_index.search, tool_output))
                             
-                            await websocket.send_json({
-                                "type": "think",
-                                "message": f"Currently analyzing {len(url_list)} webpages.",
-                            })
-                            await asyncio.sleep(0.01) 
+                            if local_index is not None and local_index.is_sufficient(local_hits):
+                                if speculation is not None:
+                                    speculation.cancel()
+                                await stream.think(f"Currently analyzing {len(local_hits)} previously read webpages.")
+                                text_content = [hit['texts'] for hit in local_hits]
                             
-                            contents_list = scrape_web(urls=url_list)
-                            text_content = []
-                            for content in contents_list:
-                                text_content.append(content['texts'])
+                            else:
+                                # Speculation already searched the raw question, so it is not sent again.
+                                queries = query_variants + [function_args['query']]
+                                if speculation is None:
+                                    queries.append(question)
+                                url_list = await search_many(
+                                    queries,
+                                    results_per_query=search_settings.search_results_per_query,
+                                    budget=search_budget,
+                                )
+                                if speculation is not None:
+                                    url_list = speculation.with_results(url_list)
+                                
+                                await stream.think(f"Currently analyzing {len(url_list)} webpages.")
+                                
+                                async for content in scrape_web_stream(
+                                    urls=url_list,
+                                    deadline=scrape_settings.scrape_deadline_seconds,
+                                    quorum=scrape_settings.scrape_quorum,
+                                    hedge_after=scrape_settings.scrape_hedge_after_seconds,
+                                    max_bytes=scrape_settings.scrape_max_page_bytes,
+                                    prefetched=speculation.take(url_list) if speculation is not None else None,
+                                ):
+                                    if content['texts']:
+                                        scraped.append(content)
+                                
+                                scraped_urls = {content['url'] for content in scraped}
+                                text_content = [content['texts'] for content in scraped]
+                                text_content.extend(hit['texts'] for hit in local_hits if hit['url'] not in scraped_urls)
+                            
+                            if near_duplicate_filter is not None:
+                                kept = await asyncio.to_thread(near_duplicate_filter.deduplicate, text_content)
+                                if len(kept) < len(text_content):
+                                    logging.info(f"Dropped {len(text_content) - len(kept)} near-duplicate documents for conversation {conversation_id}")
+                                text_content = [text_content[index] for index in kept]
                                                         
-                            results = reranker.get_reranked_and_ordered_results(query=tool_output, docs=text_content)
-                            reranked_list = []
-                            for doc, score in results:
-                                reranked_list.append(doc)
+                            reranker = await get_model_registry().get_reranker()
+                            results = await asyncio.to_thread(reranker.rerank, query=tool_output, docs=text_content)
+                            reranked_list = [doc for doc, _ in results]
+                            
+                            await stream.think("Fetching and reviewing articles")
                             
-                            await websocket.send_json({
-                                "type": "think",
-                                "message": "Fetching and reviewing articles",
-                            })
-                            await asyncio.sleep(0.01)
+                            summaries = {}
+                            async for index, doc_summary in summary.summarize_many(
+                                reranked_list,
+                                max_concurrency=summary_settings.summary_max_concurrency,
+                                timeout=summary_settings.summary_timeout_seconds,
+                                deadline=summary_settings.summary_deadline_seconds,
+                            ):
+                                summaries[index] = doc_summary
+                            if len(summaries) < len(reranked_list):
+                                logging.warning(f"Summarized {len(summaries)} of {len(reranked_list)} documents for conversation {conversation_id}")
                             
-                            all_tasks = [summary.summarize(doc) for doc in reranked_list]
-                            summaries = await asyncio.gather(*all_tasks)
-                            total_summary = '/n'.join(summaries)
+                            ranked_summaries = [(summaries[index], results[index][1]) for index in sorted(summaries)]
+                            packed = await asyncio.to_thread(context_packer.pack, [text for text, _ in ranked_summaries])
+                            if packed.dropped or packed.truncated is not None:
+                                logging.info(
+                                    f"Context for conversation {conversation_id} kept {len(packed.included)} of {len(ranked_summaries)} summaries "
+                                    f"in {packed.tokens} tokens; truncated: {packed.truncated}, dropped: {packed.dropped}"
+                                )
+                            packed_summaries = [(text, ranked_summaries[position][1]) for text, position in zip(packed.items, packed.included)]
+                            ordered_summaries = reranker.order_reranked_results(packed_summaries)
+                            total_summary = context_packer.separator.join(text for text, _ in ordered_summaries)
                             
-                            await websocket.send_json({
-                                "type": "think",
-                                "message": "Generating a structured response",
-                            })
-                            await asyncio.sleep(0.01)
+                            await stream.think("Generating a structured response")
                                           
                             async for chunk in llm_generator.generate_summary(total_summary):
-                                await websocket.send_text(chunk)
-                                await asyncio.sleep(0.01)
+                                llm_response_content += chunk
+                                await stream.write(chunk)
+                            
+                            await stream.end()
                             
-                            await websocket.send_json({
-                                "type": "stream_end",
-                            }) 
+                            # An answer written without any retrieved context must not be replayed for later questions.
+                            if answer_cache is not None and ordered_summaries:
+                                await asyncio.to_thread(answer_cache.store, question, llm_response_content)
+                            if local_index is not None and scraped:
+                                await asyncio.to_thread(local_index.add_documents, scraped)
                             
+            except ModelLoadError as e:
+                logging.error(f"Models not ready for conversation {conversation_id}: {e}")
+                await stream.error("The search models are not ready yet. Please try again in a moment.")
+                await stream.drain()
+                continue
             except ollama.ResponseError as e:
                 logging.error(f"Ollama API error for conversation {conversation_id}: {e}")
-                await websocket.send_text(f"Error from LLM: {e}")
+                await stream.error(f"Error from LLM: {e}")
+                await stream.drain()
                 continue
+            finally:
+                if speculation is not None:
+                    speculation.cancel()
 
             llm_message = tables.Message(
                 conversation_id=conversation_id,
@@ -222,8 +333,11 @@ async def chat_endpoint(
     except Exception as e:
         logging.error(f"An unhandled error occurred for conversation {conversation_id}: {e}", exc_info=True)
         try:
-            await websocket.send_text("An internal server error occurred. Please try again.")
-        except RuntimeError:
+            await stream.error("An internal server error occurred. Please try again.")
+            await stream.drain()
+        except Exception:
             logging.warning(f"Failed to send error message to disconnected client for conversation {conversation_id}")
         if websocket in active_connections:
-            del active_connections[websocket]
\ No newline at end of file
+            del active_connections[websocket]
+    finally:
+        await stream.close()
\ No newline at end of file
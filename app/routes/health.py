@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from utils import get_llm_client, get_model_registry
+
+router = APIRouter(tags=["health"])
+
+@router.get("/ready")
+async def ready():
+    """
+    Reports whether the models needed to answer questions are loaded.
+    Responds with 503 until they are, so load balancers can hold traffic back.
+    Also lists the health and load of each LLM host.
+    """
+    registry = get_model_registry()
+    return JSONResponse(
+        status_code=200 if registry.is_ready else 503,
+        content={"ready": registry.is_ready, "components": registry.status, "llm_hosts": get_llm_client().status()},
+    )
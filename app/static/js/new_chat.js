@@ -36,6 +36,9 @@ class WebSocketChatClient {
                     receivedData = ''
                     console.log(data.message)
                     this.thinking(data.message)
+                }
+                else if (data.type === 'token'){
+                    this.onMessageCallback(data.content);
                 }else{
                     this.onMessageCallback(data);
                 }
@@ -307,6 +310,8 @@ function handleIncomingMessage(data) {
             });
         } else if (data.type === "new_session") {
             chatUI.clearChatContainer();
+        } else if (data.type === "error") {
+            chatUI.appendChatMessage({ author: 'system', content: data.message });
         } else {
             chatUI.displayResponse(JSON.stringify(data));
         }
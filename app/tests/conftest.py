@@ -0,0 +1,55 @@
+import os
+import re
+import sys
+
+import numpy as np
+import pytest
+
+# The app imports its modules as top-level packages and logs to a relative `logs/` directory.
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+os.chdir(APP_DIR)
+os.makedirs('logs', exist_ok=True)
+
+class WordEmbedder:
+    """
+    A stand-in for Embedder that embeds a text as its normalized bag of words,
+    so the cosine similarity of two texts follows their shared words.
+    """
+
+    model_name = 'test-bag-of-words'
+    dim = 256
+
+    def __init__(self):
+        self.vocabulary = {}
+
+    def encode(self, texts, batch_size=32):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                column = self.vocabulary.setdefault(word, len(self.vocabulary) % self.dim)
+                vectors[row, column] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+@pytest.fixture
+def word_embedder():
+    return WordEmbedder()
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Freezes the time seen by SQLiteCache; advance it by adding to `clock.now`.
+    """
+    from utils import cache as cache_module
+
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, 'time', fake)
+    return fake
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from utils.answer_cache import AnswerCache, is_cacheable_question
+from utils.vector_index import VectorIndex
+
+@pytest.fixture
+def answer_cache(tmp_path, word_embedder):
+    return AnswerCache(word_embedder, str(tmp_path / 'answers.db'), threshold=0.9, ttl_seconds=3600)
+
+def test_near_paraphrase_hits(answer_cache):
+    answer_cache.store("What is the capital of France?", "Paris.")
+
+    hit = answer_cache.lookup("what is the capital city of france")
+
+    assert hit['answer'] == "Paris."
+    assert hit['question'] == "What is the capital of France?"
+    assert 0.9 <= hit['similarity'] < 1.0
+
+def test_question_below_the_threshold_misses(answer_cache):
+    answer_cache.store("What is the capital of France?", "Paris.")
+
+    assert answer_cache.lookup("What is the population of France?") is None
+    assert answer_cache.stats()['misses'] == 1
+
+def test_expired_answer_misses(tmp_path, word_embedder, clock):
+    answer_cache = AnswerCache(word_embedder, str(tmp_path / 'answers.db'), threshold=0.9, ttl_seconds=60)
+    answer_cache.store("What is the capital of France?", "Paris.")
+
+    clock.now += 61
+
+    assert answer_cache.lookup("What is the capital of France?") is None
+    assert answer_cache.stats()['entries'] == 0
+
+def test_answers_survive_a_restart(tmp_path, word_embedder):
+    path = str(tmp_path / 'answers.db')
+    AnswerCache(word_embedder, path).store("Who wrote Hamlet?", "Shakespeare.")
+
+    assert AnswerCache(word_embedder, path).lookup("who wrote hamlet")['answer'] == "Shakespeare."
+
+def test_follow_ups_and_time_sensitive_questions_are_not_cacheable():
+    assert is_cacheable_question("Who wrote Hamlet?", prior_messages=0)
+    assert not is_cacheable_question("How old is he?", prior_messages=2)
+    assert not is_cacheable_question("What is the weather today?", prior_messages=0)
+
+def test_ivf_search_after_a_rebuild_matches_brute_force():
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(32, 24))
+    vectors = (centers[rng.integers(0, 32, size=1200)] + 0.3 * rng.normal(size=(1200, 24))).astype(np.float32)
+    index = VectorIndex(24, nprobe=4, train_threshold=256)
+    index.add(vectors[:300])
+    index.add(vectors[300:])
+
+    # Trained with the first batch and retrained once the index grew fourfold.
+    assert index._trained_size == 1200
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    for row in rng.choice(1200, size=50, replace=False):
+        query = vectors[row] + 0.05 * rng.normal(size=24).astype(np.float32)
+        brute_force = int(np.argmax(normalized @ (query / np.linalg.norm(query))))
+        assert index.search(query, k=1)[0][0] == brute_force
+
+def test_removed_rows_are_not_returned():
+    index = VectorIndex(3)
+    index.add(np.eye(3, dtype=np.float32))
+
+    index.remove([0])
+
+    assert index.search(np.array([1.0, 0.1, 0.0]), k=1)[0][0] == 1
+    assert len(index) == 2
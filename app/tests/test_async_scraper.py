@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from utils.scrape import async_scraper
+from utils.scrape.page_cache import PageCache, PageCacheSettings
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    """
+    Points the scraper at a fresh page cache and a mock transport, and skips HTML extraction.
+
+    Set `delays[url]` to a list of per-attempt delays to slow a URL down.
+    """
+    cache = PageCache(PageCacheSettings(page_cache_path=str(tmp_path / 'pages.db')))
+    state = {'delays': {}, 'attempts': {}, 'bodies': {}}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        attempt = state['attempts'].get(url, 0)
+        state['attempts'][url] = attempt + 1
+        delays = state['delays'].get(url, [0])
+        await asyncio.sleep(delays[min(attempt, len(delays) - 1)])
+        return httpx.Response(200, content=state['bodies'].get(url, url.encode('utf-8')))
+
+    async def load_document(cache, url, content_hash):
+        return {'texts': f"text of {url}"}
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(async_scraper, 'get_page_cache', lambda: cache)
+    monkeypatch.setattr(async_scraper, 'get_http_client', lambda: client)
+    monkeypatch.setattr(async_scraper, 'load_document_async', load_document)
+    return state
+
+def scrape(urls, **kwargs):
+    async def run():
+        start = time.perf_counter()
+        documents = [document async for document in async_scraper.scrape_web_stream(urls, **kwargs)]
+        return documents, time.perf_counter() - start
+    return asyncio.run(run())
+
+def test_deadline_cuts_off_stragglers(scraper):
+    urls = [f"https://site{index}.example.com/" for index in range(3)]
+    scraper['delays'][urls[2]] = [5]
+
+    documents, elapsed = scrape(urls, deadline=0.3)
+
+    assert sorted(document['url'] for document in documents) == urls[:2]
+    assert elapsed < 2
+
+def test_stops_at_the_quorum(scraper):
+    urls = [f"https://site{index}.example.com/" for index in range(5)]
+    for index, url in enumerate(urls):
+        scraper['delays'][url] = [0.05 * index]
+
+    documents, _ = scrape(urls, quorum=2)
+
+    assert [document['url'] for document in documents] == urls[:2]
+
+def test_hedged_fetch_wins_over_a_stalled_attempt(scraper):
+    url = 'https://slow.example.com/'
+    scraper['delays'][url] = [5, 0]
+
+    documents, elapsed = scrape([url], hedge_after=0.05)
+
+    assert [document['url'] for document in documents] == [url]
+    assert scraper['attempts'][url] == 2
+    assert elapsed < 2
+
+def test_pages_over_max_bytes_are_skipped(scraper):
+    small, large = 'https://small.example.com/', 'https://large.example.com/'
+    scraper['bodies'][small] = b'x' * 100
+    scraper['bodies'][large] = b'x' * 2000
+
+    documents, _ = scrape([small, large], max_bytes=1000)
+
+    assert [document['url'] for document in documents] == [small]
+
+def test_read_limited_stops_a_body_without_content_length():
+    async def chunks():
+        for _ in range(10):
+            yield b'x' * 300
+
+    async def run(max_bytes):
+        return await async_scraper.read_limited(httpx.Response(200, content=chunks()), max_bytes)
+
+    assert 'Content-Length' not in httpx.Response(200, content=chunks()).headers
+    assert asyncio.run(run(1000)) is None
+    assert asyncio.run(run(None)) == b'x' * 3000
@@ -0,0 +1,89 @@
+from utils.cache import TOUCH_FLUSH_COUNT, TOUCH_FLUSH_INTERVAL_SECONDS, SQLiteCache
+
+def stored_access_time(cache: SQLiteCache, key: str) -> float:
+    return cache._conn.execute(f"SELECT accessed_at FROM {cache.table} WHERE key = ?", (key,)).fetchone()[0]
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), ttl_seconds=60)
+    cache.set('key', b'value')
+
+    clock.now += 59
+    assert cache.get('key') == b'value'
+    clock.now += 2
+    assert cache.get('key') is None
+    assert not cache.contains('key')
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    cache.set('other', b'value')
+    assert cache.stats()['entries'] == 1
+
+def test_evicts_least_recently_used_entries_by_count(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), max_entries=2)
+    cache.set('a', b'1')
+    clock.now += 1
+    cache.set('b', b'2')
+    clock.now += 1
+    assert cache.get('a') == b'1'
+    clock.now += 1
+    cache.set('c', b'3')
+
+    assert cache.contains('a') and cache.contains('c')
+    assert not cache.contains('b')
+
+def test_evicts_least_recently_used_entries_by_bytes(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), max_bytes=10)
+    cache.set('a', b'x' * 4)
+    clock.now += 1
+    cache.set('b', b'x' * 4)
+    clock.now += 1
+    cache.get('a')
+    clock.now += 1
+    cache.set('c', b'x' * 4)
+
+    assert cache.stats()['bytes'] == 8
+    assert cache.contains('a') and cache.contains('c')
+    assert not cache.contains('b')
+
+def test_reads_batch_their_access_times(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    cache.set_many([(f"k{index}", b'v') for index in range(TOUCH_FLUSH_COUNT)])
+    written_at = clock.now
+
+    clock.now += 1
+    cache.get_many([f"k{index}" for index in range(TOUCH_FLUSH_COUNT - 1)])
+    assert stored_access_time(cache, 'k0') == written_at
+
+    cache.get(f"k{TOUCH_FLUSH_COUNT - 1}")
+    assert stored_access_time(cache, 'k0') == written_at + 1
+
+def test_pending_access_times_are_written_after_the_interval(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    written_at = clock.now
+
+    clock.now += 1
+    cache.get('a')
+    assert stored_access_time(cache, 'a') == written_at
+
+    clock.now += TOUCH_FLUSH_INTERVAL_SECONDS + 1
+    cache.get('b')
+    assert stored_access_time(cache, 'a') == written_at + 1
+    assert stored_access_time(cache, 'b') == clock.now
+
+def test_contains_does_not_count_or_touch(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    cache.set('a', b'1')
+
+    assert cache.contains('a') and not cache.contains('missing')
+    assert cache.stats()['hits'] == 0 and cache.stats()['misses'] == 0
+    assert cache._touched == {}
+
+def test_get_many_reads_more_keys_than_one_query_binds(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    cache.set_many([(f"k{index}", str(index).encode()) for index in range(1200)])
+
+    found = cache.get_many([f"k{index}" for index in range(0, 1300)])
+
+    assert len(found) == 1200
+    assert found['k1199'] == b'1199'
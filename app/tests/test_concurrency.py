@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from utils.concurrency import bounded_map
+
+async def collect(results):
+    return [item async for item in results]
+
+def test_never_runs_more_than_max_concurrency():
+    running = 0
+    peak = 0
+
+    async def work(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item * 2
+
+    results = asyncio.run(collect(bounded_map(work, range(10), max_concurrency=3)))
+
+    assert peak == 3
+    assert sorted(results) == [(index, index * 2) for index in range(10)]
+
+def test_skips_items_that_time_out_or_fail():
+    async def work(item):
+        if item == 'slow':
+            await asyncio.sleep(1)
+        if item == 'bad':
+            raise ValueError(item)
+        return item
+
+    results = asyncio.run(collect(bounded_map(work, ['ok', 'slow', 'bad', 'fine'], timeout=0.05)))
+
+    assert sorted(results) == [(0, 'ok'), (3, 'fine')]
+
+def test_deadline_cancels_pending_items():
+    cancelled = []
+
+    async def work(item):
+        try:
+            await asyncio.sleep(item)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    async def run():
+        start = time.perf_counter()
+        results = await collect(bounded_map(work, [0.01, 5, 5], deadline=0.1))
+        # Let the cancelled tasks run their handlers.
+        await asyncio.sleep(0)
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+
+    assert results == [(0, 0.01)]
+    assert elapsed < 1
+    assert cancelled == [5, 5]
+
+def test_closing_early_cancels_pending_items():
+    cancelled = []
+
+    async def work(item):
+        try:
+            await asyncio.sleep(item)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    async def run():
+        results = bounded_map(work, [0, 5, 5])
+        first = await results.__anext__()
+        await results.aclose()
+        await asyncio.sleep(0)
+        return first
+
+    assert asyncio.run(run()) == (0, 0)
+    assert cancelled == [5, 5]
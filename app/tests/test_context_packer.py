@@ -0,0 +1,63 @@
+import pytest
+
+from utils.summary.context_packer import ContextPacker
+
+def estimated_packer(**kwargs) -> ContextPacker:
+    # Without a tokenizer, four characters count as one token.
+    return ContextPacker(tokenizer_name=None, **kwargs)
+
+def test_items_that_fit_are_kept_in_rank_order():
+    packer = estimated_packer(token_budget=100, separator='')
+
+    packed = packer.pack(['a' * 40, 'b' * 80])
+
+    assert packed.items == ['a' * 40, 'b' * 80]
+    assert packed.included == [0, 1] and packed.dropped == [] and packed.truncated is None
+    assert packed.tokens == 30
+
+def test_equal_items_past_the_budget_are_dropped_in_input_order():
+    packer = estimated_packer(token_budget=20, min_truncated_tokens=5, separator='')
+    items = ['a' * 40, 'b' * 40, 'c' * 40, 'd' * 40]
+
+    first = packer.pack(items)
+    second = packer.pack(items)
+
+    assert first.included == [0, 1]
+    assert first.dropped == [2, 3]
+    assert first.tokens == 20
+    assert second == first
+
+def test_leftover_budget_is_filled_with_one_truncated_item():
+    packer = estimated_packer(token_budget=30, min_truncated_tokens=5, separator='\n\n')
+
+    packed = packer.pack(['a' * 40, 'b' * 40, 'c' * 40, 'd' * 4])
+
+    # Each separator costs one token: 10 + (1 + 10) + 1 leaves 8 tokens for the third item.
+    assert packed.truncated == 2
+    assert packed.items[2] == 'c' * 32
+    assert packed.dropped == [3]
+    assert packed.tokens == 30
+
+def test_leftover_below_the_minimum_is_not_truncated_into():
+    packer = estimated_packer(token_budget=25, min_truncated_tokens=5, separator='\n\n')
+
+    packed = packer.pack(['a' * 40, 'b' * 40, 'c' * 40])
+
+    assert packed.included == [0, 1] and packed.dropped == [2] and packed.truncated is None
+    assert packed.tokens == 21
+
+def test_budget_holds_with_a_real_tokenizer(tmp_path):
+    transformers = pytest.importorskip('transformers')
+    words = ['the', 'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog']
+    vocab_file = tmp_path / 'vocab.txt'
+    vocab_file.write_text('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + words) + '\n')
+    transformers.BertTokenizerFast(vocab_file=str(vocab_file)).save_pretrained(tmp_path)
+    packer = ContextPacker(tokenizer_name=str(tmp_path), token_budget=20, min_truncated_tokens=3)
+    items = [' '.join(words)] * 4
+
+    packed = packer.pack(items)
+
+    assert packer.count_tokens(items[0]) == 8
+    assert packed.tokens <= 20
+    assert packer.count_tokens(packer.separator.join(packed.items)) <= 20
+    assert packed.included == [0, 1, 2] and packed.truncated == 2 and packed.dropped == [3]
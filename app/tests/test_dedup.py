@@ -0,0 +1,38 @@
+import numpy as np
+
+from utils.dedup import NearDuplicateFilter
+
+def article(seed: int, words: int = 200) -> str:
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"word{index}" for index in range(500)]
+    return ' '.join(rng.choice(vocabulary, size=words))
+
+def test_mirrors_collapse_to_their_longest_member():
+    original = article(0)
+    syndicated = f"Syndicated from the Daily Example. {original} Read more stories like this on our site today."
+    mirror = ' '.join(original.split()[:-5])
+    texts = [original, article(1), syndicated, mirror]
+
+    kept = NearDuplicateFilter().deduplicate(texts)
+
+    assert kept == [1, 2]
+
+def test_distinct_pages_survive():
+    texts = [article(seed) for seed in range(6)]
+
+    assert NearDuplicateFilter().deduplicate(texts) == list(range(6))
+
+def test_empty_texts_are_handled():
+    dedup = NearDuplicateFilter()
+
+    assert dedup.deduplicate([]) == []
+    assert dedup.deduplicate(['', article(0), '  ']) == [1, 2]
+    assert dedup.deduplicate(['short text']) == [0]
+
+def test_stats_count_dropped_documents():
+    dedup = NearDuplicateFilter()
+    original = article(3)
+
+    dedup.deduplicate([original, original, article(4)])
+
+    assert dedup.stats() == {'documents': 3, 'duplicates': 1, 'clusters': 1}
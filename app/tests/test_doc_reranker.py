@@ -0,0 +1,71 @@
+import pytest
+
+from utils.doc_reranker import DocReranker, passage_spans
+
+LIGHT_SCORES = {'alpha': 4.0, 'beta': 3.0, 'gamma': 2.0, 'delta': 1.0}
+HEAVY_SCORES = {'alpha': 1.0, 'beta': 2.0, 'gamma': 3.0, 'delta': 4.0}
+
+class FakeCrossEncoder:
+    """
+    Scores a passage by the fixed score of its first word and records every passage it saw.
+    """
+
+    def __init__(self, model_name: str):
+        self.scores = HEAVY_SCORES if model_name == 'heavy' else LIGHT_SCORES
+        self.seen = []
+
+    def predict(self, pairs, show_progress_bar=False):
+        self.seen.extend(passage for _, passage in pairs)
+        return [self.scores.get(passage.split()[0], 0.0) for _, passage in pairs]
+
+@pytest.fixture
+def make_reranker(monkeypatch):
+    sentence_transformers = pytest.importorskip('sentence_transformers')
+    monkeypatch.setattr(sentence_transformers, 'CrossEncoder', FakeCrossEncoder)
+
+    def make(**kwargs):
+        return DocReranker(model_names=['heavy', 'light'], **kwargs)
+    return make
+
+@pytest.mark.parametrize('num_words, passage_words, overlap', [(10, 4, 1), (300, 128, 32), (129, 128, 32), (1000, 50, 0)])
+def test_passage_spans_cover_the_document_with_the_overlap(num_words, passage_words, overlap):
+    spans = passage_spans(num_words, passage_words, overlap)
+
+    assert spans[0][0] == 0 and spans[-1][1] == num_words
+    assert all(end - start <= passage_words for start, end in spans)
+    for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+        assert previous_end - start == overlap
+
+def test_passage_spans_boundaries():
+    assert passage_spans(10, 4, 1) == [(0, 4), (3, 7), (6, 10)]
+    assert passage_spans(300, 128, 32) == [(0, 128), (96, 224), (192, 300)]
+    assert passage_spans(5, 128, 32) == [(0, 5)]
+
+def test_cascade_rescores_only_the_top_k_of_the_first_stage(make_reranker):
+    reranker = make_reranker(mode='cascade', cascade_top_k=2)
+    docs = ['delta text', 'alpha text', 'gamma text', 'beta text']
+
+    ranked = reranker.rerank_with_indices('query', docs)
+
+    # The light model ranks alpha, beta, gamma, delta; the heavy model swaps the top two only.
+    assert [index for index, _, _ in ranked] == [3, 1, 2, 0]
+    assert sorted(reranker.models[0].seen) == ['alpha text', 'beta text']
+    assert len(reranker.models[1].seen) == 4
+    assert [score for _, _, score in ranked] == sorted((score for _, _, score in ranked), reverse=True)
+
+def test_cascade_threshold_drops_weak_documents(make_reranker):
+    reranker = make_reranker(mode='cascade', cascade_top_k=1, cascade_threshold=2.5)
+
+    ranked = reranker.rerank_with_indices('query', ['delta text', 'alpha text', 'gamma text', 'beta text'])
+
+    assert [index for index, _, _ in ranked] == [1, 3]
+
+def test_documents_are_condensed_to_their_best_passages(make_reranker):
+    reranker = make_reranker(passage_words=4, passage_overlap=0, top_passages=2)
+    doc = 'delta one two three alpha one two three gamma one two three beta one two three'
+
+    [(index, text, _)] = reranker.rerank_with_indices('query', [doc])
+
+    # The heavy model prefers the delta and gamma passages; they are kept in reading order.
+    assert index == 0
+    assert text == 'delta one two three\n\ngamma one two three'
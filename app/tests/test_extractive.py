@@ -0,0 +1,39 @@
+from utils.summary.extractive import ExtractiveSummarizer, split_sentences
+
+def test_tables_and_lists_are_cut_to_the_word_budget():
+    table = '\n'.join(f"row {index} | {index * 2}" for index in range(200))
+
+    summary = ExtractiveSummarizer(max_words=30).summarize_text(table)
+
+    assert len(summary.split()) == 30
+    assert summary.splitlines()[0] == 'row 0 | 0'
+    assert table.startswith(summary)
+
+def test_short_text_without_sentences_is_kept_whole():
+    assert ExtractiveSummarizer(max_words=30).summarize_text("  Home\nAbout us\n") == "Home\nAbout us"
+
+def test_summary_keeps_central_sentences_within_the_budget():
+    sentences = [
+        "The city council approved the new park budget on Monday.",
+        "The park budget includes funds for trees and playgrounds.",
+        "Council members said the park budget was long overdue.",
+        "A local bakery also won an award for its croissants this week.",
+        "Residents welcomed the park budget at the council meeting.",
+    ]
+
+    summary = ExtractiveSummarizer(max_words=25).summarize_text(' '.join(sentences))
+
+    assert len(summary.split()) <= 25
+    assert all(line in sentences for line in summary.splitlines())
+    assert sentences[3] not in summary
+
+def test_single_long_sentence_is_cut_to_the_budget():
+    sentence = ' '.join(f"word{index}" for index in range(100)) + '.'
+    document = f"{sentence} Another sentence that is long enough to count here. {sentence}"
+
+    summary = ExtractiveSummarizer(max_words=10).summarize_text(document)
+
+    assert len(summary.split()) == 10
+
+def test_split_sentences_breaks_at_punctuation_and_lines():
+    assert split_sentences("First one. Second one!\nThird one? 3 more.") == ["First one.", "Second one!", "Third one?", "3 more."]
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from utils.summary import gen_summary
+from utils.summary.context_packer import ContextPacker
+from utils.summary.gen_summary import MAX_MAP_REDUCE_DEPTH, DocSummarizer
+
+def make_document(sections: int = 12, sentences: int = 10) -> str:
+    """
+    A long document made of sections that each open with a marker sentence.
+    """
+    return ' '.join(
+        f"Marker{section} opens section {section}. " + ' '.join(
+            f"Filler sentence {sentence} of section {section} adds words to the page." for sentence in range(sentences)
+        )
+        for section in range(sections)
+    )
+
+class FakeLLM:
+    """
+    Records every call and answers with `respond(document)`, tracking the calls in flight.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.documents = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def chat(self, model, messages, options=None, **kwargs):
+        document = messages[-1]['content'].removeprefix("Document:\n").removesuffix("\n\nExtractive Summary:")
+        self.documents.append(document)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return {'message': {'content': self.respond(document)}}
+
+def keep_markers(document: str) -> str:
+    return ' '.join(word for word in document.split() if word.startswith('Marker'))
+
+@pytest.fixture
+def summarizer():
+    return DocSummarizer(
+        use_cache=False,
+        max_input_tokens=200,
+        chunk_tokens=100,
+        max_concurrent_chunks=2,
+        token_counter=ContextPacker(tokenizer_name=None),
+    )
+
+def test_short_documents_take_one_call(summarizer, monkeypatch):
+    llm = FakeLLM(keep_markers)
+    monkeypatch.setattr(gen_summary, 'get_llm_client', lambda: llm)
+
+    summary = asyncio.run(summarizer.summarize(make_document(sections=1, sentences=2)))
+
+    assert summary == 'Marker0'
+    assert len(llm.documents) == 1
+
+def test_text_past_the_first_chunk_reaches_the_summary(summarizer, monkeypatch):
+    llm = FakeLLM(keep_markers)
+    monkeypatch.setattr(gen_summary, 'get_llm_client', lambda: llm)
+    document = make_document()
+
+    summary = asyncio.run(summarizer.summarize(document))
+
+    assert summary.split() == [f"Marker{section}" for section in range(12)]
+    assert len(llm.documents) > 2
+    assert all(summarizer.token_counter.count_tokens(sent) <= summarizer.max_input_tokens for sent in llm.documents)
+    assert llm.peak == 2
+
+def test_depth_limit_merges_every_chunk(summarizer, monkeypatch):
+    # Summaries as long as their input never converge, so the depth limit is reached.
+    llm = FakeLLM(lambda document: document)
+    monkeypatch.setattr(gen_summary, 'get_llm_client', lambda: llm)
+    document = make_document()
+    last_chunk = summarizer.token_counter.split(document, summarizer.chunk_tokens)[-1]
+
+    summary = asyncio.run(summarizer.summarize(document))
+
+    assert summarizer.token_counter.count_tokens(llm.documents[-1]) <= summarizer.max_input_tokens
+    assert last_chunk.split()[0] in summary
+    assert summary.startswith('Marker0')
+    chunk_count = len(summarizer.token_counter.split(document, summarizer.chunk_tokens))
+    assert len(llm.documents) == MAX_MAP_REDUCE_DEPTH * chunk_count + 1
@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import json
+
+import httpx
+import ollama
+
+from benchmarks.fake_ollama import build_app
+from utils.llm_client import LLMClient
+
+PORTS = [11501, 11502]
+
+def fake_host_args(**overrides) -> argparse.Namespace:
+    args = {
+        'slots': 4,
+        'failing_ports': [],
+        'load_seconds': 0.0,
+        'prompt_tokens_per_second': 1e9,
+        'words_per_second': 0.0,
+        'reply_words': 5,
+    }
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+class FakeHostTransport(httpx.ASGITransport):
+    """
+    Serves one fake Ollama host in process and records the body of every chat request.
+    """
+
+    def __init__(self, port: int, **overrides):
+        super().__init__(app=build_app(fake_host_args(**overrides), port))
+        self.port = port
+        self.chat_requests = []
+
+    def restart(self, **overrides) -> None:
+        self.app = build_app(fake_host_args(**overrides), self.port)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == '/api/chat':
+            self.chat_requests.append(json.loads(request.content))
+        return await super().handle_async_request(request)
+
+def make_client(hosts, **kwargs) -> LLMClient:
+    """
+    An LLMClient whose endpoints talk to the given fake hosts, in order.
+    """
+    client = LLMClient(hosts=[f"http://127.0.0.1:{host.port}" for host in hosts], health_check_interval=0, **kwargs)
+    for endpoint, host in zip(client.endpoints, hosts):
+        endpoint.client = ollama.AsyncClient(host=endpoint.host, transport=host)
+    return client
+
+def served_by(response) -> int:
+    """
+    The port of the fake host that wrote `response`; every reply starts with it.
+    """
+    return int(response['message']['content'].split()[0].strip('[]'))
+
+MESSAGES = [{'role': 'user', 'content': 'Hello?'}]
+
+def test_requests_go_to_the_least_outstanding_host():
+    async def run():
+        slow = FakeHostTransport(PORTS[0], words_per_second=20)
+        fast = FakeHostTransport(PORTS[1])
+        client = make_client([slow, fast])
+
+        held = asyncio.create_task(client.chat(MESSAGES))
+        await asyncio.sleep(0.05)
+        # Round-robin would send every other request to the busy host.
+        ports = [served_by(await client.chat(MESSAGES)) for _ in range(4)]
+        return served_by(await held), ports
+
+    held_port, ports = asyncio.run(run())
+
+    assert held_port == PORTS[0]
+    assert ports == [PORTS[1]] * 4
+
+def test_fails_over_when_a_host_returns_500():
+    async def run():
+        failing = FakeHostTransport(PORTS[0], failing_ports=[PORTS[0]])
+        healthy = FakeHostTransport(PORTS[1])
+        client = make_client([failing, healthy], failure_cooldown=60)
+
+        ports = [served_by(await client.chat(MESSAGES)) for _ in range(3)]
+        return client, failing, ports
+
+    client, failing, ports = asyncio.run(run())
+
+    assert ports == [PORTS[1]] * 3
+    # Only the first request reached the failing host; it then sat out its cooldown.
+    assert len(failing.chat_requests) == 1
+    assert [status['healthy'] for status in client.status()] == [False, True]
+
+def test_host_returns_after_its_cooldown():
+    async def run():
+        failing = FakeHostTransport(PORTS[0], failing_ports=[PORTS[0]])
+        healthy = FakeHostTransport(PORTS[1])
+        client = make_client([failing, healthy], failure_cooldown=0.1)
+
+        await client.chat(MESSAGES)
+        failing.restart()
+        during = [served_by(await client.chat(MESSAGES)) for _ in range(2)]
+        await asyncio.sleep(0.15)
+        after = [served_by(await client.chat(MESSAGES)) for _ in range(2)]
+        return client, during, after
+
+    client, during, after = asyncio.run(run())
+
+    assert during == [PORTS[1]] * 2
+    assert PORTS[0] in after
+    assert [status['healthy'] for status in client.status()] == [True, True]
+
+def test_health_check_returns_a_recovered_host():
+    async def run():
+        failing = FakeHostTransport(PORTS[0], failing_ports=[PORTS[0]])
+        healthy = FakeHostTransport(PORTS[1])
+        client = make_client([failing, healthy], failure_cooldown=60)
+
+        await client.chat(MESSAGES)
+        unhealthy = client.endpoints[0].available
+        failing.restart()
+        await client.check_health()
+        ports = [served_by(await client.chat(MESSAGES)) for _ in range(2)]
+        return unhealthy, client.endpoints[0].available, ports
+
+    unhealthy, available, ports = asyncio.run(run())
+
+    assert not unhealthy
+    assert available
+    assert PORTS[0] in ports
+
+def test_keep_alive_and_num_ctx_reach_every_request():
+    async def run():
+        host = FakeHostTransport(PORTS[0], load_seconds=0.01)
+        client = make_client([host], keep_alive='10m', num_ctx=4096)
+
+        await client.warm_up()
+        responses = [await client.chat(MESSAGES), await client.chat(MESSAGES, options={'temperature': 0})]
+        streamed = [chunk async for chunk in client.stream_content(MESSAGES)]
+        override = await client.chat(MESSAGES, options={'num_ctx': 1024})
+        return host, responses, streamed, override
+
+    host, responses, streamed, override = asyncio.run(run())
+
+    assert all(request['keep_alive'] == '10m' for request in host.chat_requests)
+    assert [request['options']['num_ctx'] for request in host.chat_requests] == [4096, 4096, 4096, 4096, 1024]
+    assert host.chat_requests[2]['options']['temperature'] == 0
+    # The model loaded by warm_up stays loaded until a call asks for another context size.
+    assert [response['load_duration'] for response in responses] == [0, 0]
+    assert override['load_duration'] > 0
+    assert streamed[0].strip() == f"[{PORTS[0]}]"
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from utils.local_index import DEFAULT_RRF_K, LocalIndex
+
+DOCUMENTS = [
+    {'url': 'https://a.example.com/', 'texts': "Solar panels convert sunlight into electricity for homes."},
+    {'url': 'https://b.example.com/', 'texts': "Wind turbines generate electricity from moving air."},
+    {'url': 'https://c.example.com/', 'texts': "Bread is baked from flour, water and yeast."},
+]
+
+@pytest.fixture
+def local_index(tmp_path, word_embedder):
+    index = LocalIndex(word_embedder, str(tmp_path / 'local.db'), top_k=3, min_similarity=0.3, min_documents=2, max_age_seconds=3600)
+    index.add_documents(DOCUMENTS)
+    return index
+
+def test_fuses_keyword_and_embedding_rankings(local_index):
+    hits = local_index.search("solar electricity")
+
+    assert [hit['url'] for hit in hits] == ['https://a.example.com/', 'https://b.example.com/', 'https://c.example.com/']
+    # The solar page is first in both rankings, the bread page matches no keyword.
+    assert hits[0]['score'] == pytest.approx(2 / (DEFAULT_RRF_K + 1))
+    assert hits[2]['score'] == pytest.approx(1 / (DEFAULT_RRF_K + 3))
+    assert hits[0]['similarity'] > hits[1]['similarity'] > hits[2]['similarity'] == 0.0
+
+def test_keyword_matches_are_stemmed(local_index):
+    hits = local_index.search("turbine", k=1)
+
+    assert hits[0]['url'] == 'https://b.example.com/'
+
+def test_sufficient_only_with_enough_relevant_fresh_pages(local_index):
+    assert local_index.is_sufficient(local_index.search("electricity"))
+    assert not local_index.is_sufficient(local_index.search("solar panels"))
+
+    local_index.add_documents(
+        [{'url': 'https://b.example.com/', 'texts': "Wind turbines generate electricity, updated."}],
+        fetched_at=time.time() - 7200,
+    )
+    assert not local_index.is_sufficient(local_index.search("electricity"))
+
+def test_unchanged_pages_are_not_reindexed(local_index):
+    assert local_index.add_documents(DOCUMENTS[:1]) == 0
+    assert local_index.add_documents([{'url': 'https://new.example.com/', 'texts': ''}]) == 0
+    assert len(local_index) == 3
+
+def test_changed_pages_replace_their_earlier_version(local_index):
+    changed = {'url': 'https://c.example.com/', 'texts': "Sourdough uses a starter instead of yeast."}
+
+    assert local_index.add_documents([changed]) == 1
+
+    assert len(local_index) == 3
+    assert local_index.search("sourdough", k=1)[0]['texts'] == changed['texts']
+    assert all(hit['url'] != 'https://c.example.com/' for hit in local_index.search("flour") if hit['similarity'] > 0)
+
+def test_embeddings_are_reloaded_on_restart(tmp_path, word_embedder, local_index):
+    reopened = LocalIndex(word_embedder, str(tmp_path / 'local.db'), top_k=3)
+
+    assert reopened.search("bread flour", k=1)[0]['url'] == 'https://c.example.com/'
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from utils import model_registry
+from utils.model_registry import ModelLoadError, ModelRegistry
+
+class FakeReranker:
+    def rerank(self, query, docs):
+        return []
+
+class FakeEmbedder:
+    def encode(self, texts):
+        return []
+
+@pytest.fixture
+def builds(monkeypatch):
+    """
+    Replaces every component build with a fake; set `failures['reranker']` or `delay` to misbehave.
+    """
+    state = {'failures': {}, 'delay': 0.0, 'reranker_builds': 0}
+
+    def build_reranker():
+        state['reranker_builds'] += 1
+        time.sleep(state['delay'])
+        if state['failures'].get('reranker'):
+            raise OSError("model download failed")
+        return FakeReranker()
+
+    def build_optional(name):
+        def build(embedder):
+            if state['failures'].get(name):
+                raise OSError(f"{name} failed")
+            return None
+        return build
+
+    monkeypatch.setattr(model_registry, 'build_reranker', build_reranker)
+    monkeypatch.setattr(model_registry, 'build_embedder', FakeEmbedder)
+    monkeypatch.setattr(model_registry, 'build_tool_router', build_optional('tool_router'))
+    monkeypatch.setattr(model_registry, 'build_answer_cache', build_optional('answer_cache'))
+    monkeypatch.setattr(model_registry, 'build_local_index', build_optional('local_index'))
+    return state
+
+def test_failed_load_is_retried(builds):
+    async def run():
+        registry = ModelRegistry()
+        builds['failures']['reranker'] = True
+        with pytest.raises(ModelLoadError):
+            await registry.get_reranker()
+        assert registry.status['reranker'] == 'failed' and not registry.is_ready
+
+        builds['failures']['reranker'] = False
+        reranker = await registry.get_reranker()
+        return registry, reranker
+
+    registry, reranker = asyncio.run(run())
+
+    assert isinstance(reranker, FakeReranker)
+    assert registry.is_ready
+    assert builds['reranker_builds'] == 2
+
+def test_cancelled_load_is_restarted(builds):
+    async def run():
+        registry = ModelRegistry()
+        builds['delay'] = 0.2
+        registry.start()
+        await asyncio.sleep(0.05)
+        await registry.stop()
+
+        builds['delay'] = 0.0
+        registry.start()
+        return registry, await registry.get_reranker()
+
+    registry, reranker = asyncio.run(run())
+
+    assert isinstance(reranker, FakeReranker)
+    assert registry.is_ready
+
+def test_optional_component_failure_is_not_fatal(builds):
+    async def run():
+        registry = ModelRegistry()
+        builds['failures']['answer_cache'] = True
+        return registry, await registry.get_answer_cache()
+
+    registry, answer_cache = asyncio.run(run())
+
+    assert answer_cache is None
+    assert registry.status['answer_cache'] == 'failed'
+    assert registry.is_ready
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('onnxruntime')
+pytest.importorskip('onnx')
+torch = pytest.importorskip('torch')
+transformers = pytest.importorskip('transformers')
+CrossEncoder = pytest.importorskip('sentence_transformers').CrossEncoder
+
+from utils.onnx_cross_encoder import OnnxCrossEncoder
+
+PAIRS = [
+    ("what is the capital of france", "paris is the capital of france"),
+    ("what is the capital of france", "the river flows through the city"),
+    ("how tall is the tower", "the tower is three hundred meters tall"),
+    ("how tall is the tower", ""),
+    ("who wrote the book", "the book was written by a famous author who lived in paris " * 20),
+]
+FP32_TOLERANCE = 1e-4
+
+@pytest.fixture(scope='module')
+def model_dir(tmp_path_factory):
+    """
+    Saves a small randomly initialised BERT cross-encoder, so the test needs no download.
+    """
+    path = tmp_path_factory.mktemp('cross_encoder')
+    words = sorted({word for pair in PAIRS for text in pair for word in text.split()})
+    vocab_file = path / 'vocab.txt'
+    vocab_file.write_text('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + words) + '\n')
+
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=5 + len(words),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=128,
+        num_labels=1,
+    )
+    transformers.BertForSequenceClassification(config).eval().save_pretrained(path)
+    transformers.BertTokenizerFast(vocab_file=str(vocab_file)).save_pretrained(path)
+    return str(path)
+
+def test_fp32_export_matches_pytorch(model_dir, tmp_path):
+    expected = CrossEncoder(model_dir, max_length=128).predict(PAIRS, show_progress_bar=False)
+    onnx_model = OnnxCrossEncoder(model_dir, quantize=False, onnx_dir=str(tmp_path), max_length=128)
+
+    np.testing.assert_allclose(onnx_model.predict(PAIRS, batch_size=2), expected, atol=FP32_TOLERANCE)
+
+def test_int8_export_keeps_scores_close(model_dir, tmp_path):
+    expected = CrossEncoder(model_dir, max_length=128).predict(PAIRS, show_progress_bar=False)
+    onnx_model = OnnxCrossEncoder(model_dir, quantize=True, onnx_dir=str(tmp_path), max_length=128)
+
+    scores = onnx_model.predict(PAIRS)
+    assert scores.shape == expected.shape
+    assert np.max(np.abs(scores - expected)) < 0.05
+
+def test_predict_without_pairs_returns_empty(model_dir, tmp_path):
+    onnx_model = OnnxCrossEncoder(model_dir, quantize=False, onnx_dir=str(tmp_path), max_length=128)
+
+    assert onnx_model.predict([]).shape == (0,)
@@ -0,0 +1,65 @@
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+
+from utils.scrape import async_scraper
+from utils.scrape.page_cache import PageCache, PageCacheSettings
+
+URL = 'https://example.com/article'
+BODY = b'<html><body><p>An article about caching.</p></body></html>'
+DOCUMENT = {'texts': 'An article about caching.'}
+
+@pytest.fixture
+def cache(tmp_path):
+    return PageCache(PageCacheSettings(page_cache_path=str(tmp_path / 'pages.db')))
+
+def test_store_html_records_validators_and_deduplicates_bodies(cache):
+    content_hash = cache.store_html(URL, BODY, etag='"v1"', last_modified='Wed, 01 Jan 2025 00:00:00 GMT')
+    mirror_hash = cache.store_html('https://mirror.example.com/article', BODY)
+
+    entry = cache.lookup(URL)
+    assert content_hash == mirror_hash == hashlib.sha256(BODY).hexdigest()
+    assert entry['etag'] == '"v1"' and entry['content_hash'] == content_hash
+    assert cache.is_fresh(entry)
+    assert cache.html.stats()['entries'] == 1
+
+def test_conditional_headers_need_the_cached_body(cache):
+    content_hash = cache.store_html(URL, BODY, etag='"v1"', last_modified='Wed, 01 Jan 2025 00:00:00 GMT')
+    entry = cache.lookup(URL)
+
+    assert cache.conditional_headers(entry) == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Wed, 01 Jan 2025 00:00:00 GMT',
+    }
+
+    cache.html.delete(content_hash)
+    assert cache.conditional_headers(entry) == {}
+    assert cache.conditional_headers(None) == {}
+
+def test_not_modified_response_reuses_the_cached_document(cache):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get('If-None-Match') == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=BODY, headers={'ETag': '"v1"'})
+
+    async def fetch_twice():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await async_scraper.fetch_document_async(client, cache, URL, cache.lookup(URL))
+            entry = cache.lookup(URL)
+            entry['fetched_at'] -= 3600
+            second = await async_scraper.fetch_document_async(client, cache, URL, entry)
+            return first, second
+
+    cache.store_document(hashlib.sha256(BODY).hexdigest(), DOCUMENT)
+    first, second = asyncio.run(fetch_twice())
+
+    assert first == second == DOCUMENT
+    assert 'If-None-Match' not in requests[0].headers
+    assert requests[1].headers['If-None-Match'] == '"v1"'
+    assert cache.is_fresh(cache.lookup(URL))
+    assert cache.html.stats()['entries'] == 1
@@ -0,0 +1,88 @@
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from utils import search_web
+from utils.cache import SQLiteCache
+from utils.search_web import SearchBudget, canonicalize_url, search_many
+
+@pytest.mark.parametrize('url, canonical', [
+    ("http://www.Example.com/page/", "https://example.com/page"),
+    ("https://example.com:443/page#section", "https://example.com/page"),
+    ("https://example.com:8080/page", "https://example.com:8080/page"),
+    ("https://example.com/?utm_source=x&b=2&a=1&fbclid=y", "https://example.com/?a=1&b=2"),
+    ("https://example.com", "https://example.com/"),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+def test_canonicalize_url_keeps_distinct_pages_apart():
+    assert canonicalize_url("https://example.com/a?id=1") != canonicalize_url("https://example.com/a?id=2")
+    assert canonicalize_url("https://example.com/a") != canonicalize_url("https://example.org/a")
+
+def test_budget_stops_at_its_limit():
+    budget = SearchBudget(2)
+
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+    assert budget.used == 2
+
+def test_budget_without_limit():
+    budget = SearchBudget(None)
+
+    assert all(budget.try_spend() for _ in range(100))
+    assert budget.used == 100
+
+@pytest.fixture
+def search_api(tmp_path, monkeypatch):
+    """
+    Points search_many at a fresh cache and a mock Custom Search API.
+
+    Every query has 30 results, `https://<query>.example.com/<rank>`, served 10 per page.
+    """
+    state = {'requests': []}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        params = {name: values[0] for name, values in parse_qs(request.url.query.decode()).items()}
+        state['requests'].append((params['q'], int(params['start'])))
+        start = int(params['start'])
+        items = [{'link': f"https://{params['q']}.example.com/{rank}"} for rank in range(start, min(start + 10, 31))]
+        return httpx.Response(200, json={'items': items})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = SQLiteCache(str(tmp_path / 'search.db'), table='search_results')
+    monkeypatch.setenv('SEARCH_KEY', 'key')
+    monkeypatch.setenv('SEARCH_ID', 'id')
+    monkeypatch.setattr(search_web, 'get_http_client', lambda: client)
+    monkeypatch.setattr(search_web, 'get_search_cache', lambda: cache)
+    return state
+
+def test_merges_queries_by_rank(search_api):
+    links = asyncio.run(search_many(['alpha', 'beta']))
+
+    assert links[:4] == [
+        "https://alpha.example.com/1", "https://beta.example.com/1",
+        "https://alpha.example.com/2", "https://beta.example.com/2",
+    ]
+    assert len(links) == 20
+
+def test_budget_is_spent_on_first_pages_first(search_api):
+    links = asyncio.run(search_many(['alpha', 'beta'], results_per_query=20, budget=SearchBudget(2)))
+
+    assert sorted(search_api['requests']) == [('alpha', 1), ('beta', 1)]
+    assert len(links) == 20
+
+def test_cache_hit_needs_enough_results(search_api):
+    asyncio.run(search_many(['alpha'], results_per_query=10))
+    asyncio.run(search_many(['Alpha'], results_per_query=10))
+    assert search_api['requests'] == [('alpha', 1)]
+
+    links = asyncio.run(search_many(['alpha'], results_per_query=20))
+    assert len(links) == 20
+    assert len(search_api['requests']) == 3
+
+    # The entry fetched for 20 results also serves smaller requests.
+    links = asyncio.run(search_many(['alpha'], results_per_query=10))
+    assert links == [f"https://alpha.example.com/{rank}" for rank in range(1, 11)]
+    assert len(search_api['requests']) == 3
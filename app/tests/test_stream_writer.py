@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from utils.stream_writer import StreamWriter
+
+class FakeWebSocket:
+    """
+    Records the frames sent to it. While `gate` is cleared, send_json waits for it to be set.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send_json(self, frame):
+        await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        self.frames.append(frame)
+
+def tokens(frames):
+    return [frame['content'] for frame in frames if frame['type'] == 'token']
+
+def test_tokens_under_flush_bytes_wait_for_the_interval():
+    async def run():
+        websocket = FakeWebSocket()
+        writer = StreamWriter(websocket, flush_interval=0.1, flush_bytes=100)
+        for word in ['a ', 'b ', 'c ']:
+            await writer.write(word)
+        await asyncio.sleep(0.05)
+        before_interval = list(websocket.frames)
+        await asyncio.sleep(0.1)
+        await writer.close()
+        return before_interval, websocket.frames
+
+    before_interval, frames = asyncio.run(run())
+
+    assert before_interval == []
+    assert frames == [{'type': 'token', 'content': 'a b c '}]
+
+def test_flush_bytes_sends_without_waiting():
+    async def run():
+        websocket = FakeWebSocket()
+        writer = StreamWriter(websocket, flush_interval=10, flush_bytes=4)
+        for word in ['ab', 'cd']:
+            await writer.write(word)
+        await asyncio.sleep(0.01)
+        await writer.write('e')
+        await asyncio.sleep(0.01)
+        sent = list(websocket.frames)
+        await writer.drain()
+        await writer.close()
+        return sent, websocket.frames
+
+    sent, frames = asyncio.run(run())
+
+    assert tokens(sent) == ['abcd']
+    assert tokens(frames) == ['abcd', 'e']
+
+def test_write_blocks_at_max_buffer_bytes_until_the_client_drains():
+    async def run():
+        websocket = FakeWebSocket()
+        websocket.gate.clear()
+        writer = StreamWriter(websocket, flush_interval=0, flush_bytes=1, max_buffer_bytes=8)
+        await writer.write('abcd')
+        blocked = asyncio.create_task(writer.write('efgh'))
+        await asyncio.sleep(0.05)
+        was_blocked = not blocked.done()
+        websocket.gate.set()
+        await asyncio.wait_for(blocked, 1)
+        await writer.drain()
+        await writer.close()
+        return was_blocked, websocket.frames
+
+    was_blocked, frames = asyncio.run(run())
+
+    assert was_blocked
+    assert ''.join(tokens(frames)) == 'abcdefgh'
+
+def test_slow_client_fails_the_next_call():
+    async def run():
+        writer = StreamWriter(FakeWebSocket(delay=1), flush_interval=0, send_timeout=0.05)
+        await writer.write('hello')
+        await asyncio.sleep(0.1)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await writer.write('world')
+            with pytest.raises(asyncio.TimeoutError):
+                await writer.end()
+        finally:
+            await writer.close()
+
+    asyncio.run(run())
+
+def test_error_frame_follows_the_tokens_written_before_it():
+    async def run():
+        websocket = FakeWebSocket()
+        writer = StreamWriter(websocket, flush_interval=10, flush_bytes=100)
+        await writer.think('Searching')
+        await writer.write('partial ')
+        await writer.write('answer')
+        await writer.error('Something went wrong.')
+        await writer.drain()
+        await writer.close()
+        return websocket.frames
+
+    frames = asyncio.run(run())
+
+    assert frames == [
+        {'type': 'think', 'message': 'Searching'},
+        {'type': 'token', 'content': 'partial answer'},
+        {'type': 'error', 'message': 'Something went wrong.'},
+    ]
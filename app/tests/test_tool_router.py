@@ -0,0 +1,76 @@
+import pytest
+
+from benchmarks.common import load_cases
+from utils.tool_router import DEFAULT_MIN_MARGIN, RouterSettings, ToolRouter, is_standalone_search
+
+ROUTING_CASES = load_cases('benchmarks/routing_cases.json')
+# Measured on benchmarks/routing_cases.json with the bag-of-words test embedder:
+# 67 of the 70 messages are decided locally at the default margin, all of them correctly,
+# while a margin of 0 decides all 70 and sends "What is 12 times 14?" to web search.
+MIN_PRECISION = 1.0
+MIN_COVERAGE = 0.95
+
+def measure(router: ToolRouter):
+    decisions = [(router.route(case['query']), case['expected_tool']) for case in ROUTING_CASES]
+    decided = [(decision.tool, expected) for decision, expected in decisions if decision is not None]
+    precision = sum(tool == expected for tool, expected in decided) / len(decided)
+    return precision, len(decided) / len(decisions)
+
+def test_routing_cases_are_labelled():
+    assert {case['expected_tool'] for case in ROUTING_CASES} == {'gen_query', 'respond_directly'}
+
+def test_keyword_rules_are_never_wrong(word_embedder):
+    router = ToolRouter(word_embedder)
+
+    for case in ROUTING_CASES:
+        tool = router._keyword_route(case['query'])
+        assert tool in (None, case['expected_tool']), case['query']
+
+def test_default_margin_keeps_the_measured_precision(word_embedder):
+    precision, coverage = measure(ToolRouter(word_embedder, min_margin=DEFAULT_MIN_MARGIN))
+
+    assert precision >= MIN_PRECISION
+    assert coverage >= MIN_COVERAGE
+    assert RouterSettings().tool_router_min_margin == DEFAULT_MIN_MARGIN
+
+def test_no_margin_costs_precision(word_embedder):
+    precision, coverage = measure(ToolRouter(word_embedder, min_margin=0.0))
+
+    assert coverage == 1.0
+    assert precision < MIN_PRECISION
+
+def test_default_margin_with_the_embedding_model():
+    """
+    The same gate with the production embedding model, when it is available locally.
+    """
+    huggingface_hub = pytest.importorskip('huggingface_hub')
+    from utils.embedder import DEFAULT_EMBEDDING_MODEL, Embedder
+
+    if not isinstance(huggingface_hub.try_to_load_from_cache(DEFAULT_EMBEDDING_MODEL, 'config.json'), str):
+        pytest.skip(f"{DEFAULT_EMBEDDING_MODEL} is not downloaded.")
+
+    precision, coverage = measure(ToolRouter(Embedder(), min_margin=DEFAULT_MIN_MARGIN))
+
+    assert precision >= 0.95
+    assert coverage >= 0.8
+
+def test_router_is_enabled_by_default():
+    assert RouterSettings().tool_router_enabled
+
+@pytest.mark.parametrize('message', [
+    "Latest news about the Mars rover",
+    "Search the web for reviews of the Framework laptop.",
+    "What did the Federal Reserve announce this week?",
+])
+def test_standalone_searches(message):
+    assert is_standalone_search(message)
+
+@pytest.mark.parametrize('message', [
+    "How old is he?",
+    "What is his latest album?",
+    "Look it up.",
+    "Is that still true today?",
+    "Who won the Nobel Prize in Literature?",
+])
+def test_follow_ups_that_need_the_conversation(message):
+    assert not is_standalone_search(message)
@@ -1,6 +1,18 @@
-from .search_web import make_custom_search
-from .scrape import scrape_web
-from .summary import DocSummarizer
+from .search_web import search_many, canonicalize_url, SearchBudget, SearchSettings
+from .scrape import scrape_web, scrape_web_stream, close_http_client, shutdown_extraction_executor, ScrapeSettings
+from .summary import DocSummarizer, ExtractiveSummarizer, SummarizerSettings, build_doc_summarizer
 from .summary import LLMSummaryGenerator
-from .generate_query import gen_query
-from .doc_reranker import DocReranker
\ No newline at end of file
+from .summary import ContextPacker, ContextSettings, build_context_packer
+from .generate_query import gen_query, gen_query_variants
+from .doc_reranker import DocReranker, RerankerSettings
+from .score_cache import ScoreCache
+from .llm_client import LLMClient, LLMPoolSettings, get_llm_client, close_llm_client
+from .embedder import Embedder
+from .vector_index import VectorIndex
+from .answer_cache import AnswerCache, is_cacheable_question, iter_answer_chunks
+from .local_index import LocalIndex
+from .tool_router import ToolRouter, RouteDecision, is_standalone_search
+from .speculative_search import SpeculativeSearch, start_speculative_search
+from .stream_writer import StreamWriter, StreamSettings, build_stream_writer
+from .dedup import NearDuplicateFilter, build_near_duplicate_filter
+from .model_registry import ModelLoadError, ModelRegistry, get_model_registry
\ No newline at end of file
@@ -0,0 +1,216 @@
+import base64
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .cache import DEFAULT_CACHE_DIR, SQLiteCache
+from .embedder import Embedder
+from .search_web import normalize_query
+from .tool_router import RECENCY
+from .vector_index import DEFAULT_NPROBE, VectorIndex
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/answer_cache.log'
+)
+
+DEFAULT_ANSWER_CACHE_THRESHOLD = 0.92
+DEFAULT_ANSWER_CACHE_CANDIDATES = 4
+
+class AnswerCacheSettings(BaseSettings):
+    """
+    Settings for the semantic cache of answers to web-search questions.
+    """
+    answer_cache_enabled: bool = Field(True, description="Replay stored answers to near-duplicate questions")
+    answer_cache_path: str = Field(f"{DEFAULT_CACHE_DIR}/answers.db", description="SQLite file holding cached answers")
+    answer_cache_threshold: float = Field(DEFAULT_ANSWER_CACHE_THRESHOLD, description="Cosine similarity above which two questions share an answer")
+    answer_cache_ttl_seconds: float = Field(6 * 60 * 60, description="How long a cached answer stays valid")
+    answer_cache_max_entries: int = Field(100_000, description="Maximum number of cached answers")
+    answer_cache_nprobe: int = Field(DEFAULT_NPROBE, description="Index lists scored per lookup")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+def is_cacheable_question(question: str, prior_messages: int) -> bool:
+    """
+    Returns whether the answer to a question may be served from or stored in the answer cache.
+
+    A question asked after earlier messages may depend on them ("how old is
+    he?"), and a time-sensitive one ("weather today") goes stale long before
+    the TTL, so neither is cached.
+
+    Args:
+        question (str): The latest user message.
+        prior_messages (int): The number of messages in the conversation before it.
+    """
+    return prior_messages == 0 and not RECENCY.search(question)
+
+def iter_answer_chunks(answer: str) -> Iterator[str]:
+    """
+    Splits a stored answer into word-sized chunks, so a replay is streamed
+    to the client the same way as a freshly generated answer.
+    """
+    for match in re.finditer(r"\s*\S+\s*", answer):
+        yield match.group(0)
+
+class AnswerCache:
+    """
+    Caches final answers and serves them for semantically similar questions.
+
+    Questions are embedded and matched against previously answered ones in a
+    VectorIndex. A match above the similarity threshold whose answer is still
+    within its TTL is a hit. Answers live in a SQLite table together with the
+    question embedding, so the index is rebuilt from disk on startup.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        path: str,
+        threshold: float = DEFAULT_ANSWER_CACHE_THRESHOLD,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        nprobe: int = DEFAULT_NPROBE,
+    ):
+        """
+        Initializes the AnswerCache and loads the stored answers into the index.
+
+        Args:
+            embedder (Embedder): Embeds the questions.
+            path (str): Path to the SQLite database file.
+            threshold (float): Minimum cosine similarity between questions for a hit.
+            ttl_seconds (Optional[float]): Lifetime of a cached answer. None keeps answers until evicted.
+            max_entries (Optional[int]): Maximum number of cached answers. None disables the limit.
+            nprobe (int): Index lists scored per lookup.
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1].")
+
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.nprobe = nprobe
+        self.hits = 0
+        self.misses = 0
+        self._store = SQLiteCache(path, table='answers', ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self._lock = threading.Lock()
+        self._build_index()
+
+    def _build_index(self) -> None:
+        """
+        (Re)builds the in-memory index from the stored answers made with the current embedder.
+        """
+        index = VectorIndex(self.embedder.dim, nprobe=self.nprobe)
+        keys: List[str] = []
+        vectors: List[np.ndarray] = []
+        for key, value in self._store.items():
+            entry = json.loads(value)
+            if entry.get('model') != self.embedder.model_name:
+                continue
+            keys.append(key)
+            vectors.append(np.frombuffer(base64.b64decode(entry['embedding']), dtype=np.float32))
+
+        if vectors:
+            index.add(np.stack(vectors))
+        with self._lock:
+            self._index = index
+            self._keys = keys
+            self._rows = {key: row for row, key in enumerate(keys)}
+        logging.info(f"AnswerCache indexed {len(keys)} answers.")
+
+    @staticmethod
+    def make_key(question: str) -> str:
+        """
+        Builds the storage key of a question.
+        """
+        return hashlib.blake2b(normalize_query(question).encode('utf-8'), digest_size=16).hexdigest()
+
+    def lookup(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached answer for the most similar previous question, if similar enough.
+
+        Args:
+            question (str): The new question.
+
+        Returns:
+            Optional[Dict[str, Any]]: The matched 'question', its 'answer' and their 'similarity',
+                                      or None on a miss.
+        """
+        embedding = self.embedder.encode([question])[0]
+        with self._lock:
+            index, keys = self._index, self._keys
+        for row, similarity in index.search(embedding, k=DEFAULT_ANSWER_CACHE_CANDIDATES):
+            if similarity < self.threshold:
+                break
+            value = self._store.get(keys[row])
+            if value is None:
+                # Expired or evicted from the store; forget it in the index too.
+                index.remove([row])
+                continue
+            entry = json.loads(value)
+            self.hits += 1
+            logging.info(f"Answer cache hit ({similarity:.3f}): '{question}' matched '{entry['question']}'")
+            return {'question': entry['question'], 'answer': entry['answer'], 'similarity': similarity}
+
+        self.misses += 1
+        return None
+
+    def store(self, question: str, answer: str) -> None:
+        """
+        Caches the answer to a question, replacing any answer to the same normalized question.
+        """
+        if not answer.strip():
+            return
+
+        embedding = self.embedder.encode([question])[0]
+        key = self.make_key(question)
+        entry = {
+            'question': question,
+            'answer': answer,
+            'model': self.embedder.model_name,
+            'embedding': base64.b64encode(embedding.tobytes()).decode('ascii'),
+            'stored_at': time.time(),
+        }
+        self._store.set(key, json.dumps(entry).encode('utf-8'))
+
+        with self._lock:
+            if key in self._rows:
+                self._index.remove([self._rows[key]])
+            self._keys.append(key)
+            self._rows[key] = int(self._index.add(embedding)[0])
+            needs_rebuild = self.max_entries is not None and len(self._keys) > 2 * self.max_entries
+
+        # Rows of evicted answers are only dropped lazily; compact once they dominate.
+        if needs_rebuild:
+            self._build_index()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit/miss counters and the number of indexed answers.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._index)}
+
+def build_answer_cache(embedder: Embedder) -> Optional[AnswerCache]:
+    """
+    Builds the AnswerCache configured by AnswerCacheSettings, or None when it is disabled.
+    """
+    settings = AnswerCacheSettings()
+    if not settings.answer_cache_enabled:
+        return None
+    return AnswerCache(
+        embedder,
+        path=settings.answer_cache_path,
+        threshold=settings.answer_cache_threshold,
+        ttl_seconds=settings.answer_cache_ttl_seconds,
+        max_entries=settings.answer_cache_max_entries,
+        nprobe=settings.answer_cache_nprobe,
+    )
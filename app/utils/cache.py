@@ -0,0 +1,246 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/cache.log'
+)
+
+DEFAULT_CACHE_DIR = 'cache'
+# Reads record their access time in memory. It is written with the next write, or by a read once this many are pending or the oldest is older than the interval.
+TOUCH_FLUSH_COUNT = 256
+TOUCH_FLUSH_INTERVAL_SECONDS = 30.0
+# SQLite limits the number of bound parameters per statement.
+MAX_KEYS_PER_QUERY = 500
+
+class SQLiteCache:
+    """
+    A small persistent key-value cache stored in a SQLite table.
+
+    Entries can expire after a TTL and the table is kept within an entry count
+    and/or a total byte size by evicting the least recently used entries first.
+    Several caches can share one database file by using different tables.
+
+    Reads do not write on every call: the access times that drive eviction
+    are kept in memory and written in one batch with the next write, or by
+    the read that finds 256 of them pending or the oldest older than 30
+    seconds. Expired entries read as misses and are deleted on the next
+    write.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = 'cache',
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """
+        Initializes the SQLiteCache and creates its table if needed.
+
+        Args:
+            path (str): Path to the SQLite database file.
+            table (str): Name of the table holding this cache's entries.
+            ttl_seconds (Optional[float]): Lifetime of an entry. None keeps entries until evicted.
+            max_entries (Optional[int]): Maximum number of entries kept. None disables the limit.
+            max_bytes (Optional[int]): Maximum total size of stored values. None disables the limit.
+        """
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid cache table name: '{table}'.")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._touched_since = 0.0
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+        self._conn.commit()
+        logging.info(f"SQLiteCache '{table}' opened at {path} (ttl={ttl_seconds}, max_entries={max_entries}, max_bytes={max_bytes})")
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the value stored under `key`, or None on a miss or expired entry.
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        """
+        Returns the unexpired values stored under any of `keys`, read with one query per 500 keys.
+        """
+        now = time.time()
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            if not self._touched:
+                self._touched_since = now
+            for start in range(0, len(unique_keys), MAX_KEYS_PER_QUERY):
+                batch = unique_keys[start:start + MAX_KEYS_PER_QUERY]
+                rows = self._conn.execute(
+                    f"SELECT key, value, created_at FROM {self.table} WHERE key IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, value, created_at in rows:
+                    if not self._expired(created_at, now):
+                        found[key] = value
+                        self._touched[key] = now
+
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+            if len(self._touched) >= TOUCH_FLUSH_COUNT or (self._touched and now - self._touched_since > TOUCH_FLUSH_INTERVAL_SECONDS):
+                self._flush_touches()
+                self._conn.commit()
+        return found
+
+    def contains(self, key: str) -> bool:
+        """
+        Returns whether an unexpired entry is stored under `key`, without counting a hit or miss.
+        """
+        with self._lock:
+            row = self._conn.execute(f"SELECT created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        return row is not None and not self._expired(row[0], time.time())
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Stores `value` under `key`, replacing any previous entry, then applies eviction.
+        """
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Sequence[Tuple[str, bytes]]) -> None:
+        """
+        Stores every (key, value) pair and applies eviction in a single transaction.
+        """
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._flush_touches()
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, value, len(value), now, now) for key, value in items]
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def flush(self) -> None:
+        """
+        Writes the pending access times of recent reads.
+        """
+        with self._lock:
+            if self._touched:
+                self._flush_touches()
+                self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """
+        Removes the entry stored under `key`, if any.
+        """
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the hit/miss counters.
+        """
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            self._touched = {}
+            self.hits = 0
+            self.misses = 0
+
+    def items(self) -> List[Tuple[str, bytes]]:
+        """
+        Returns every unexpired (key, value) pair, oldest first, without counting hits.
+        """
+        now = time.time()
+        with self._lock:
+            if self.ttl_seconds is None:
+                rows = self._conn.execute(f"SELECT key, value FROM {self.table} ORDER BY created_at").fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE created_at >= ? ORDER BY created_at",
+                    (now - self.ttl_seconds,)
+                ).fetchall()
+        return rows
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit/miss counters of this process and the current table size.
+        """
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': entries,
+            'bytes': total_bytes,
+        }
+
+    def _flush_touches(self) -> None:
+        """
+        Writes the access times recorded by reads. Must be called with the lock held.
+        """
+        if self._touched:
+            self._conn.executemany(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched = {}
+
+    def _evict(self, now: float) -> None:
+        """
+        Drops expired entries, then least recently used ones until the limits hold.
+        Must be called with the lock held.
+        """
+        if self.ttl_seconds is not None:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        if self.max_entries is not None:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+        if self.max_bytes is not None:
+            total_bytes = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+            if total_bytes > self.max_bytes:
+                evicted = []
+                for key, size in self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at"):
+                    if total_bytes <= self.max_bytes:
+                        break
+                    evicted.append((key,))
+                    total_bytes -= size
+                self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", evicted)
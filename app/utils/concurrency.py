@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, Tuple
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/concurrency.log'
+)
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+async def bounded_map(
+    func: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Applies an async function to every item with at most `max_concurrency`
+    calls in flight, yielding results in order of completion.
+
+    Items that fail or exceed `timeout` are logged and skipped, so the caller
+    always receives the partial results that did succeed. Once `deadline`
+    passes, or when the generator is closed early, every call that is still
+    pending is cancelled.
+
+    Args:
+        func: The coroutine function applied to each item.
+        items: The inputs to map over.
+        max_concurrency (int): The maximum number of calls running at once.
+        timeout (Optional[float]): Per-item timeout in seconds, measured from when
+                                   the item starts running. None disables it.
+        deadline (Optional[float]): Time budget in seconds for the whole map. None disables it.
+
+    Yields:
+        Tuple[int, Any]: The index of the item in `items` and its result.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1.")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run(index: int, item: Any) -> Tuple[int, Any, Optional[BaseException]]:
+        async with semaphore:
+            try:
+                return index, await asyncio.wait_for(func(item), timeout), None
+            except asyncio.TimeoutError as e:
+                return index, None, e
+            except Exception as e:
+                return index, None, e
+
+    tasks = [asyncio.create_task(_run(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=deadline):
+            try:
+                index, result, error = await next_done
+            except asyncio.TimeoutError:
+                pending = sum(1 for task in tasks if not task.done())
+                logging.warning(f"Deadline of {deadline} seconds reached. Abandoning {pending} pending items.")
+                return
+            if isinstance(error, asyncio.TimeoutError):
+                logging.warning(f"Item {index} timed out after {timeout} seconds. Skipping it.")
+                continue
+            if error is not None:
+                logging.error(f"Item {index} failed: {error}")
+                continue
+            yield index, result
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,173 @@
+import logging
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/dedup.log'
+)
+
+DEFAULT_DEDUP_THRESHOLD = 0.8
+DEFAULT_NUM_PERMUTATIONS = 128
+DEFAULT_SHINGLE_WORDS = 5
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+class DedupSettings(BaseSettings):
+    """
+    Deployment settings for near-duplicate document elimination.
+    """
+    dedup_enabled: bool = Field(True, description="Drop near-duplicate pages before reranking")
+    dedup_threshold: float = Field(DEFAULT_DEDUP_THRESHOLD, description="Estimated Jaccard similarity above which two pages are duplicates")
+    dedup_num_permutations: int = Field(DEFAULT_NUM_PERMUTATIONS, description="MinHash signature length")
+    dedup_shingle_words: int = Field(DEFAULT_SHINGLE_WORDS, description="Words per shingle")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+class NearDuplicateFilter:
+    """
+    Finds near-duplicate documents with MinHash and keeps one per cluster.
+
+    Each document is reduced to the set of its word shingles, and a MinHash
+    signature estimates the Jaccard similarity between two such sets.
+    Documents whose estimated similarity exceeds the threshold are linked,
+    and every connected group keeps only its longest member. Mirrors,
+    syndicated copies and exact repeats therefore cost a single rerank
+    and summary.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_DEDUP_THRESHOLD,
+        num_permutations: int = DEFAULT_NUM_PERMUTATIONS,
+        shingle_words: int = DEFAULT_SHINGLE_WORDS,
+        seed: int = 1,
+    ):
+        """
+        Initializes the NearDuplicateFilter.
+
+        Args:
+            threshold (float): Estimated Jaccard similarity above which two documents are duplicates.
+            num_permutations (int): The number of hash functions in a MinHash signature.
+            shingle_words (int): The number of consecutive words per shingle.
+            seed (int): Seed of the hash function coefficients.
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1].")
+        if num_permutations < 1 or shingle_words < 1:
+            raise ValueError("num_permutations and shingle_words must be at least 1.")
+
+        self.threshold = threshold
+        self.shingle_words = shingle_words
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd 64-bit multipliers, keeping the high 32 bits of the wrapped product.
+        self._a = rng.integers(0, 1 << 63, size=num_permutations, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_permutations, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._documents = 0
+        self._duplicates = 0
+        self._clusters = 0
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """
+        Returns the 32-bit hashes of a document's word shingles.
+        """
+        words = re.findall(r"\w+", text.lower())
+        if not words:
+            return np.zeros(1, dtype=np.uint64)
+
+        word_hashes = np.fromiter((zlib.crc32(word.encode('utf-8')) for word in words), dtype=np.uint64, count=len(words))
+        width = min(self.shingle_words, len(word_hashes))
+        count = len(word_hashes) - width + 1
+        shingles = np.zeros(count, dtype=np.uint64)
+        for offset in range(width):
+            shingles = (shingles * np.uint64(1_000_003) + word_hashes[offset:offset + count]) & MAX_HASH
+        return np.unique(shingles)
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Computes the MinHash signature of a document.
+        """
+        shingles = self._shingle_hashes(text)
+        hashed = (np.outer(shingles, self._a) + self._b) >> np.uint64(32)
+        return hashed.min(axis=0)
+
+    def clusters(self, texts: List[str]) -> List[List[int]]:
+        """
+        Groups documents into clusters of near-duplicates.
+
+        Args:
+            texts (List[str]): The document texts.
+
+        Returns:
+            List[List[int]]: The clusters as lists of indices into `texts`, ordered by their first member.
+        """
+        if not texts:
+            return []
+
+        signatures = np.stack([self.signature(text) for text in texts])
+        similarity = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+
+        parent = list(range(len(texts)))
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in zip(*np.nonzero(np.triu(similarity >= self.threshold, k=1))):
+            parent[find(int(i))] = find(int(j))
+
+        groups: Dict[int, List[int]] = {}
+        for index in range(len(texts)):
+            groups.setdefault(find(index), []).append(index)
+        return sorted(groups.values(), key=lambda group: group[0])
+
+    def deduplicate(self, texts: List[str]) -> List[int]:
+        """
+        Keeps one representative, the longest text, of each near-duplicate cluster.
+
+        Args:
+            texts (List[str]): The document texts.
+
+        Returns:
+            List[int]: The indices of the kept documents, in their original order.
+        """
+        clusters = self.clusters(texts)
+        kept = sorted(max(cluster, key=lambda index: len(texts[index])) for cluster in clusters)
+        duplicate_clusters = [cluster for cluster in clusters if len(cluster) > 1]
+
+        with self._lock:
+            self._documents += len(texts)
+            self._duplicates += len(texts) - len(kept)
+            self._clusters += len(duplicate_clusters)
+        if duplicate_clusters:
+            logging.info(f"Kept {len(kept)} of {len(texts)} documents; duplicate clusters: {duplicate_clusters}")
+        return kept
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns how many documents were seen, dropped as duplicates, and how many duplicate clusters were found.
+        """
+        with self._lock:
+            return {'documents': self._documents, 'duplicates': self._duplicates, 'clusters': self._clusters}
+
+def build_near_duplicate_filter() -> Optional[NearDuplicateFilter]:
+    """
+    Builds the NearDuplicateFilter configured by DedupSettings, or None when it is disabled.
+    """
+    settings = DedupSettings()
+    if not settings.dedup_enabled:
+        return None
+    return NearDuplicateFilter(
+        threshold=settings.dedup_threshold,
+        num_permutations=settings.dedup_num_permutations,
+        shingle_words=settings.dedup_shingle_words,
+    )
@@ -1,46 +1,309 @@
-from sentence_transformers import CrossEncoder
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from collections import defaultdict
 
+import numpy as np
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .score_cache import ScoreCache, DEFAULT_SCORE_CACHE_SIZE
+
+DEFAULT_MODEL_NAMES = [
+    'cross-encoder/ms-marco-MiniLM-L-12-v2',
+    'cross-encoder/ms-marco-TinyBERT-L-6',
+]
+RERANK_MODES = ('fusion', 'cascade')
+RERANK_BACKENDS = ('torch', 'onnx')
+
+class RerankerSettings(BaseSettings):
+    """
+    Deployment settings for DocReranker.
+    """
+    rerank_mode: str = Field('fusion', description="Either 'fusion' or 'cascade'")
+    rerank_cascade_top_k: int = Field(5, description="Documents rescored by the heavy model in cascade mode")
+    rerank_cascade_threshold: Optional[float] = Field(None, description="Cheap-model score below which documents are dropped")
+    rerank_passage_words: int = Field(128, description="Words per scored passage. 0 scores whole documents")
+    rerank_passage_overlap: int = Field(32, description="Words shared by consecutive passages")
+    rerank_top_passages: int = Field(4, description="Best passages kept per document")
+    rerank_backend: str = Field('torch', description="Either 'torch' or 'onnx'")
+    rerank_onnx_quantize: bool = Field(True, description="Serve int8 dynamically quantized ONNX models")
+    rerank_score_cache_size: int = Field(DEFAULT_SCORE_CACHE_SIZE, description="Scores kept by the reranker score cache")
+    rerank_score_cache_path: Optional[str] = Field(None, description="SQLite file persisting reranker scores. Unset keeps them in memory")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+def passage_spans(num_words: int, passage_words: int, overlap_words: int) -> List[Tuple[int, int]]:
+    """
+    Splits a run of words into overlapping [start, end) windows.
+
+    Args:
+        num_words (int): The number of words in the document.
+        passage_words (int): The number of words per window.
+        overlap_words (int): The number of words shared by consecutive windows.
+
+    Returns:
+        List[Tuple[int, int]]: The word spans, covering the whole document.
+    """
+    if num_words <= passage_words:
+        return [(0, num_words)]
+
+    stride = passage_words - overlap_words
+    spans = []
+    for start in range(0, num_words - overlap_words, stride):
+        spans.append((start, min(start + passage_words, num_words)))
+    return spans
+
 class DocReranker:
     """
     A class for reranking documents using multiple CrossEncoder models,
     combining their scores with Reciprocal Rank Fusion (RRF), and
     ordering the reranked documents in a specific pattern.
+
+    Two modes are supported:
+    - 'fusion' scores every document with every model and fuses the ranks with RRF.
+    - 'cascade' scores every document with the cheapest (last) model only and
+      sends the top `cascade_top_k` of them to the heaviest (first) model.
+
+    Documents are split into overlapping passages that fit the CrossEncoders'
+    input window. A document scores as its best passage, and only its top
+    passages are returned, so the summarizer receives the relevant parts of
+    each page instead of the whole page.
+
+    The CrossEncoders run on PyTorch by default. With backend='onnx' they are
+    exported to ONNX (optionally int8 quantized) and served by ONNX Runtime,
+    which is faster and lighter on CPU-only machines.
+
+    When a ScoreCache is given, only (query, passage) pairs it has not seen
+    for a model are sent to that model, as a single batch.
     """
-    def __init__(self):
+    def __init__(
+        self,
+        model_names: Optional[List[str]] = None,
+        rrf_k: int = 60,
+        mode: str = 'fusion',
+        cascade_top_k: int = 5,
+        cascade_threshold: Optional[float] = None,
+        passage_words: int = 128,
+        passage_overlap: int = 32,
+        top_passages: int = 4,
+        backend: str = 'torch',
+        onnx_quantize: bool = True,
+        score_cache: Optional[ScoreCache] = None,
+    ):
         """
         Initializes the ProductionReranker with specified CrossEncoder models.
 
         Args:
-            model_names (List[str]): A list of Hugging Face model names for CrossEncoders.
-                                      All models should have the same architecture for consistent scoring.
+            model_names (Optional[List[str]]): A list of Hugging Face model names for CrossEncoders,
+                                      ordered from the heaviest to the cheapest model.
+                                      Defaults to MiniLM-L-12 followed by TinyBERT-L-6.
             rrf_k (int): The constant 'k' for the Reciprocal Rank Fusion formula.
                          A common value is 60.
+            mode (str): Either 'fusion' or 'cascade'.
+            cascade_top_k (int): In cascade mode, how many documents the heavy model rescores.
+            cascade_threshold (Optional[float]): In cascade mode, documents whose cheap-model score
+                         is below this value are dropped. None keeps every document.
+            passage_words (int): Words per scored passage. 0 scores whole documents.
+            passage_overlap (int): Words shared by consecutive passages.
+            top_passages (int): How many of a document's best passages are returned.
+            backend (str): Either 'torch' or 'onnx'.
+            onnx_quantize (bool): With the ONNX backend, whether to serve int8 quantized models.
+            score_cache (Optional[ScoreCache]): Cache of previously computed scores. None disables caching.
         """
-        model_1 = 'cross-encoder/ms-marco-MiniLM-L-12-v2'
-        model_2  = 'cross-encoder/ms-marco-TinyBERT-L-6'
-        model_names = [model_1, model_2]
+        if mode not in RERANK_MODES:
+            raise ValueError(f"Rerank mode must be one of {RERANK_MODES}.")
+        if cascade_top_k < 1:
+            raise ValueError("cascade_top_k must be at least 1.")
+        if passage_words and not (0 <= passage_overlap < passage_words):
+            raise ValueError("passage_overlap must be between 0 and passage_words.")
+        if top_passages < 1:
+            raise ValueError("top_passages must be at least 1.")
+        if backend not in RERANK_BACKENDS:
+            raise ValueError(f"Rerank backend must be one of {RERANK_BACKENDS}.")
+
+        self.model_names = model_names or DEFAULT_MODEL_NAMES
+        self.backend = backend
+        if backend == 'onnx':
+            from .onnx_cross_encoder import OnnxCrossEncoder
 
-        self.models = [CrossEncoder(model_name) for model_name in model_names]
-        self.rrf_k = 60
+            self.models = [OnnxCrossEncoder(model_name, quantize=onnx_quantize) for model_name in self.model_names]
+            backend_key = 'onnx-int8' if onnx_quantize else 'onnx'
+        else:
+            from sentence_transformers import CrossEncoder
 
-    def _get_ranks(self, query: str, docs: List[str], model_index: int) -> Dict[str, int]:
+            self.models = [CrossEncoder(model_name) for model_name in self.model_names]
+            backend_key = 'torch'
+        self.model_keys = [f"{backend_key}:{model_name}" for model_name in self.model_names]
+        self.score_cache = score_cache
+        self.rrf_k = rrf_k
+        self.mode = mode
+        self.cascade_top_k = cascade_top_k
+        self.cascade_threshold = cascade_threshold
+        self.passage_words = passage_words
+        self.passage_overlap = passage_overlap
+        self.top_passages = top_passages
+
+    def _predict(self, query: str, docs: List[str], model_index: int) -> np.ndarray:
+        """
+        Internal method to score every document against the query with one model.
+
+        Scores found in the score cache are reused; the remaining pairs are
+        scored in one batch and added to the cache.
+        """
+        if not docs:
+            return np.empty(0, dtype=np.float32)
+
+        if self.score_cache is None:
+            query_doc_pairs = [(query, doc) for doc in docs]
+            scores = self.models[model_index].predict(query_doc_pairs, show_progress_bar=False)
+            return np.asarray(scores, dtype=np.float32)
+
+        keys = [ScoreCache.make_key(self.model_keys[model_index], query, doc) for doc in docs]
+        cached_scores = self.score_cache.get_many(keys)
+
+        scores = np.empty(len(docs), dtype=np.float32)
+        missing = []
+        for i, key in enumerate(keys):
+            if key in cached_scores:
+                scores[i] = cached_scores[key]
+            else:
+                missing.append(i)
+
+        if missing:
+            query_doc_pairs = [(query, docs[i]) for i in missing]
+            new_scores = self.models[model_index].predict(query_doc_pairs, show_progress_bar=False)
+            scores[missing] = np.asarray(new_scores, dtype=np.float32)
+            self.score_cache.set_many({keys[i]: float(scores[i]) for i in missing})
+
+        return scores
+
+    def _split_passages(self, doc: str) -> Tuple[List[str], List[Tuple[int, int]], List[str]]:
+        """
+        Internal method to split a document into passages.
+
+        Returns:
+            The document's words, the word span of each passage and the passage texts.
+        """
+        words = doc.split()
+        if not self.passage_words:
+            return words, [(0, len(words))], [doc]
+
+        spans = passage_spans(len(words), self.passage_words, self.passage_overlap)
+        return words, spans, [' '.join(words[start:end]) for start, end in spans]
+
+    def _score_passages(self, query: str, passages: List[List[str]], doc_indices: List[int], model_index: int) -> Dict[int, np.ndarray]:
+        """
+        Internal method to score the passages of several documents in one batch.
+
+        Returns:
+            Dict[int, np.ndarray]: The passage scores of each requested document index.
+        """
+        flat_passages = [passage for i in doc_indices for passage in passages[i]]
+        scores = self._predict(query, flat_passages, model_index)
+
+        passage_scores = {}
+        offset = 0
+        for i in doc_indices:
+            passage_scores[i] = scores[offset:offset + len(passages[i])]
+            offset += len(passages[i])
+        return passage_scores
+
+    def _get_ranks(self, query: str, passages: List[List[str]], model_index: int) -> Tuple[Dict[int, int], Dict[int, np.ndarray]]:
         """
         Internal method to get a dictionary of document ranks for a given model.
+
+        Returns:
+            The 1-based rank of each document index, and the passage scores used to compute it.
+        """
+        doc_indices = list(range(len(passages)))
+        passage_scores = self._score_passages(query, passages, doc_indices, model_index)
+        doc_scores = np.array([passage_scores[i].max() for i in doc_indices], dtype=np.float32)
+
+        order = np.argsort(-doc_scores, kind='stable')
+        doc_to_rank = {int(i): rank for rank, i in enumerate(order, start=1)}
+        return doc_to_rank, passage_scores
+
+    def _fusion_rerank(self, query: str, passages: List[List[str]]) -> Tuple[List[Tuple[int, float]], Dict[int, np.ndarray]]:
+        """
+        Internal method implementing the fusion mode.
+
+        Returns:
+            (document index, rrf_score) pairs sorted by score, and the passage scores
+            of the heaviest model for picking each document's best passages.
+        """
+        all_model_ranks: List[Dict[int, int]] = []
+        selection_scores: Dict[int, np.ndarray] = {}
+        for i in reversed(range(len(self.models))):
+            doc_to_rank, selection_scores = self._get_ranks(query, passages, i)
+            all_model_ranks.append(doc_to_rank)
+
+        rrf_scores = defaultdict(float)
+        for doc_index in range(len(passages)):
+            for model_ranks in all_model_ranks:
+                rank = model_ranks.get(doc_index)
+                if rank is not None:
+                    rrf_scores[doc_index] += 1.0 / (self.rrf_k + rank)
+
+        final_ranked_results = sorted(rrf_scores.items(), key=lambda x: x[1], reverse=True)
+        return final_ranked_results, selection_scores
+
+    def _cascade_rerank(self, query: str, passages: List[List[str]]) -> Tuple[List[Tuple[int, float]], Dict[int, np.ndarray]]:
+        """
+        Internal method implementing the cascade mode.
+
+        The cheapest model scores every document. Documents under the cut threshold
+        are dropped, the top `cascade_top_k` of the rest are reordered by the heaviest
+        model, and the remaining ones follow in cheap-model order. Scores are the RRF
+        contribution 1 / (rrf_k + rank) of the final position, so they stay comparable
+        with the fusion mode.
+
+        Returns:
+            (document index, score) pairs sorted by score, and the passage scores
+            of the heaviest model that saw each document.
+        """
+        doc_indices = list(range(len(passages)))
+        selection_scores = self._score_passages(query, passages, doc_indices, len(self.models) - 1)
+        light_scores = np.array([selection_scores[i].max() for i in doc_indices], dtype=np.float32)
+
+        order = [int(i) for i in np.argsort(-light_scores, kind='stable')]
+        if self.cascade_threshold is not None:
+            order = [i for i in order if light_scores[i] >= self.cascade_threshold]
+
+        candidates = order[:self.cascade_top_k]
+        heavy_passage_scores = self._score_passages(query, passages, candidates, 0)
+        selection_scores.update(heavy_passage_scores)
+        heavy_scores = np.array([heavy_passage_scores[i].max() for i in candidates], dtype=np.float32)
+        rescored = [candidates[i] for i in np.argsort(-heavy_scores, kind='stable')]
+
+        final_order = rescored + order[self.cascade_top_k:]
+        final_ranked_results = [(i, 1.0 / (self.rrf_k + rank)) for rank, i in enumerate(final_order, start=1)]
+        return final_ranked_results, selection_scores
+
+    def _condense(self, words: List[str], spans: List[Tuple[int, int]], doc: str, scores: np.ndarray) -> str:
+        """
+        Internal method to keep a document's best passages, merged and in reading order.
         """
-        query_doc_pairs = [(query, doc) for doc in docs]
-        scores = self.models[model_index].predict(query_doc_pairs)
+        if len(spans) <= self.top_passages:
+            return doc
 
-        ranked_docs_with_scores = sorted(zip(docs, scores), key=lambda x: x[1], reverse=True)
+        best = sorted(np.argsort(-scores, kind='stable')[:self.top_passages])
+        merged: List[List[int]] = []
+        for passage_index in best:
+            start, end = spans[passage_index]
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
 
-        doc_to_rank = {doc: i + 1 for i, (doc, _) in enumerate(ranked_docs_with_scores)}
-        return doc_to_rank
+        return '\n\n'.join(' '.join(words[start:end]) for start, end in merged)
 
     def rerank(self, query: str, docs: List[str]) -> List[Tuple[str, float]]:
         """
         Reranks a list of documents based on a query using all initialized models
-        and combines their scores with Reciprocal Rank Fusion (RRF).
+        and combines their scores with Reciprocal Rank Fusion (RRF), or with the
+        two-stage cascade when the reranker was created with mode='cascade'.
+
+        Each document is scored by its best passage and returned as the
+        concatenation of its `top_passages` best passages.
 
         Args:
             query (str): The search query.
@@ -51,20 +314,34 @@ class DocReranker:
                                   contains (document_text, rrf_score),
                                   sorted by 'rrf_score' in descending order.
         """
+        return [(text, score) for _, text, score in self.rerank_with_indices(query, docs)]
 
-        all_model_ranks: List[Dict[str, int]] = []
-        for i, _ in enumerate(self.models):
-            all_model_ranks.append(self._get_ranks(query, docs, i))
+    def rerank_with_indices(self, query: str, docs: List[str]) -> List[Tuple[int, str, float]]:
+        """
+        Same as `rerank`, but also returns the position of each document in `docs`.
 
-        rrf_scores = defaultdict(float)
-        for doc in docs:
-            for model_ranks in all_model_ranks:
-                rank = model_ranks.get(doc)
-                if rank is not None:
-                    rrf_scores[doc] += 1.0 / (self.rrf_k + rank)
+        The condensed text of a document depends on which passages the scoring
+        picked, so comparing rankings should use these indices, not the texts.
 
-        final_ranked_results = sorted(rrf_scores.items(), key=lambda x: x[1], reverse=True)
+        Returns:
+            List[Tuple[int, str, float]]: (doc_index, condensed_text, score) tuples, best first.
+        """
+        if not docs:
+            return []
+
+        split_docs = [self._split_passages(doc) for doc in docs]
+        passages = [doc_passages for _, _, doc_passages in split_docs]
+
+        if self.mode == 'cascade':
+            ranked_indices, selection_scores = self._cascade_rerank(query, passages)
+        else:
+            ranked_indices, selection_scores = self._fusion_rerank(query, passages)
 
+        final_ranked_results = []
+        for doc_index, score in ranked_indices:
+            words, spans, _ = split_docs[doc_index]
+            text = self._condense(words, spans, docs[doc_index], selection_scores[doc_index])
+            final_ranked_results.append((doc_index, text, score))
         return final_ranked_results
 
     def order_reranked_results(self, reranked_results: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
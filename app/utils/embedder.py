@@ -0,0 +1,64 @@
+import logging
+from typing import List
+
+import numpy as np
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/embedder.log'
+)
+
+DEFAULT_EMBEDDING_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+DEFAULT_EMBEDDING_BATCH_SIZE = 32
+
+class EmbedderSettings(BaseSettings):
+    """
+    Deployment settings for the Embedder.
+    """
+    embedding_model_name: str = Field(DEFAULT_EMBEDDING_MODEL, description="SentenceTransformer model used for question and document embeddings")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+class Embedder:
+    """
+    Embeds text into L2-normalized vectors with a SentenceTransformer bi-encoder.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
+        """
+        Initializes the Embedder and loads its model.
+
+        Args:
+            model_name (str): Hugging Face name or local path of the SentenceTransformer model.
+        """
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        logging.info(f"Embedder loaded {model_name} ({self.dim} dimensions)")
+
+    def encode(self, texts: List[str], batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        """
+        Embeds texts.
+
+        Args:
+            texts (List[str]): The texts to embed.
+            batch_size (int): The number of texts per forward pass.
+
+        Returns:
+            np.ndarray: A (len(texts), dim) float32 array of unit vectors.
+        """
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32)
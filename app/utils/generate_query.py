@@ -1,9 +1,12 @@
 import logging
 import os
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, List, Optional
 
 import ollama
 
+from .llm_client import get_llm_client
+
 #--- Logging Setup ---#
 logging.basicConfig(
     level=logging.INFO,
@@ -24,7 +27,22 @@ User has given this query to make a web search. Can you expand the query to make
 '{query}'
 """
 
-def gen_query(query: str) -> Optional[str]:
+QUERY_VARIANTS_PROMPT_TEMPLATE = """
+User has given this query to make a web search. Can you write {count} different web search queries that together find what the user is looking for.
+
+** Additional Guidelines: **
+- Answer with only the queries, one per line, and nothing else.
+- The first query should be the best expansion of the user's query.
+- The other queries should use different wording or focus on a different aspect of the query.
+- Don't make them long, keep each query concise.
+
+** Query to Expand **
+'{query}'
+"""
+
+LIST_MARKER = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)])\s*")
+
+async def gen_query(query: str) -> Optional[str]:
     """
     Expands a given query using an Ollama language model to make it more suitable for web search.
 
@@ -42,7 +60,7 @@ def gen_query(query: str) -> Optional[str]:
     
     try:
         logging.info(f"Attempting to expand query: '{query}' using model 'llama3.2'")
-        response = ollama.chat(
+        response = await get_llm_client().chat(
             model='llama3.2',
             messages=[
                 {'role': 'user', 'content': prompt_message}
@@ -68,4 +86,62 @@ def gen_query(query: str) -> Optional[str]:
         return None
     except Exception as e:
         logging.exception(f"An unexpected error occurred during query expansion for '{query}': {e}")
-        return None
\ No newline at end of file
+        return None
+
+def parse_query_variants(content: str, count: int) -> List[str]:
+    """
+    Extracts up to `count` distinct queries from an LLM answer with one query per line.
+    """
+    variants: List[str] = []
+    seen = set()
+    for line in content.splitlines():
+        variant = LIST_MARKER.sub('', line).strip().strip('\'"').strip()
+        if variant and variant.lower() not in seen:
+            seen.add(variant.lower())
+            variants.append(variant)
+    return variants[:count]
+
+async def gen_query_variants(query: str, count: int = 3) -> List[str]:
+    """
+    Expands a query into several web search queries with a single LLM call.
+
+    Args:
+        query (str): The initial query provided by the user.
+        count (int): The number of queries to generate.
+
+    Returns:
+        List[str]: The queries, best expansion first. Falls back to the single
+                   expansion of `gen_query` if the answer holds no query, and is
+                   empty if that fails too.
+    """
+    if not query or not isinstance(query, str):
+        logging.error("Invalid input: Query must be a non-empty string.")
+        return []
+    if count <= 1:
+        expanded = await gen_query(query)
+        return [expanded] if expanded else []
+
+    prompt_message = QUERY_VARIANTS_PROMPT_TEMPLATE.format(query=query, count=count)
+    try:
+        logging.info(f"Attempting to generate {count} query variants for: '{query}' using model 'llama3.2'")
+        response = await get_llm_client().chat(
+            model='llama3.2',
+            messages=[
+                {'role': 'user', 'content': prompt_message}
+            ],
+            options={
+                'temperature': 0.1,
+            },
+            stream=False,
+        )
+        variants = parse_query_variants(response.get('message', {}).get('content', ''), count)
+    except Exception as e:
+        logging.exception(f"Failed to generate query variants for '{query}': {e}")
+        variants = []
+
+    if not variants:
+        expanded = await gen_query(query)
+        return [expanded] if expanded else []
+
+    logging.info(f"Expanded query: '{query}' to {variants}")
+    return variants
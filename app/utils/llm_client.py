@@ -0,0 +1,397 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+
+import httpx
+import ollama
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/llm_client.log'
+)
+
+DEFAULT_MODEL_NAME = 'llama3.2'
+DEFAULT_MAX_CONCURRENCY_PER_HOST = 2
+DEFAULT_HEALTH_CHECK_INTERVAL = 15.0
+DEFAULT_FAILURE_COOLDOWN = 30.0
+HEALTH_CHECK_TIMEOUT = 5.0
+# Keeps models loaded between requests; Ollama's own default unloads them after 5 minutes idle.
+DEFAULT_KEEP_ALIVE = '30m'
+# Fits the answer prompt (3000 context tokens plus instructions) and its output. Ollama reloads a
+# model whenever num_ctx changes, so every call uses the same value.
+DEFAULT_NUM_CTX = 8192
+
+# Errors that say nothing about the request itself, so another host may well succeed.
+FAILOVER_ERRORS = (ConnectionError, httpx.TransportError)
+
+class LLMPoolSettings(BaseSettings):
+    """
+    Settings for the pool of Ollama hosts serving every LLM call, and for how models are kept loaded.
+    """
+    llm_hosts: str = Field('', description="Comma-separated Ollama host URLs; empty uses OLLAMA_HOST or the ollama default")
+    llm_max_concurrency_per_host: int = Field(DEFAULT_MAX_CONCURRENCY_PER_HOST, description="Requests sent to one host at a time; more wait their turn")
+    llm_health_check_interval_seconds: float = Field(DEFAULT_HEALTH_CHECK_INTERVAL, description="Seconds between background health checks; 0 disables them")
+    llm_failure_cooldown_seconds: float = Field(DEFAULT_FAILURE_COOLDOWN, description="How long a failed host receives no traffic")
+    llm_keep_alive: str = Field(DEFAULT_KEEP_ALIVE, description="How long Ollama keeps a model loaded after a request, e.g. '30m'; a negative duration such as '-1m' pins it")
+    llm_num_ctx: Optional[int] = Field(DEFAULT_NUM_CTX, description="Context window of every call. Unset uses the model default")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+def parse_hosts(hosts: str) -> List[Optional[str]]:
+    """
+    Splits a comma-separated host list. An empty list yields the ollama default host.
+    """
+    parsed = [host.strip() for host in hosts.split(',') if host.strip()]
+    return parsed or [None]
+
+def is_failover_error(error: Exception) -> bool:
+    """
+    Returns whether a failed request should be retried on another host.
+    """
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code >= 500
+    return isinstance(error, FAILOVER_ERRORS)
+
+class LLMEndpoint:
+    """
+    One Ollama host of the pool, with its concurrency limit and health.
+    """
+
+    def __init__(self, host: Optional[str], max_concurrency: int):
+        """
+        Initializes the LLMEndpoint.
+
+        Args:
+            host (Optional[str]): The Ollama host URL, or None for the ollama default.
+            max_concurrency (int): Requests sent to this host at a time.
+        """
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.client = ollama.AsyncClient(host=host)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.outstanding = 0
+        self.healthy = True
+        self.retry_at = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def name(self) -> str:
+        return self.host or 'default'
+
+    @property
+    def available(self) -> bool:
+        """
+        Whether the host may receive traffic: it is healthy, or its cooldown is over.
+        """
+        return self.healthy or time.monotonic() >= self.retry_at
+
+    @property
+    def load(self) -> float:
+        return self.outstanding / self.max_concurrency
+
+    def mark_failed(self, cooldown: float, error: Exception) -> None:
+        if self.healthy:
+            logging.warning(f"LLM host {self.name} marked unhealthy: {error!r}")
+        self.healthy = False
+        self.failures += 1
+        self.retry_at = time.monotonic() + cooldown
+
+    def mark_healthy(self) -> None:
+        if not self.healthy:
+            logging.info(f"LLM host {self.name} is healthy again.")
+        self.healthy = True
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'host': self.name,
+            'healthy': self.healthy,
+            'outstanding': self.outstanding,
+            'requests': self.requests,
+            'failures': self.failures,
+        }
+
+class LLMClient:
+    """
+    Sends chat requests to a pool of Ollama hosts shared by every LLM call site.
+
+    Each request goes to the available host with the fewest outstanding
+    requests relative to its concurrency limit, ties broken round-robin.
+    Requests beyond a host's limit wait on that host instead of overloading
+    it. A host that refuses connections or answers with a server error is
+    taken out of rotation for a cooldown and the request fails over to the
+    next host; a streamed response can only fail over before its first
+    chunk. A background task probes every host so recovered ones rejoin
+    the pool without waiting for real traffic.
+
+    Every request carries the same `keep_alive` and `num_ctx`, so models stay
+    loaded between requests and are never reloaded for a different context
+    size; a loaded model then reuses the evaluated tokens of a prompt prefix
+    it has just seen, such as a fixed system message.
+
+    Using the async client means a generation only suspends the coroutine that
+    requested it, so other websockets served by the same worker keep running.
+    """
+
+    def __init__(
+        self,
+        hosts: Optional[Sequence[Optional[str]]] = None,
+        model_name: str = DEFAULT_MODEL_NAME,
+        max_concurrency_per_host: int = DEFAULT_MAX_CONCURRENCY_PER_HOST,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+        failure_cooldown: float = DEFAULT_FAILURE_COOLDOWN,
+        keep_alive: Optional[Union[str, float]] = DEFAULT_KEEP_ALIVE,
+        num_ctx: Optional[int] = DEFAULT_NUM_CTX,
+    ):
+        """
+        Initializes the LLMClient.
+
+        Args:
+            hosts (Optional[Sequence[Optional[str]]]): The Ollama host URLs. Defaults to the ollama
+                                                       library default (OLLAMA_HOST or http://localhost:11434).
+            model_name (str): The model used when a call site does not pass one.
+            max_concurrency_per_host (int): Requests sent to one host at a time.
+            health_check_interval (float): Seconds between background health checks; 0 disables them.
+            failure_cooldown (float): Seconds a failed host receives no traffic.
+            keep_alive (Optional[Union[str, float]]): How long Ollama keeps a model loaded after a
+                                                      request. None uses the server default.
+            num_ctx (Optional[int]): Context window of every call. None uses the model default;
+                                     an explicit `num_ctx` option of a call takes precedence.
+        """
+        if not model_name:
+            raise ValueError("Model name cannot be empty.")
+        if max_concurrency_per_host < 1:
+            raise ValueError("max_concurrency_per_host must be at least 1.")
+
+        self.model_name = model_name
+        self.health_check_interval = health_check_interval
+        self.failure_cooldown = failure_cooldown
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.endpoints = [LLMEndpoint(host, max_concurrency_per_host) for host in (hosts or [None])]
+        self._turn = 0
+        self._health_task: Optional[asyncio.Task] = None
+        logging.info(f"LLMClient initialized for hosts: {[endpoint.name for endpoint in self.endpoints]}, model: {model_name}")
+
+    def _acquire(self, attempted: List[LLMEndpoint]) -> LLMEndpoint:
+        """
+        Picks the least loaded available host not yet attempted and counts the request against it.
+        """
+        start = self._turn % len(self.endpoints)
+        self._turn += 1
+        rotated = self.endpoints[start:] + self.endpoints[:start]
+        candidates = [endpoint for endpoint in rotated if endpoint not in attempted]
+        # With every host in cooldown, trying one beats failing outright.
+        available = [endpoint for endpoint in candidates if endpoint.available] or candidates
+
+        endpoint = min(available, key=lambda endpoint: endpoint.load)
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        return endpoint
+
+    def _should_fail_over(self, endpoint: LLMEndpoint, error: Exception, attempted: List[LLMEndpoint]) -> bool:
+        """
+        Records a failed request and returns whether to retry it on another host.
+        """
+        if not is_failover_error(error):
+            return False
+        endpoint.mark_failed(self.failure_cooldown, error)
+        attempted.append(endpoint)
+        if len(attempted) == len(self.endpoints):
+            return False
+        logging.info(f"Failing over from LLM host {endpoint.name} after {error!r}")
+        return True
+
+    async def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        stream: bool = False,
+    ) -> Union[Any, AsyncIterator[Any]]:
+        """
+        Sends a chat request to the pool without blocking the event loop.
+
+        Args:
+            messages (List[Dict[str, Any]]): The chat messages.
+            model (Optional[str]): The model to use. Defaults to `self.model_name`.
+            options (Optional[Dict[str, Any]]): Ollama generation options.
+            tools (Optional[List[Dict[str, Any]]]): Tool definitions for tool calling.
+            stream (bool): Whether to stream the response.
+
+        Returns:
+            The chat response, or an async iterator of response chunks when `stream` is True.
+        """
+        if self.num_ctx is not None:
+            options = {'num_ctx': self.num_ctx, **(options or {})}
+        request = {
+            'model': model or self.model_name,
+            'messages': messages,
+            'options': options,
+            'tools': tools,
+            'keep_alive': self.keep_alive,
+        }
+        if stream:
+            return self._stream_chat(request)
+
+        attempted: List[LLMEndpoint] = []
+        while True:
+            endpoint = self._acquire(attempted)
+            try:
+                async with endpoint.semaphore:
+                    response = await endpoint.client.chat(**request)
+            except Exception as error:
+                if self._should_fail_over(endpoint, error, attempted):
+                    continue
+                raise
+            finally:
+                endpoint.outstanding -= 1
+            endpoint.mark_healthy()
+            return response
+
+    async def _stream_chat(self, request: Dict[str, Any]) -> AsyncIterator[Any]:
+        """
+        Streams a chat response, holding the host's slot until the stream ends.
+        """
+        attempted: List[LLMEndpoint] = []
+        while True:
+            endpoint = self._acquire(attempted)
+            started = False
+            try:
+                async with endpoint.semaphore:
+                    response = await endpoint.client.chat(**request, stream=True)
+                    async for chunk in response:
+                        started = True
+                        yield chunk
+            except Exception as error:
+                if not started and self._should_fail_over(endpoint, error, attempted):
+                    continue
+                if started and is_failover_error(error):
+                    endpoint.mark_failed(self.failure_cooldown, error)
+                raise
+            finally:
+                endpoint.outstanding -= 1
+            endpoint.mark_healthy()
+            return
+
+    async def stream_content(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Streams only the non-empty text content of a chat response.
+
+        Args:
+            messages (List[Dict[str, Any]]): The chat messages.
+            model (Optional[str]): The model to use. Defaults to `self.model_name`.
+            options (Optional[Dict[str, Any]]): Ollama generation options.
+
+        Yields:
+            str: The content of each streamed chunk.
+        """
+        response = await self.chat(messages=messages, model=model, options=options, stream=True)
+        async for chunk in response:
+            content = chunk['message']['content']
+            if content:
+                yield content
+
+    async def check_health(self) -> None:
+        """
+        Probes every host once and updates its health.
+        """
+        async def probe(endpoint: LLMEndpoint) -> None:
+            try:
+                await asyncio.wait_for(endpoint.client.list(), timeout=HEALTH_CHECK_TIMEOUT)
+            except Exception as error:
+                endpoint.mark_failed(self.failure_cooldown, error)
+            else:
+                endpoint.mark_healthy()
+
+        await asyncio.gather(*(probe(endpoint) for endpoint in self.endpoints))
+
+    async def warm_up(self, model: Optional[str] = None) -> None:
+        """
+        Loads a model on every host, so the first request does not pay for loading it.
+        """
+        async def load(endpoint: LLMEndpoint) -> None:
+            try:
+                # A chat request without messages only loads the model.
+                await endpoint.client.chat(
+                    model=model or self.model_name,
+                    messages=[],
+                    options={'num_ctx': self.num_ctx} if self.num_ctx is not None else None,
+                    keep_alive=self.keep_alive,
+                )
+            except Exception as error:
+                logging.warning(f"Could not load {model or self.model_name} on LLM host {endpoint.name}: {error!r}")
+
+        await asyncio.gather(*(load(endpoint) for endpoint in self.endpoints))
+
+    async def _health_loop(self) -> None:
+        await self.warm_up()
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_check_interval)
+
+    def start_health_checks(self) -> None:
+        """
+        Loads the default model on every host, then probes the hosts in the
+        background. Must be called inside the running event loop.
+        """
+        if self.health_check_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self) -> None:
+        """
+        Stops the health checks.
+        """
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        Returns the health and load of every host.
+        """
+        return [endpoint.status() for endpoint in self.endpoints]
+
+_shared_client: Optional[LLMClient] = None
+
+def get_llm_client() -> LLMClient:
+    """
+    Returns the process-wide LLMClient configured by LLMPoolSettings, creating it on first use.
+
+    The client must be created inside the running event loop, so it is built
+    lazily rather than at import time.
+    """
+    global _shared_client
+    if _shared_client is None:
+        settings = LLMPoolSettings()
+        _shared_client = LLMClient(
+            hosts=parse_hosts(settings.llm_hosts),
+            max_concurrency_per_host=settings.llm_max_concurrency_per_host,
+            health_check_interval=settings.llm_health_check_interval_seconds,
+            failure_cooldown=settings.llm_failure_cooldown_seconds,
+            keep_alive=settings.llm_keep_alive,
+            num_ctx=settings.llm_num_ctx,
+        )
+    return _shared_client
+
+async def close_llm_client() -> None:
+    """
+    Stops the shared client's health checks, if it was created.
+    """
+    if _shared_client is not None:
+        await _shared_client.close()
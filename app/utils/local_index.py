@@ -0,0 +1,353 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .cache import DEFAULT_CACHE_DIR
+from .embedder import Embedder
+from .scrape.page_cache import PageCache
+from .vector_index import DEFAULT_NPROBE, VectorIndex
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/local_index.log'
+)
+
+DEFAULT_LOCAL_TOP_K = 8
+DEFAULT_RRF_K = 60
+# Words of each document that are embedded; the default embedder truncates at 256 tokens anyway.
+EMBEDDED_WORDS = 200
+
+class LocalIndexSettings(BaseSettings):
+    """
+    Settings for the local retrieval index over previously scraped pages.
+    """
+    local_index_enabled: bool = Field(True, description="Search previously scraped pages before the web")
+    local_index_path: str = Field(f"{DEFAULT_CACHE_DIR}/local_index.db", description="SQLite file holding the local index")
+    local_index_top_k: int = Field(DEFAULT_LOCAL_TOP_K, description="Documents returned by a local search")
+    local_index_min_similarity: float = Field(0.5, description="Query-document cosine similarity above which a local hit counts as relevant")
+    local_index_min_documents: int = Field(4, description="Relevant local hits needed to skip the web search")
+    local_index_max_age_seconds: float = Field(7 * 24 * 60 * 60, description="Age after which a page no longer counts towards skipping the web")
+    local_index_max_documents: int = Field(50_000, description="Maximum number of indexed pages; the oldest are dropped first")
+    local_index_nprobe: int = Field(DEFAULT_NPROBE, description="Embedding index lists scored per search")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+def _document_title(document: Dict[str, Any]) -> str:
+    metadata = document.get('metadata')
+    if isinstance(metadata, dict):
+        return metadata.get('title') or ''
+    return ''
+
+def _match_expression(query: str) -> Optional[str]:
+    """
+    Turns free text into an FTS5 query matching any of its words, each quoted
+    so punctuation and FTS5 operators in the text cannot break the syntax.
+    """
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return None
+    return ' OR '.join(f'"{word}"' for word in dict.fromkeys(words))
+
+class LocalIndex:
+    """
+    A hybrid keyword and embedding index over pages that were already scraped.
+
+    Every page is stored in SQLite together with an FTS5 full-text entry,
+    searched with BM25, and an embedding of its opening words, searched with
+    a VectorIndex. The two rankings are combined with Reciprocal Rank Fusion.
+    Pages are added incrementally as they are scraped; a page whose text is
+    unchanged is only marked as seen again.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        path: str,
+        top_k: int = DEFAULT_LOCAL_TOP_K,
+        min_similarity: float = 0.5,
+        min_documents: int = 4,
+        max_age_seconds: Optional[float] = None,
+        max_documents: Optional[int] = None,
+        nprobe: int = DEFAULT_NPROBE,
+    ):
+        """
+        Initializes the LocalIndex, creating its tables and loading the embeddings.
+
+        Args:
+            embedder (Embedder): Embeds queries and documents.
+            path (str): Path to the SQLite database file.
+            top_k (int): The number of pages returned by a search.
+            min_similarity (float): Query-document cosine similarity above which a hit is relevant.
+            min_documents (int): Relevant, fresh hits needed for local results to be sufficient.
+            max_age_seconds (Optional[float]): Age after which a page no longer counts as fresh.
+                                               None never ages pages out.
+            max_documents (Optional[int]): Maximum number of indexed pages. None disables the limit.
+            nprobe (int): Embedding index lists scored per search.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.embedder = embedder
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self.min_documents = min_documents
+        self.max_age_seconds = max_age_seconds
+        self.max_documents = max_documents
+        self.nprobe = nprobe
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, text_hash TEXT NOT NULL, "
+            "title TEXT NOT NULL, texts TEXT NOT NULL, model TEXT NOT NULL, embedding BLOB NOT NULL, "
+            "fetched_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_fetched_at ON documents (fetched_at)")
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(title, texts, tokenize='porter unicode61')"
+        )
+        self._conn.commit()
+        self._build_vector_index()
+
+    def _build_vector_index(self) -> None:
+        """
+        Loads the stored embeddings made with the current embedder into a fresh VectorIndex.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, embedding FROM documents WHERE model = ? ORDER BY id", (self.embedder.model_name,)
+            ).fetchall()
+            self._index = VectorIndex(self.embedder.dim, nprobe=self.nprobe)
+            self._doc_ids: List[int] = [doc_id for doc_id, _ in rows]
+            self._rows: Dict[int, int] = {doc_id: row for row, doc_id in enumerate(self._doc_ids)}
+            if rows:
+                self._index.add(np.stack([np.frombuffer(embedding, dtype=np.float32) for _, embedding in rows]))
+        logging.info(f"LocalIndex loaded {len(rows)} document embeddings.")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def has_url(self, url: str) -> bool:
+        """
+        Returns whether a page is indexed.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM documents WHERE url = ?", (url,)).fetchone() is not None
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]], fetched_at: Optional[float] = None) -> int:
+        """
+        Indexes scraped documents, replacing earlier versions of the same URL.
+
+        Args:
+            documents (Iterable[Dict[str, Any]]): Scraped documents with 'url', 'texts' and optionally 'metadata'.
+                                                  Documents without a URL or text are skipped.
+            fetched_at (Optional[float]): When the documents were fetched. Defaults to now.
+
+        Returns:
+            int: The number of documents that were new or changed.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        pending: List[Tuple[str, str, str, str]] = []
+        for document in documents:
+            url, texts = document.get('url'), document.get('texts')
+            if not url or not texts:
+                continue
+            text_hash = hashlib.blake2b(texts.encode('utf-8'), digest_size=16).hexdigest()
+            with self._lock:
+                row = self._conn.execute("SELECT text_hash FROM documents WHERE url = ?", (url,)).fetchone()
+                if row is not None and row[0] == text_hash:
+                    self._conn.execute("UPDATE documents SET fetched_at = ? WHERE url = ?", (fetched_at, url))
+                    continue
+            pending.append((url, text_hash, _document_title(document), texts))
+
+        if pending:
+            embeddings = self.embedder.encode([
+                f"{title}\n{' '.join(texts.split()[:EMBEDDED_WORDS])}" for _, _, title, texts in pending
+            ])
+            with self._lock:
+                for (url, text_hash, title, texts), embedding in zip(pending, embeddings):
+                    self._delete_url(url)
+                    cursor = self._conn.execute(
+                        "INSERT INTO documents (url, text_hash, title, texts, model, embedding, fetched_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (url, text_hash, title, texts, self.embedder.model_name, embedding.tobytes(), fetched_at)
+                    )
+                    doc_id = cursor.lastrowid
+                    self._conn.execute(
+                        "INSERT INTO documents_fts (rowid, title, texts) VALUES (?, ?, ?)", (doc_id, title, texts)
+                    )
+                    self._doc_ids.append(doc_id)
+                    self._rows[doc_id] = int(self._index.add(embedding)[0])
+                self._evict()
+                needs_rebuild = self.max_documents is not None and len(self._doc_ids) > 2 * self.max_documents
+
+        with self._lock:
+            self._conn.commit()
+        if pending:
+            logging.info(f"LocalIndex indexed {len(pending)} new or changed documents.")
+            # Rows of replaced or evicted pages are only flagged as deleted; compact once they dominate.
+            if needs_rebuild:
+                self._build_vector_index()
+        return len(pending)
+
+    def backfill(self, page_cache: PageCache, batch_size: int = 64) -> int:
+        """
+        Indexes the cached pages of a PageCache whose URL is not indexed yet.
+
+        Returns:
+            int: The number of documents indexed.
+        """
+        indexed = 0
+        batch: List[Dict[str, Any]] = []
+        batch_fetched_at = 0.0
+        for url, entry, document in page_cache.iter_documents():
+            if self.has_url(url):
+                continue
+            batch.append({**document, 'url': url})
+            batch_fetched_at = max(batch_fetched_at, entry['fetched_at'])
+            if len(batch) >= batch_size:
+                indexed += self.add_documents(batch, fetched_at=batch_fetched_at)
+                batch, batch_fetched_at = [], 0.0
+        if batch:
+            indexed += self.add_documents(batch, fetched_at=batch_fetched_at)
+        return indexed
+
+    def search(self, query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Finds the indexed pages most relevant to a query.
+
+        Args:
+            query (str): The search query.
+            k (Optional[int]): The maximum number of pages returned. Defaults to top_k.
+
+        Returns:
+            List[Dict[str, Any]]: The pages, best first, each with 'url', 'title', 'texts',
+                                  'fetched_at', the query 'similarity' and the fused 'score'.
+        """
+        k = self.top_k if k is None else k
+        query_embedding = self.embedder.encode([query])[0]
+        candidates = 4 * k
+        scores: Dict[int, float] = {}
+
+        # Rows are mapped to ids under the lock, since add_documents and rebuilds change both together.
+        with self._lock:
+            vector_hits = [self._doc_ids[row] for row, _ in self._index.search(query_embedding, k=candidates)]
+        for rank, doc_id in enumerate(vector_hits):
+            scores[doc_id] = 1.0 / (DEFAULT_RRF_K + rank + 1)
+
+        expression = _match_expression(query)
+        if expression is not None:
+            with self._lock:
+                keyword_hits = self._conn.execute(
+                    "SELECT rowid FROM documents_fts WHERE documents_fts MATCH ? ORDER BY bm25(documents_fts) LIMIT ?",
+                    (expression, candidates)
+                ).fetchall()
+            for rank, (doc_id,) in enumerate(keyword_hits):
+                scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (DEFAULT_RRF_K + rank + 1)
+
+        best = sorted(scores, key=scores.get, reverse=True)[:k]
+        if not best:
+            return []
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, url, title, texts, embedding, fetched_at FROM documents WHERE id IN ({','.join('?' * len(best))})",
+                best
+            ).fetchall()
+        by_id = {row[0]: row for row in rows}
+
+        results = []
+        for doc_id in best:
+            if doc_id not in by_id:
+                continue
+            _, url, title, texts, embedding, fetched_at = by_id[doc_id]
+            results.append({
+                'url': url,
+                'title': title,
+                'texts': texts,
+                'fetched_at': fetched_at,
+                'similarity': float(np.frombuffer(embedding, dtype=np.float32) @ query_embedding),
+                'score': scores[doc_id],
+            })
+        return results
+
+    def relevant(self, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns the hits similar enough to the query to be worth reading.
+        """
+        return [hit for hit in hits if hit['similarity'] >= self.min_similarity]
+
+    def is_sufficient(self, hits: List[Dict[str, Any]]) -> bool:
+        """
+        Returns whether enough relevant, fresh pages were found locally to skip the web search.
+        """
+        now = time.time()
+        fresh = [
+            hit for hit in self.relevant(hits)
+            if self.max_age_seconds is None or now - hit['fetched_at'] <= self.max_age_seconds
+        ]
+        return len(fresh) >= self.min_documents
+
+    def _delete_url(self, url: str) -> None:
+        """
+        Removes a page from the tables and the embedding index. Must be called with the lock held.
+        """
+        row = self._conn.execute("SELECT id FROM documents WHERE url = ?", (url,)).fetchone()
+        if row is not None:
+            self._delete_ids([row[0]])
+
+    def _delete_ids(self, doc_ids: List[int]) -> None:
+        for doc_id in doc_ids:
+            self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+            if doc_id in self._rows:
+                self._index.remove([self._rows.pop(doc_id)])
+
+    def _evict(self) -> None:
+        """
+        Drops the least recently fetched pages beyond max_documents. Must be called with the lock held.
+        """
+        if self.max_documents is None:
+            return
+        count = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        if count > self.max_documents:
+            oldest = self._conn.execute(
+                "SELECT id FROM documents ORDER BY fetched_at LIMIT ?", (count - self.max_documents,)
+            ).fetchall()
+            self._delete_ids([doc_id for doc_id, in oldest])
+
+def build_local_index(embedder: Embedder) -> Optional[LocalIndex]:
+    """
+    Builds the LocalIndex configured by LocalIndexSettings, or None when it is disabled.
+    Pages of the page cache that are not indexed yet are added with `LocalIndex.backfill`.
+    """
+    settings = LocalIndexSettings()
+    if not settings.local_index_enabled:
+        return None
+    index = LocalIndex(
+        embedder,
+        path=settings.local_index_path,
+        top_k=settings.local_index_top_k,
+        min_similarity=settings.local_index_min_similarity,
+        min_documents=settings.local_index_min_documents,
+        max_age_seconds=settings.local_index_max_age_seconds,
+        max_documents=settings.local_index_max_documents,
+        nprobe=settings.local_index_nprobe,
+    )
+    return index
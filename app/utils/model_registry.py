@@ -0,0 +1,237 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from .answer_cache import AnswerCache, build_answer_cache
+from .doc_reranker import DocReranker, RerankerSettings
+from .embedder import Embedder, EmbedderSettings
+from .local_index import LocalIndex, build_local_index
+from .score_cache import ScoreCache
+from .scrape.page_cache import get_page_cache
+from .tool_router import ToolRouter, build_tool_router
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/model_registry.log'
+)
+
+WARMUP_QUERY = "what is a web search engine"
+WARMUP_DOCS = [
+    "A web search engine is a software system that finds web pages matching a query.",
+    "Tomatoes are usually grown in warm weather and harvested in late summer.",
+]
+# Components every answer needs. The others only speed answers up, so a failure to load them is tolerated.
+CORE_COMPONENTS = ('reranker', 'embedder')
+
+class ModelLoadError(RuntimeError):
+    """
+    Raised when a model the request needs failed to load.
+    """
+
+def build_reranker() -> DocReranker:
+    """
+    Builds the DocReranker configured by RerankerSettings.
+    """
+    settings = RerankerSettings()
+    return DocReranker(
+        mode=settings.rerank_mode,
+        cascade_top_k=settings.rerank_cascade_top_k,
+        cascade_threshold=settings.rerank_cascade_threshold,
+        passage_words=settings.rerank_passage_words,
+        passage_overlap=settings.rerank_passage_overlap,
+        top_passages=settings.rerank_top_passages,
+        backend=settings.rerank_backend,
+        onnx_quantize=settings.rerank_onnx_quantize,
+        score_cache=ScoreCache(
+            max_entries=settings.rerank_score_cache_size,
+            persist_path=settings.rerank_score_cache_path,
+        ),
+    )
+
+def build_embedder() -> Embedder:
+    """
+    Builds the Embedder configured by EmbedderSettings.
+    """
+    return Embedder(EmbedderSettings().embedding_model_name)
+
+class ModelRegistry:
+    """
+    Loads the heavy models in a background task and reports their readiness.
+
+    Loading runs in a worker thread, followed by a warm-up inference so the
+    first real request does not pay for lazy initialization. Requests that
+    need a model before it is ready simply wait for the load to finish.
+
+    Only the reranker and embedder are required. If the tool router, answer
+    cache or local index fails to load, the failure is logged, its status is
+    'failed' and it stays None, so requests run without it. Pages already in
+    the page cache are added to the local index in a separate task after the
+    registry is ready.
+    """
+
+    def __init__(self):
+        self._reranker: Optional[DocReranker] = None
+        self._embedder: Optional[Embedder] = None
+        self._answer_cache: Optional[AnswerCache] = None
+        self._local_index: Optional[LocalIndex] = None
+        self._tool_router: Optional[ToolRouter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._backfill_task: Optional[asyncio.Task] = None
+        self.status: Dict[str, str] = {
+            'reranker': 'pending',
+            'embedder': 'pending',
+            'tool_router': 'pending',
+            'answer_cache': 'pending',
+            'local_index': 'pending',
+        }
+
+    @property
+    def is_ready(self) -> bool:
+        if any(self.status[name] != 'ready' for name in CORE_COMPONENTS):
+            return False
+        return all(state in ('ready', 'failed') for state in self.status.values())
+
+    def start(self) -> None:
+        """
+        Starts loading the models in the background, unless already loading or loaded.
+        A previous failed or cancelled load is retried.
+        """
+        if self._task is not None and not (self._task.done() and (self._task.cancelled() or self._task.exception() is not None)):
+            return
+        self._task = asyncio.create_task(self._load())
+
+    async def stop(self) -> None:
+        """
+        Cancels a load or local index backfill that is still running.
+        """
+        for task in (self._task, self._backfill_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    async def get_reranker(self) -> DocReranker:
+        """
+        Returns the reranker, waiting for the background load if it is still running.
+
+        Raises:
+            ModelLoadError: If the models failed to load.
+        """
+        self.start()
+        await asyncio.shield(self._task)
+        return self._reranker
+
+    async def get_embedder(self) -> Embedder:
+        """
+        Returns the embedder, waiting for the background load if it is still running.
+
+        Raises:
+            ModelLoadError: If the models failed to load.
+        """
+        self.start()
+        await asyncio.shield(self._task)
+        return self._embedder
+
+    def loaded_tool_router(self) -> Optional[ToolRouter]:
+        """
+        Returns the tool router if it has been loaded, without waiting for it.
+
+        Routing runs on every message, so until the router is ready the
+        caller routes with the LLM instead of waiting for the other models.
+        """
+        return self._tool_router
+
+    async def get_answer_cache(self) -> Optional[AnswerCache]:
+        """
+        Returns the answer cache, or None when it is disabled, waiting for the background load if needed.
+
+        Raises:
+            ModelLoadError: If the models failed to load.
+        """
+        self.start()
+        await asyncio.shield(self._task)
+        return self._answer_cache
+
+    async def get_local_index(self) -> Optional[LocalIndex]:
+        """
+        Returns the local retrieval index, or None when it is disabled, waiting for the background load if needed.
+
+        Raises:
+            ModelLoadError: If the models failed to load.
+        """
+        self.start()
+        await asyncio.shield(self._task)
+        return self._local_index
+
+    async def _load_component(self, name: str, build: Callable[[], Any], warm_up: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        Builds one component in a worker thread, optionally warms it up, and tracks its status.
+        """
+        self.status[name] = 'loading'
+        try:
+            component = await asyncio.to_thread(build)
+            if warm_up is not None and component is not None:
+                await asyncio.to_thread(warm_up, component)
+        except Exception as e:
+            self.status[name] = 'failed'
+            logging.error(f"Failed to load the {name}: {e}", exc_info=True)
+            raise ModelLoadError(f"Failed to load the {name}: {e}") from e
+
+        self.status[name] = 'ready'
+        logging.info(f"Loaded the {name}.")
+        return component
+
+    async def _load_optional_component(self, name: str, build: Callable[[], Any]) -> Any:
+        """
+        Loads a component that requests can do without, returning None if it fails.
+        """
+        try:
+            return await self._load_component(name, build)
+        except ModelLoadError:
+            logging.warning(f"Continuing without the {name}.")
+            return None
+
+    async def _load(self) -> None:
+        if self._reranker is None:
+            self._reranker = await self._load_component(
+                'reranker', build_reranker, lambda reranker: reranker.rerank(WARMUP_QUERY, WARMUP_DOCS)
+            )
+        if self._embedder is None:
+            self._embedder = await self._load_component(
+                'embedder', build_embedder, lambda embedder: embedder.encode([WARMUP_QUERY])
+            )
+        if self._tool_router is None:
+            self._tool_router = await self._load_optional_component('tool_router', lambda: build_tool_router(self._embedder))
+        if self._answer_cache is None:
+            self._answer_cache = await self._load_optional_component('answer_cache', lambda: build_answer_cache(self._embedder))
+        if self._local_index is None:
+            self._local_index = await self._load_optional_component('local_index', lambda: build_local_index(self._embedder))
+            if self._local_index is not None:
+                self._backfill_task = asyncio.create_task(self._backfill_local_index(self._local_index))
+
+    async def _backfill_local_index(self, local_index: LocalIndex) -> None:
+        """
+        Indexes the pages of the page cache that are not in the local index yet.
+        """
+        try:
+            backfilled = await asyncio.to_thread(local_index.backfill, get_page_cache())
+        except Exception as e:
+            logging.error(f"Failed to backfill the local index: {e}", exc_info=True)
+            return
+        if backfilled:
+            logging.info(f"LocalIndex backfilled {backfilled} documents from the page cache.")
+
+_model_registry: Optional[ModelRegistry] = None
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Returns the process-wide ModelRegistry.
+    """
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
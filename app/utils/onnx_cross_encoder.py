@@ -0,0 +1,169 @@
+import logging
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoConfig, AutoTokenizer
+
+from .cache import DEFAULT_CACHE_DIR
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/onnx_cross_encoder.log'
+)
+
+DEFAULT_ONNX_DIR = f"{DEFAULT_CACHE_DIR}/onnx"
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_LENGTH = 512
+ONNX_INPUT_NAMES = ('input_ids', 'attention_mask', 'token_type_ids')
+
+class OnnxCrossEncoder:
+    """
+    A CrossEncoder served by ONNX Runtime instead of PyTorch.
+
+    The Hugging Face model is exported to ONNX on first use, optionally with
+    dynamic int8 quantization of its weights, and cached on disk. Later
+    instances load the cached file and never import torch. `predict` takes
+    the same (query, document) pairs as `CrossEncoder.predict` and applies
+    the same activation, so it can replace it inside DocReranker.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = True,
+        onnx_dir: str = DEFAULT_ONNX_DIR,
+        max_length: int = DEFAULT_MAX_LENGTH,
+        num_threads: Optional[int] = None,
+    ):
+        """
+        Initializes the OnnxCrossEncoder, exporting the model if needed.
+
+        Args:
+            model_name (str): Hugging Face model name or local path of the CrossEncoder.
+            quantize (bool): Whether to serve the int8 dynamically quantized model.
+            onnx_dir (str): Directory holding exported models.
+            max_length (int): Maximum number of tokens per (query, document) pair.
+            num_threads (Optional[int]): Intra-op threads for ONNX Runtime. None lets it decide.
+        """
+        self.model_name = model_name
+        self.quantize = quantize
+        self.max_length = max_length
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.apply_sigmoid = self._uses_sigmoid(AutoConfig.from_pretrained(model_name))
+
+        model_path = self._ensure_exported(onnx_dir)
+        options = ort.SessionOptions()
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        logging.info(f"OnnxCrossEncoder loaded {model_path}")
+
+    @staticmethod
+    def _uses_sigmoid(config) -> bool:
+        """
+        Resolves the activation the same way CrossEncoder does: an explicit
+        setting in the model config wins, otherwise single-label models use Sigmoid.
+        """
+        activation = None
+        if isinstance(getattr(config, 'sentence_transformers', None), dict):
+            activation = config.sentence_transformers.get('activation_fn')
+        if activation is None:
+            activation = getattr(config, 'sbert_ce_default_activation_function', None)
+        if activation is None:
+            return config.num_labels == 1
+        return activation.endswith('Sigmoid')
+
+    def _ensure_exported(self, onnx_dir: str) -> str:
+        """
+        Returns the path of the ONNX model to serve, exporting and quantizing it if missing.
+        """
+        model_dir = os.path.join(onnx_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", self.model_name.strip('/')))
+        fp32_path = os.path.join(model_dir, 'model.onnx')
+        int8_path = os.path.join(model_dir, 'model_int8.onnx')
+
+        if not os.path.exists(fp32_path):
+            os.makedirs(model_dir, exist_ok=True)
+            self._export(fp32_path)
+
+        if not self.quantize:
+            return fp32_path
+
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logging.info(f"Quantizing {fp32_path} to int8")
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        return int8_path
+
+    def _export(self, path: str) -> None:
+        """
+        Exports the PyTorch model to ONNX with dynamic batch and sequence axes.
+        """
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        logging.info(f"Exporting {self.model_name} to {path}")
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name).eval()
+        sample = self.tokenizer(['query'], ['document'], return_tensors='pt')
+        input_names = [name for name in ONNX_INPUT_NAMES if name in sample]
+
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['logits'] = {0: 'batch'}
+
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                path,
+                input_names=input_names,
+                output_names=['logits'],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+                dynamo=False,
+            )
+
+    def predict(
+        self,
+        sentences: Sequence[Tuple[str, str]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        show_progress_bar: bool = False,
+    ) -> np.ndarray:
+        """
+        Scores (query, document) pairs.
+
+        Args:
+            sentences (Sequence[Tuple[str, str]]): The pairs to score.
+            batch_size (int): The number of pairs per inference call.
+            show_progress_bar (bool): Accepted for compatibility with CrossEncoder.predict; ignored.
+
+        Returns:
+            np.ndarray: One score per pair.
+        """
+        scores: List[np.ndarray] = []
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+            features = self.tokenizer(
+                [query for query, _ in batch],
+                [doc for _, doc in batch],
+                padding=True,
+                truncation='longest_first',
+                max_length=self.max_length,
+                return_tensors='np',
+            )
+            logits = self.session.run(None, {name: features[name].astype(np.int64) for name in self.input_names})[0]
+            scores.append(logits[:, 0] if logits.shape[1] == 1 else logits)
+
+        if not scores:
+            return np.empty(0, dtype=np.float32)
+
+        output = np.concatenate(scores).astype(np.float32)
+        if self.apply_sigmoid:
+            output = 1.0 / (1.0 + np.exp(-output))
+        return output
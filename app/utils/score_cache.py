@@ -0,0 +1,101 @@
+import hashlib
+import logging
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .cache import SQLiteCache
+from .search_web import normalize_query
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/score_cache.log'
+)
+
+DEFAULT_SCORE_CACHE_SIZE = 100_000
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+class ScoreCache:
+    """
+    An LRU cache of CrossEncoder scores, optionally backed by a SQLite table.
+
+    Entries are keyed by model, normalized query and document content, so a
+    (query, passage) pair is only ever scored once per model, even when the
+    same page shows up for a repeated or related question.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_SCORE_CACHE_SIZE, persist_path: Optional[str] = None):
+        """
+        Initializes the ScoreCache.
+
+        Args:
+            max_entries (int): Maximum number of scores kept in memory and on disk.
+            persist_path (Optional[str]): SQLite file used to keep scores across restarts.
+                                          None keeps them in memory only.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = SQLiteCache(persist_path, table='rerank_scores', max_entries=max_entries) if persist_path else None
+
+    @staticmethod
+    def make_key(model_key: str, query: str, document: str) -> str:
+        """
+        Builds the cache key of a (model, query, document) triple.
+        """
+        return f"{model_key}:{_digest(normalize_query(query))}:{_digest(document)}"
+
+    def get_many(self, keys: List[str]) -> Dict[str, float]:
+        """
+        Returns the cached scores for the keys that are present, reading any
+        not held in memory from disk with a single query.
+        """
+        found: Dict[str, float] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+
+        if self._store is not None:
+            missing = [key for key in keys if key not in found]
+            if missing:
+                stored = {key: struct.unpack('<f', value)[0] for key, value in self._store.get_many(missing).items()}
+                found.update(stored)
+                self._remember(stored)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, scores: Dict[str, float]) -> None:
+        """
+        Stores freshly computed scores, writing them to disk in one transaction.
+        """
+        self._remember(scores)
+        if self._store is not None:
+            self._store.set_many([(key, struct.pack('<f', score)) for key, score in scores.items()])
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit/miss counters and the number of scores held in memory.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def _remember(self, scores: Dict[str, float]) -> None:
+        with self._lock:
+            for key, score in scores.items():
+                self._entries[key] = float(score)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
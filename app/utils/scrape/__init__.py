@@ -1 +1,3 @@
-from .scrapy_util import scrape_web
\ No newline at end of file
+from .scrapy_util import scrape_web
+from .async_scraper import scrape_web_stream, close_http_client, ScrapeSettings
+from .extract_pool import shutdown_extraction_executor
\ No newline at end of file
@@ -0,0 +1,260 @@
+import asyncio
+import logging
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional
+
+import httpx
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from ..concurrency import bounded_map
+from .extract_pool import load_document_async
+from .page_cache import PageCache, get_page_cache
+from .scrapy_util import DEFAULT_DOWNLOAD_TIMEOUT_SECONDS, DEFAULT_USER_AGENT
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/async_scraper.log'
+)
+
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = 16
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 32
+DEFAULT_MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+class ScrapeSettings(BaseSettings):
+    """
+    Settings bounding how long a single request may spend scraping.
+    """
+    scrape_deadline_seconds: Optional[float] = Field(10.0, description="Time budget for scraping one request's URLs")
+    scrape_quorum: Optional[int] = Field(6, description="Stop scraping once this many documents were parsed")
+    scrape_hedge_after_seconds: Optional[float] = Field(3.0, description="Start a second fetch for a URL still pending after this long")
+    scrape_max_page_bytes: Optional[int] = Field(DEFAULT_MAX_PAGE_BYTES, description="Pages with a larger body are abandoned while downloading. Unset disables the limit")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide pooled async HTTP client, creating it on first use.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            headers={'User-Agent': DEFAULT_USER_AGENT},
+            timeout=DEFAULT_DOWNLOAD_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=DEFAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+async def close_http_client() -> None:
+    """
+    Closes the pooled HTTP client, if it was ever opened.
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+async def read_limited(response: httpx.Response, max_bytes: Optional[int]) -> Optional[bytes]:
+    """
+    Reads a streamed response body, giving up as soon as it exceeds `max_bytes`.
+
+    Returns:
+        The body, or None if it is larger than `max_bytes`.
+    """
+    declared_length = response.headers.get('Content-Length')
+    if max_bytes is not None and declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+        return None
+
+    chunks = []
+    size = 0
+    async for chunk in response.aiter_bytes():
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            return None
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+async def fetch_document_async(
+    client: httpx.AsyncClient,
+    cache: PageCache,
+    url: str,
+    entry: Optional[Dict[str, Any]],
+    max_bytes: Optional[int] = DEFAULT_MAX_PAGE_BYTES,
+) -> Optional[Dict[str, Any]]:
+    """
+    Downloads a page without blocking the event loop, revalidating an existing
+    cache entry with ETag/Last-Modified, and returns its parsed document.
+
+    Args:
+        client: The pooled HTTP client.
+        cache: The page cache.
+        url: The URL to fetch.
+        entry: The current cache entry for the URL, or None.
+        max_bytes: The largest body downloaded. None disables the limit.
+
+    Returns:
+        The parsed document dictionary, or None if the download or parsing failed.
+    """
+    try:
+        headers = await asyncio.to_thread(cache.conditional_headers, entry)
+        async with client.stream('GET', url, headers=headers) as response:
+            if response.status_code == 304 and entry is not None:
+                logging.info(f"Cached page is still valid for URL: {url}")
+                await asyncio.to_thread(cache.mark_revalidated, url, entry)
+                content_hash = entry['content_hash']
+            else:
+                response.raise_for_status()
+                body = await read_limited(response, max_bytes)
+                if body is None:
+                    logging.warning(f"Skipping URL with a body larger than {max_bytes} bytes: {url}")
+                    return None
+                content_hash = await asyncio.to_thread(
+                    cache.store_html,
+                    url,
+                    body,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                )
+
+    except httpx.HTTPError as e:
+        logging.warning(f"Failed to download content for URL: {url}: {e}")
+        return None
+
+    return await load_document_async(cache, url, content_hash)
+
+async def fetch_document_hedged(
+    client: httpx.AsyncClient,
+    cache: PageCache,
+    url: str,
+    entry: Optional[Dict[str, Any]],
+    hedge_after: Optional[float],
+    max_bytes: Optional[int] = DEFAULT_MAX_PAGE_BYTES,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetches a page, starting a duplicate request if the first one is still
+    pending after `hedge_after` seconds, and returns whichever succeeds first.
+
+    Args:
+        client: The pooled HTTP client.
+        cache: The page cache.
+        url: The URL to fetch.
+        entry: The current cache entry for the URL, or None.
+        hedge_after: Seconds to wait before hedging. None disables hedging.
+        max_bytes: The largest body downloaded. None disables the limit.
+
+    Returns:
+        The parsed document dictionary, or None if every attempt failed.
+    """
+    attempts = [asyncio.create_task(fetch_document_async(client, cache, url, entry, max_bytes))]
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+            if not done:
+                logging.info(f"Fetch still pending after {hedge_after} seconds. Hedging URL: {url}")
+                attempts.append(asyncio.create_task(fetch_document_async(client, cache, url, entry, max_bytes)))
+
+        pending = set(attempts)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                document = attempt.result()
+                if document is not None:
+                    return document
+        return None
+
+    finally:
+        for attempt in attempts:
+            if not attempt.done():
+                attempt.cancel()
+
+async def scrape_document(url: str, hedge_after: Optional[float] = None, max_bytes: Optional[int] = DEFAULT_MAX_PAGE_BYTES) -> Optional[Dict[str, Any]]:
+    """
+    Returns the parsed document of one URL, from the page cache when it is fresh, otherwise downloaded.
+
+    Args:
+        url: The URL to scrape.
+        hedge_after: Seconds after which a pending fetch is duplicated. None disables hedging.
+        max_bytes: The largest body downloaded. None disables the limit.
+
+    Returns:
+        The parsed document dictionary, or None if the download or parsing failed.
+    """
+    cache = get_page_cache()
+    entry = await asyncio.to_thread(cache.lookup, url)
+    if entry is not None and cache.is_fresh(entry):
+        document = await asyncio.to_thread(cache.load_document, entry['content_hash'])
+        if document is not None:
+            logging.info(f"Page cache hit for URL: {url}")
+            return document
+    return await fetch_document_hedged(get_http_client(), cache, url, entry, hedge_after, max_bytes)
+
+async def scrape_web_stream(
+    urls: List[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENT_DOWNLOADS,
+    deadline: Optional[float] = None,
+    quorum: Optional[int] = None,
+    hedge_after: Optional[float] = None,
+    max_bytes: Optional[int] = DEFAULT_MAX_PAGE_BYTES,
+    prefetched: Optional[Dict[str, Awaitable[Optional[Dict[str, Any]]]]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Scrapes a list of URLs concurrently, yielding each parsed document as soon as it is ready.
+
+    This is the streaming counterpart of `scrape_web`: it shares the page
+    cache, but downloads over a pooled async client and extracts in the
+    process pool, so callers can start working on the first pages while
+    slow hosts are still downloading.
+
+    Scraping stops as soon as `quorum` documents were yielded or `deadline`
+    seconds have passed, whichever comes first, and every fetch still in
+    flight is cancelled. Slow URLs can be hedged with a second request, and
+    a page whose body grows past `max_bytes` is abandoned mid-download.
+
+    Args:
+        urls: A list of URLs (string) to scrape.
+        max_concurrency: The maximum number of pages fetched at once.
+        deadline: Time budget in seconds for the whole scrape. None waits for every URL.
+        quorum: Number of documents after which scraping stops. None waits for every URL.
+        hedge_after: Seconds after which a pending fetch is duplicated. None disables hedging.
+        max_bytes: The largest page body downloaded. None disables the limit.
+        prefetched: Fetches of some of the URLs that are already running, such as those of a
+                    SpeculativeSearch. They are awaited instead of fetching those URLs again,
+                    and count toward the deadline and quorum like any other URL.
+
+    Yields:
+        The scraped and parsed data for each successful URL, in order of completion,
+        with the URL it was scraped from under 'url'.
+    """
+    if not urls:
+        logging.warning("Input URL list is empty.")
+        return
+
+    prefetched = prefetched or {}
+
+    async def _scrape(url: str) -> Optional[Dict[str, Any]]:
+        if url in prefetched:
+            return await prefetched[url]
+        return await scrape_document(url, hedge_after, max_bytes)
+
+    # Prefetched URLs are already downloading, so they do not take a download slot.
+    concurrency = max_concurrency + sum(url in prefetched for url in urls)
+    scraped_count = 0
+    async with aclosing(bounded_map(_scrape, urls, max_concurrency=concurrency, deadline=deadline)) as results:
+        async for index, document in results:
+            if document is None:
+                continue
+
+            yield {**document, 'url': urls[index]}
+            scraped_count += 1
+            if quorum is not None and scraped_count >= quorum:
+                logging.info(f"Quorum of {quorum} documents reached. Cancelling remaining fetches.")
+                return
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+import zstandard
+
+from .parser import extract_from_html
+from .page_cache import PageCache
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/extract_pool.log'
+)
+
+DEFAULT_EXTRACTION_WORKERS = os.cpu_count() or 1
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def get_extraction_executor() -> ProcessPoolExecutor:
+    """
+    Returns the process pool used for HTML extraction, starting it on first use.
+
+    The pool has one worker per CPU, so trafilatura and the regex passes in
+    `extract_from_html` run in parallel and never hold the event loop's GIL.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=DEFAULT_EXTRACTION_WORKERS)
+        logging.info(f"Started extraction pool with {DEFAULT_EXTRACTION_WORKERS} workers.")
+    return _executor
+
+def shutdown_extraction_executor() -> None:
+    """
+    Stops the extraction pool, if it was ever started.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def parse_page(url: str, html: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Runs trafilatura extraction and the custom parser over a downloaded page.
+
+    Args:
+        url: The URL the page was downloaded from, used for logging.
+        html: The raw page body.
+
+    Returns:
+        The parsed document dictionary, or None if extraction or parsing failed.
+    """
+    from trafilatura import extract
+
+    try:
+        html_respone = extract(html, with_metadata=True)
+
+        if html_respone is None:
+            logging.warning(f"Trafilatura extraction failed or returned empty for URL: {url}")
+            return None
+
+        formated_data = extract_from_html(html_respone)
+
+        if formated_data is None:
+            logging.warning(f"Custom parsing failed or returned empty for URL: {url}")
+            return None
+
+        return formated_data
+
+    except Exception as e:
+        logging.error(f"Error during custom parsing for URL {url}: {e}", exc_info=True)
+        return None
+
+def parse_compressed_page(url: str, compressed_html: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decompresses a page body as stored in the page cache and parses it.
+
+    This is the function run by pool workers: the compressed body is several
+    times smaller than the HTML, which keeps the hand-off to the worker cheap.
+    """
+    return parse_page(url, zstandard.decompress(compressed_html))
+
+async def load_document_async(cache: PageCache, url: str, content_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the document for a cached body, extracting it in the process pool if needed.
+
+    Args:
+        cache: The page cache.
+        url: The URL the body belongs to, used for logging.
+        content_hash: The content hash of the body.
+
+    Returns:
+        The parsed document dictionary, or None if the body is gone or could not be parsed.
+    """
+    document = await asyncio.to_thread(cache.load_document, content_hash)
+    if document is not None:
+        return document
+
+    compressed_html = await asyncio.to_thread(cache.load_compressed_html, content_hash)
+    if compressed_html is None:
+        return None
+
+    loop = asyncio.get_running_loop()
+    document = await loop.run_in_executor(get_extraction_executor(), parse_compressed_page, url, compressed_html)
+    if document is not None:
+        await asyncio.to_thread(cache.store_document, content_hash, document)
+    return document
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import zstandard
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from ..cache import SQLiteCache, DEFAULT_CACHE_DIR
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/page_cache.log'
+)
+
+class PageCacheSettings(BaseSettings):
+    """
+    Settings for the on-disk cache of downloaded and extracted web pages.
+    """
+    page_cache_path: str = Field(f"{DEFAULT_CACHE_DIR}/pages.db", description="SQLite file holding cached pages")
+    page_cache_fresh_seconds: float = Field(60 * 60, description="Age below which a page is used without revalidation")
+    page_cache_max_urls: int = Field(50_000, description="Maximum number of URLs tracked by the cache")
+    page_cache_max_html_bytes: int = Field(512 * 1024 * 1024, description="Maximum compressed size of stored raw HTML")
+    page_cache_max_text_bytes: int = Field(128 * 1024 * 1024, description="Maximum compressed size of stored extracted text")
+    page_cache_compression_level: int = Field(3, description="zstd compression level")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+class PageCache:
+    """
+    A content-addressed store of raw HTML and extracted documents.
+
+    Three tables share one SQLite file:
+    - `page_urls` maps a URL to the hash of its last body plus its ETag/Last-Modified validators.
+    - `page_html` holds zstd-compressed raw HTML keyed by content hash.
+    - `page_texts` holds zstd-compressed extracted documents keyed by content hash.
+
+    Because bodies are keyed by hash, identical pages served under different
+    URLs are stored and extracted once. Each layer evicts its least recently
+    used entries when it outgrows its size limit.
+    """
+
+    def __init__(self, settings: Optional[PageCacheSettings] = None):
+        """
+        Initializes the PageCache.
+
+        Args:
+            settings (Optional[PageCacheSettings]): Cache settings. Defaults to values from env/.env.
+        """
+        settings = settings or PageCacheSettings()
+
+        self.fresh_seconds = settings.page_cache_fresh_seconds
+        self.compression_level = settings.page_cache_compression_level
+        self.urls = SQLiteCache(settings.page_cache_path, table='page_urls', max_entries=settings.page_cache_max_urls)
+        self.html = SQLiteCache(settings.page_cache_path, table='page_html', max_bytes=settings.page_cache_max_html_bytes)
+        self.texts = SQLiteCache(settings.page_cache_path, table='page_texts', max_bytes=settings.page_cache_max_text_bytes)
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cache entry for a URL, or None if the URL was never stored.
+
+        The entry is a dictionary with 'content_hash', 'etag', 'last_modified' and 'fetched_at'.
+        """
+        entry = self.urls.get(url)
+        if entry is None:
+            return None
+        return json.loads(entry)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """
+        Checks whether an entry is recent enough to be used without revalidation.
+        """
+        return time.time() - entry['fetched_at'] < self.fresh_seconds
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Builds the If-None-Match/If-Modified-Since headers for revalidating an entry.
+
+        No headers are returned when the cached body has been evicted, since a
+        304 response would then leave us with nothing to serve.
+        """
+        if entry is None or not self.has_content(entry['content_hash']):
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def has_content(self, content_hash: str) -> bool:
+        """
+        Checks whether either the extracted document or the raw HTML of a body is still stored.
+        """
+        return self.texts.contains(content_hash) or self.html.contains(content_hash)
+
+    def store_html(self, url: str, html: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None) -> str:
+        """
+        Stores a freshly downloaded body and points the URL at it.
+
+        Args:
+            url (str): The URL the body was downloaded from.
+            html (bytes): The raw response body.
+            etag (Optional[str]): The ETag response header, if any.
+            last_modified (Optional[str]): The Last-Modified response header, if any.
+
+        Returns:
+            str: The content hash of the body.
+        """
+        content_hash = hashlib.sha256(html).hexdigest()
+        if not self.html.contains(content_hash):
+            self.html.set(content_hash, zstandard.compress(html, self.compression_level))
+
+        self._set_entry(url, content_hash, etag, last_modified)
+        return content_hash
+
+    def mark_revalidated(self, url: str, entry: Dict[str, Any]) -> None:
+        """
+        Records that the origin confirmed an entry is unchanged (HTTP 304).
+        """
+        self._set_entry(url, entry['content_hash'], entry.get('etag'), entry.get('last_modified'))
+
+    def load_compressed_html(self, content_hash: str) -> Optional[bytes]:
+        """
+        Returns the zstd-compressed raw HTML stored for a content hash, or None if it was evicted.
+        """
+        return self.html.get(content_hash)
+
+    def load_document(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the extracted document stored for a content hash, or None if it is not cached.
+        """
+        compressed = self.texts.get(content_hash)
+        if compressed is None:
+            return None
+        return json.loads(zstandard.decompress(compressed))
+
+    def store_document(self, content_hash: str, document: Dict[str, Any]) -> None:
+        """
+        Stores the extracted document for a content hash.
+        """
+        payload = json.dumps(document).encode('utf-8')
+        self.texts.set(content_hash, zstandard.compress(payload, self.compression_level))
+
+    def iter_documents(self) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Yields (url, entry, document) for every cached URL whose extracted document is still cached.
+        """
+        for url, value in self.urls.items():
+            entry = json.loads(value)
+            document = self.load_document(entry['content_hash'])
+            if document is not None:
+                yield url, entry, document
+
+    def _set_entry(self, url: str, content_hash: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        entry = {
+            'content_hash': content_hash,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+        }
+        self.urls.set(url, json.dumps(entry).encode('utf-8'))
+
+_page_cache: Optional[PageCache] = None
+
+def get_page_cache() -> PageCache:
+    """
+    Returns the shared page cache, opening it on first use.
+    """
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = PageCache()
+    return _page_cache
@@ -1,8 +1,12 @@
 import logging
-from trafilatura import fetch_url, extract
-from trafilatura.downloads import add_to_compressed_dict, buffered_downloads, load_download_buffer
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Optional
 
-from .parser import extract_from_html
+import requests
+
+from .extract_pool import get_extraction_executor, parse_compressed_page
+from .page_cache import PageCache, get_page_cache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -11,69 +15,127 @@ logging.basicConfig(
     filename='logs/scrapy_util.log'
 )
 
+DEFAULT_DOWNLOAD_THREADS = min(32, (os.cpu_count() or 1) * 4)
+DEFAULT_DOWNLOAD_TIMEOUT_SECONDS = 15
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (compatible; linsight/1.0)'
+
+def fetch_page(session: requests.Session, cache: PageCache, url: str, entry: Optional[Dict[str, Any]]) -> str:
+    """
+    Downloads a page into the page cache, revalidating an existing entry
+    with ETag/Last-Modified.
+
+    Args:
+        session: The HTTP session used for the download.
+        cache: The page cache.
+        url: The URL to fetch.
+        entry: The current cache entry for the URL, or None.
+
+    Returns:
+        The content hash of the page body.
+
+    Raises:
+        requests.exceptions.RequestException: If the download fails.
+    """
+    headers = {'User-Agent': DEFAULT_USER_AGENT}
+    headers.update(cache.conditional_headers(entry))
+
+    response = session.get(url, headers=headers, timeout=DEFAULT_DOWNLOAD_TIMEOUT_SECONDS)
+
+    if response.status_code == 304 and entry is not None:
+        logging.info(f"Cached page is still valid for URL: {url}")
+        cache.mark_revalidated(url, entry)
+        return entry['content_hash']
+
+    response.raise_for_status()
+    return cache.store_html(
+        url,
+        response.content,
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+    )
+
 def scrape_web(urls: list):
     """
-    Scrapes content from a list of URLs using trafilatura with 
+    Scrapes content from a list of URLs using trafilatura with
     enhanced error handing.
-    
+
+    Pages fetched recently are served from the page cache without any
+    download or extraction; older cached pages are revalidated with a
+    conditional request. Downloads run in a thread pool and extraction in
+    the shared process pool, collected as each one finishes.
+
     Args:
         urls: A list of URLs (string) to scrape.
-    
+
     Returns:
         A list of dictionaries containing the scraped and parsed data for successful URLs.
         Return on empty list if input is invalid or a major error occurs during setup.
     """
-    
+
     scraped_data = []
-    
+
     if not urls:
         logging.warning("Input URL list is empty.")
         return scraped_data
-    
+
     try:
-        cpu_threads = 4
-        url_store = add_to_compressed_dict(urls)
-        
-        while url_store.done is False:
+        cache = get_page_cache()
+        pending = []
+
+        for url in urls:
+            entry = cache.lookup(url)
+            if entry is not None and cache.is_fresh(entry):
+                document = cache.load_document(entry['content_hash'])
+                if document is not None:
+                    logging.info(f"Page cache hit for URL: {url}")
+                    scraped_data.append(document)
+                    continue
+            pending.append((url, entry))
+
+        extractions = {}
+        with requests.Session() as session, ThreadPoolExecutor(DEFAULT_DOWNLOAD_THREADS) as executor:
+            downloads = {
+                executor.submit(fetch_page, session, cache, url, entry): url
+                for url, entry in pending
+            }
+
+            for future in as_completed(downloads):
+                url = downloads[future]
+                try:
+                    content_hash = future.result()
+                except requests.exceptions.RequestException as e:
+                    logging.warning(f"Failed to download content for URL: {url}: {e}")
+                    continue
+                except Exception as e:
+                    logging.error(f"Error while downloading URL {url}: {e}", exc_info=True)
+                    continue
+
+                document = cache.load_document(content_hash)
+                if document is not None:
+                    scraped_data.append(document)
+                    continue
+
+                compressed_html = cache.load_compressed_html(content_hash)
+                if compressed_html is None:
+                    continue
+
+                extraction = get_extraction_executor().submit(parse_compressed_page, url, compressed_html)
+                extractions[extraction] = (url, content_hash)
+
+        for future in as_completed(extractions):
+            url, content_hash = extractions[future]
             try:
-                buffer_list, url_list = load_download_buffer(url_store, sleep_time=3)
-                
-                for url, result in buffered_downloads(buffer_list, cpu_threads):
-                    
-                    if result is None:
-                        logging.warning(f"Failed to download content for URL: {url}")
-                        continue
-                    
-                    try:
-                        html_respone = extract(result, with_metadata=True)
-                        
-                        if html_respone is None:
-                            logging.warning(f"Trafilatura extraction failed or returned empty for URL: {url}")
-                            continue
-                        
-                        try:
-                            formated_data = extract_from_html(html_respone)
-                            
-                            if formated_data is None:
-                                logging.warning(f"Custom parsing failed or returned empty for URL: {url}")
-                                continue
-                            
-                            scraped_data.append(formated_data)
-                        
-                        except Exception as e:
-                            logging.error(f"Error during custom parsing for URL {url}: {e}", exc_info=True)
-                            continue
-                        
-                    except Exception as e:
-                        logging.error(f"Error during custom parsing for URL{url}: {e}", exc_info=True)
-                        continue
-                    
+                document = future.result()
             except Exception as e:
-                logging.error(f"Error during trafilatura buffer precessing: {e}", exc_info=True)
+                logging.error(f"Error during extraction for URL {url}: {e}", exc_info=True)
                 continue
-        
+
+            if document is not None:
+                cache.store_document(content_hash, document)
+                scraped_data.append(document)
+
         return scraped_data
-    
+
     except Exception as e:
         logging.critical(f"A critical error occured during the scraping process: {e}", exc_info=True)
-        return scraped_data
\ No newline at end of file
+        return scraped_data
@@ -1,10 +1,17 @@
-import requests
+import asyncio
+import json
+import math
+import re
 import logging
-import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+import httpx
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from .cache import SQLiteCache, DEFAULT_CACHE_DIR
+from .scrape.async_scraper import get_http_client
 
 #--- Logging Setup ---#
 logging.basicConfig(
@@ -24,6 +31,16 @@ class VarSettings(BaseSettings):
     search_id: str = Field(..., description="Custom Search Engine ID (cx) for Google Search")
     
     model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+class SearchCacheSettings(BaseSettings):
+    """
+    Settings for the local cache of Google Custom Search results.
+    """
+    search_cache_path: str = Field(f"{DEFAULT_CACHE_DIR}/search.db", description="SQLite file holding cached search results")
+    search_cache_ttl_seconds: float = Field(24 * 60 * 60, description="How long cached results stay valid")
+    search_cache_max_entries: int = Field(10_000, description="Maximum number of cached queries")
+    
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
     
 
 #--- Constants and API Endpoint ---#
@@ -32,94 +49,246 @@ DEFAULT_MAX_RESULTS_PER_PAGE = 10
 DEFAULT_TOTAL_RESULTS_TO_FETCH = 10
 DEFAULT_RETRY_ATTEMPTS = 3
 DEFAULT_RETRY_DEALY_SECONDS = 5
+DEFAULT_SEARCH_TIMEOUT_SECONDS = 10
+DEFAULT_QUERY_VARIANTS = 3
+# The query variants, the routed query and the speculative search of the raw question, one request each.
+DEFAULT_MAX_SEARCH_REQUESTS = DEFAULT_QUERY_VARIANTS + 2
+TRACKING_PARAMETERS = re.compile(r"^(utm_\w+|gclid|dclid|fbclid|msclkid|mc_cid|mc_eid|ref_src)$", re.IGNORECASE)
+
+class SearchSettings(BaseSettings):
+    """
+    Settings for the multi-query search stage of a web-search answer.
+    """
+    search_query_variants: int = Field(DEFAULT_QUERY_VARIANTS, description="Search queries generated from each question")
+    search_results_per_query: int = Field(DEFAULT_TOTAL_RESULTS_TO_FETCH, description="Results fetched per query, 10 per API request")
+    search_max_requests: Optional[int] = Field(DEFAULT_MAX_SEARCH_REQUESTS, description="Custom Search API requests allowed per user message, retries included. Unset disables the limit")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+#--- Search Result Cache ---#
+_search_cache: Optional[SQLiteCache] = None
+
+def get_search_cache() -> SQLiteCache:
+    """
+    Returns the shared search result cache, opening it on first use.
+    """
+    global _search_cache
+    if _search_cache is None:
+        settings = SearchCacheSettings()
+        _search_cache = SQLiteCache(
+            path=settings.search_cache_path,
+            table='search_results',
+            ttl_seconds=settings.search_cache_ttl_seconds,
+            max_entries=settings.search_cache_max_entries,
+        )
+    return _search_cache
 
-#--- Core Search Functionlaity ---#
-def make_custom_search(query: str,) -> List:
+def normalize_query(query: str) -> str:
     """
-    Search Google Custom SEarch API for the given query and retrieves links.
+    Normalizes a query so trivially different spellings share a cache entry.
     
     Args:
         query: The search query string.
         
     Returns:
-        A list of dictionaries, where each dictionary represents a searh results item.
+        The lowercased query with surrounding quotes removed and whitespace collapsed.
+    """
+    return ' '.join(query.strip().strip('\'"').lower().split())
+
+#--- Async Multi-Query Search ---#
+def canonicalize_url(url: str) -> str:
     """
+    Reduces a URL to a canonical form, so different links to the same page compare equal.
     
-    all_results = []
-    all_links = []
-    start_index = 1
+    The scheme is unified, the host is lowercased without 'www.' or a default
+    port, the fragment, tracking parameters and trailing slash are dropped,
+    and the remaining query parameters are sorted.
     
-    secrets = VarSettings()
+    Args:
+        url: The URL.
+        
+    Returns:
+        The canonical form, only meant for comparisons.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is not None and port not in (80, 443):
+        host = f"{host}:{port}"
     
-    logging.info(f"Starting search for query: '{query}")
+    scheme = 'https' if parts.scheme.lower() in ('http', 'https') else parts.scheme.lower()
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMETERS.match(name)
+    ))
+    return urlunsplit((scheme, host, path, query, ''))
+
+class SearchBudget:
+    """
+    Counts the Custom Search API requests made for one user message against a quota.
+    """
     
-    while start_index <= DEFAULT_TOTAL_RESULTS_TO_FETCH:
-        parms = {
-            'q': query,
-            'key': secrets.search_key,
-            'cx': secrets.search_id,
-            'start': start_index,
-            'num': DEFAULT_MAX_RESULTS_PER_PAGE
-        }
+    def __init__(self, max_requests: Optional[int] = DEFAULT_MAX_SEARCH_REQUESTS):
+        """
+        Initializes the SearchBudget.
         
-        for attempt in range(DEFAULT_RETRY_ATTEMPTS):
-            try:
-                response = requests.get(Search_API_URL, params=parms, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                if 'items' in data:
-                    current_page_results = data['items']
-                    all_results.extend(current_page_results)
-                    
-                    for item in all_results:
-                        all_links.append(item['link'])
-                        
-                    logging.info(f"Fetched {len(current_page_results)} results for start_index={start_index}")
-                    
-                    if len(current_page_results) < DEFAULT_MAX_RESULTS_PER_PAGE:
-                        logging.info(f"Less than {DEFAULT_MAX_RESULTS_PER_PAGE} rsults returned, likely end of results.")
-                        return all_links
-                else:
-                    logging.info(f"No 'items' found in response for start_index={start_index}.")
-                    if 'error' in data:
-                        logging.error(f"API Error: {data['error'].get('message', 'Unknown error')}")
-                    return all_links
-                
-                break
-            except requests.exceptions.Timeout:
-                logging.warning(f"Request timed out (attempt {attempt + 1}/{DEFAULT_RETRY_ATTEMPTS}). Retrying in {DEFAULT_RETRY_DEALY_SECONDS} seconds...")
-                time.sleep(DEFAULT_RETRY_DEALY_SECONDS)
-            except requests.exceptions.ConnectionError as e:
-                logging.error(f"Connection error (attempt {attempt + 1}/{DEFAULT_RETRY_ATTEMPTS}): {e}. Retrying in {DEFAULT_RETRY_DEALY_SECONDS} seconds...")
-                time.sleep(DEFAULT_RETRY_DEALY_SECONDS)
-            except requests.exceptions.HTTPError as e:
-                status_code = e.response.status_code
-                logging.error(f"HTTP error {status_code} (attempt {attempt + 1}/{DEFAULT_RETRY_ATTEMPTS}): {e}")
-                if status_code == 429:
-                    logging.warning(f"Rate limit hit. Retrying in {DEFAULT_RETRY_DEALY_SECONDS * (attempt + 1)} seconds...")
-                    time.sleep(DEFAULT_RETRY_DEALY_SECONDS * (attempt + 1))
-                elif status_code == 400:
-                    logging.critical(f"Bad Request error (status code 400). Check API key, CX ID, or query: {e}. Exiting.")
-                    return []
-                elif status_code == 403:
-                    logging.critical(f"Forbidden error (status code 403). Check API key permissions or daily limits: {e}. Exiting.")
-                    return []
-                else:
-                    time.sleep(DEFAULT_RETRY_DEALY_SECONDS)
-            except requests.exceptions.RequestException as e:
-                logging.error(f"An unexpected request error occurred (attempt {attempt + 1}/{DEFAULT_RETRY_ATTEMPTS}): {e}. Retrying...")
-                time.sleep(DEFAULT_RETRY_DEALY_SECONDS)
-            except ValueError as e:
-                logging.error(f"Error parsing JSON response: {e}. Response content: {response.text}")
-                break
+        Args:
+            max_requests: The number of API requests allowed. None disables the limit.
+        """
+        self.max_requests = max_requests
+        self.used = 0
+    
+    def try_spend(self) -> bool:
+        """
+        Records one API request, or returns False without recording it when the quota is used up.
+        """
+        if self.max_requests is not None and self.used >= self.max_requests:
+            return False
+        self.used += 1
+        return True
 
+async def _fetch_search_page_async(client: httpx.AsyncClient, secrets: VarSettings, query: str, start_index: int, budget: SearchBudget) -> Optional[List[str]]:
+    """
+    Fetches one page of Custom Search results without blocking the event loop.
+    
+    Every attempt, retries included, is paid from the budget.
+    
+    Args:
+        client: The pooled HTTP client.
+        secrets: The API key and search engine ID.
+        query: The search query string.
+        start_index: The 1-based rank of the first result of the page.
+        budget: The request budget of the current user message.
+        
+    Returns:
+        The result links of the page, or None if the page could not be fetched.
+    """
+    params = {
+        'q': query,
+        'key': secrets.search_key,
+        'cx': secrets.search_id,
+        'start': start_index,
+        'num': DEFAULT_MAX_RESULTS_PER_PAGE
+    }
+    
+    for attempt in range(DEFAULT_RETRY_ATTEMPTS):
+        if not budget.try_spend():
+            logging.warning(f"Search budget of {budget.max_requests} requests used up. Skipping '{query}' start_index={start_index}.")
+            return None
+        
+        delay = DEFAULT_RETRY_DEALY_SECONDS
+        try:
+            response = await client.get(Search_API_URL, params=params, timeout=DEFAULT_SEARCH_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            logging.error(f"HTTP error {status_code} for '{query}' (attempt {attempt + 1}/{DEFAULT_RETRY_ATTEMPTS}): {e}")
+            if status_code in (400, 403):
+                logging.critical(f"Search request rejected with status code {status_code}. Check API key, CX ID, daily limits or query.")
+                return None
+            if status_code == 429:
+                delay = DEFAULT_RETRY_DEALY_SECONDS * (attempt + 1)
+        except (httpx.HTTPError, ValueError) as e:
+            logging.error(f"Search request for '{query}' failed (attempt {attempt + 1}/{DEFAULT_RETRY_ATTEMPTS}): {e}")
         else:
-            logging.error(f"All {DEFAULT_RETRY_ATTEMPTS} attempts failed for start_index={start_index}. Skipping this page.")
-            break
-
-        start_index += DEFAULT_MAX_RESULTS_PER_PAGE
+            if 'error' in data:
+                logging.error(f"API Error: {data['error'].get('message', 'Unknown error')}")
+            return [item['link'] for item in data.get('items', []) if 'link' in item]
+        
+        if attempt + 1 < DEFAULT_RETRY_ATTEMPTS:
+            await asyncio.sleep(delay)
+    
+    logging.error(f"All {DEFAULT_RETRY_ATTEMPTS} attempts failed for '{query}' start_index={start_index}.")
+    return None
 
-    logging.info(f"Finished search. Total results fetched: {len(all_results)}")
-    return all_links
-            
\ No newline at end of file
+async def search_many(
+    queries: List[str],
+    results_per_query: int = DEFAULT_TOTAL_RESULTS_TO_FETCH,
+    budget: Optional[SearchBudget] = None,
+) -> List[str]:
+    """
+    Searches several queries at once and merges their links.
+    
+    Queries with a fresh search cache entry holding at least
+    `results_per_query` results are not sent again. For the
+    others, every result page is requested concurrently over the pooled HTTP
+    client; the budget is spent on the first page of every query before any
+    later page. The links are interleaved by rank across queries, so each
+    query's best results come first, and deduplicated by canonical URL.
+    
+    Args:
+        queries: The search queries, most important first.
+        results_per_query: The number of results fetched per query.
+        budget: The request budget of the current user message. None disables the limit.
+        
+    Returns:
+        The merged list of unique links.
+    """
+    budget = budget or SearchBudget(None)
+    cache = get_search_cache()
+    
+    keys: Dict[str, str] = {}
+    for query in queries:
+        if query and isinstance(query, str) and normalize_query(query):
+            keys.setdefault(normalize_query(query), query)
+    
+    results: Dict[str, List[str]] = {}
+    pending: List[Tuple[str, str]] = []
+    cached = await asyncio.to_thread(cache.get_many, list(keys))
+    for key, query in keys.items():
+        entry = json.loads(cached[key]) if key in cached else None
+        # An entry fetched for fewer results than requested is a miss.
+        if isinstance(entry, dict) and entry['results_per_query'] >= results_per_query:
+            logging.info(f"Search cache hit for query: '{query}'")
+            results[key] = entry['links'][:results_per_query]
+        else:
+            pending.append((key, query))
+    
+    if pending:
+        secrets = VarSettings()
+        client = get_http_client()
+        page_count = math.ceil(results_per_query / DEFAULT_MAX_RESULTS_PER_PAGE)
+        plan = [
+            (key, query, 1 + page * DEFAULT_MAX_RESULTS_PER_PAGE)
+            for page in range(page_count)
+            for key, query in pending
+        ]
+        pages = await asyncio.gather(*(
+            _fetch_search_page_async(client, secrets, query, start_index, budget)
+            for _, query, start_index in plan
+        ))
+        
+        fetched: Dict[str, List[Optional[List[str]]]] = {key: [] for key, _ in pending}
+        for (key, _, _), page in zip(plan, pages):
+            fetched[key].append(page)
+        complete = []
+        for key, key_pages in fetched.items():
+            links = [link for page in key_pages if page for link in page]
+            # Only complete result lists are cached, so a budget cut does not stick for a whole day.
+            if links and all(page is not None for page in key_pages):
+                entry = {'results_per_query': results_per_query, 'links': links}
+                complete.append((key, json.dumps(entry).encode('utf-8')))
+            results[key] = links[:results_per_query]
+        await asyncio.to_thread(cache.set_many, complete)
+    
+    ranked = [results.get(key, []) for key in keys]
+    merged: List[str] = []
+    seen = set()
+    for rank in range(max((len(links) for links in ranked), default=0)):
+        for links in ranked:
+            if rank < len(links):
+                canonical = canonicalize_url(links[rank])
+                if canonical not in seen:
+                    seen.add(canonical)
+                    merged.append(links[rank])
+    
+    total = sum(len(links) for links in ranked)
+    logging.info(f"Searched {len(keys)} queries ({len(pending)} uncached, {budget.used} requests): {len(merged)} unique of {total} links.")
+    return merged
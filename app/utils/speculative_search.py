@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .scrape.async_scraper import DEFAULT_MAX_PAGE_BYTES, scrape_document
+from .search_web import SearchBudget, canonicalize_url, search_many
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/speculative_search.log'
+)
+
+DEFAULT_SPECULATIVE_PAGES = 6
+DEFAULT_SPECULATIVE_CONCURRENCY = 6
+
+class SpeculativeSettings(BaseSettings):
+    """
+    Settings for searching the raw question while the tool is still being chosen.
+    """
+    speculative_search_enabled: bool = Field(True, description="Search and prefetch pages for the raw question while query expansion runs")
+    speculative_max_pages: int = Field(DEFAULT_SPECULATIVE_PAGES, description="Top search results prefetched speculatively")
+    speculative_max_concurrency: int = Field(DEFAULT_SPECULATIVE_CONCURRENCY, description="Speculative page downloads in flight at once")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+class SpeculativeSearch:
+    """
+    Searches the web for the user's raw question and prefetches the top
+    pages in the background, before the expanded search queries are known.
+
+    It is started once a web search was chosen and no cached answer was
+    found, so the search and downloads overlap with the query expansion LLM
+    call. Its results stand in for a search of the raw question, so
+    `with_results` adds them to those of the expanded queries without
+    paying for that search twice. Once the expanded query's results are
+    known, `take` hands
+    over the fetches of pages that are also among them, so
+    `scrape_web_stream` awaits those instead of downloading them again, and
+    cancels the rest. When no search is needed after all, `cancel` stops
+    everything still in flight, such as when the local index already
+    answers the question. Pages that were downloaded stay in the page
+    cache either way.
+    """
+
+    def __init__(
+        self,
+        question: str,
+        max_pages: int = DEFAULT_SPECULATIVE_PAGES,
+        max_concurrency: int = DEFAULT_SPECULATIVE_CONCURRENCY,
+        budget: Optional[SearchBudget] = None,
+        hedge_after: Optional[float] = None,
+        max_bytes: Optional[int] = DEFAULT_MAX_PAGE_BYTES,
+    ):
+        """
+        Initializes the SpeculativeSearch and starts it. Must be called inside the running event loop.
+
+        Args:
+            question (str): The raw user question to search for.
+            max_pages (int): The number of top results to prefetch.
+            max_concurrency (int): The maximum number of pages downloaded at once.
+            budget (Optional[SearchBudget]): The search request budget of the user message.
+            hedge_after (Optional[float]): Seconds after which a pending download is duplicated.
+            max_bytes (Optional[int]): The largest page body downloaded. None disables the limit.
+        """
+        self.question = question
+        self.max_pages = max_pages
+        self.budget = budget
+        self.hedge_after = hedge_after
+        self.max_bytes = max_bytes
+        self.urls: List[str] = []
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._fetches: Dict[str, asyncio.Task] = {}
+        self._search_task = asyncio.create_task(self._search())
+
+    async def _search(self) -> List[str]:
+        try:
+            urls = await search_many([self.question], budget=self.budget)
+        except Exception as e:
+            logging.error(f"Speculative search for '{self.question[:80]}' failed: {e}")
+            return []
+        self.urls = urls
+        for url in urls[:self.max_pages]:
+            self._fetches[url] = asyncio.create_task(self._fetch(url))
+        logging.info(f"Prefetching {len(self._fetches)} pages for '{self.question[:80]}'")
+        return urls
+
+    async def _fetch(self, url: str) -> Optional[Dict[str, Any]]:
+        async with self._semaphore:
+            return await scrape_document(url, self.hedge_after, self.max_bytes)
+
+    def with_results(self, urls: List[str]) -> List[str]:
+        """
+        Appends the speculative search results that are not among `urls` yet.
+
+        A search that has not returned yet adds nothing, since the caller
+        does not wait for it.
+
+        Args:
+            urls (List[str]): The merged results of the expanded search queries.
+
+        Returns:
+            List[str]: `urls` followed by the other results for the raw question.
+        """
+        seen = {canonicalize_url(url) for url in urls}
+        extra = [url for url in self.urls if canonicalize_url(url) not in seen]
+        return urls + extra
+
+    def take(self, urls: List[str]) -> Dict[str, asyncio.Task]:
+        """
+        Hands over the prefetches of the given URLs and cancels all others.
+
+        A search that has not returned yet is abandoned, since waiting for it
+        would only delay the caller's own search.
+
+        Args:
+            urls (List[str]): The URLs the caller is about to scrape.
+
+        Returns:
+            Dict[str, asyncio.Task]: The running or finished fetch of each URL that was prefetched,
+                                     resolving to its document or None.
+        """
+        wanted = set(urls)
+        kept = {url: fetch for url, fetch in self._fetches.items() if url in wanted}
+        for url, fetch in self._fetches.items():
+            if url not in kept:
+                fetch.cancel()
+        self._search_task.cancel()
+        self._fetches = {}
+
+        finished = sum(fetch.done() for fetch in kept.values())
+        logging.info(f"Speculative search reused {len(kept)} of {len(urls)} pages ({finished} already fetched).")
+        return kept
+
+    def cancel(self) -> None:
+        """
+        Stops the search and every prefetch still in flight.
+        """
+        self._search_task.cancel()
+        for fetch in self._fetches.values():
+            fetch.cancel()
+        self._fetches = {}
+
+def start_speculative_search(
+    question: str,
+    budget: Optional[SearchBudget] = None,
+    hedge_after: Optional[float] = None,
+    max_bytes: Optional[int] = DEFAULT_MAX_PAGE_BYTES,
+) -> Optional[SpeculativeSearch]:
+    """
+    Starts the SpeculativeSearch configured by SpeculativeSettings, or returns None when it is disabled.
+    """
+    settings = SpeculativeSettings()
+    if not settings.speculative_search_enabled:
+        return None
+    return SpeculativeSearch(
+        question,
+        max_pages=settings.speculative_max_pages,
+        max_concurrency=settings.speculative_max_concurrency,
+        budget=budget,
+        hedge_after=hedge_after,
+        max_bytes=max_bytes,
+    )
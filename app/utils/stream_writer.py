@@ -0,0 +1,214 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/stream_writer.log'
+)
+
+DEFAULT_FLUSH_INTERVAL_SECONDS = 0.05
+DEFAULT_FLUSH_BYTES = 512
+DEFAULT_MAX_BUFFER_BYTES = 256 * 1024
+DEFAULT_SEND_TIMEOUT_SECONDS = 30.0
+
+class StreamSettings(BaseSettings):
+    """
+    Settings for how streamed answers are batched into websocket frames.
+    """
+    stream_flush_interval_seconds: float = Field(DEFAULT_FLUSH_INTERVAL_SECONDS, description="Longest time a token waits before it is sent")
+    stream_flush_bytes: int = Field(DEFAULT_FLUSH_BYTES, description="Buffered bytes that trigger a send right away")
+    stream_max_buffer_bytes: int = Field(DEFAULT_MAX_BUFFER_BYTES, description="Unsent bytes at which the producer waits for the client")
+    stream_send_timeout_seconds: float = Field(DEFAULT_SEND_TIMEOUT_SECONDS, description="Time a client may take to accept one frame before the connection is given up")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+class StreamWriter:
+    """
+    Streams an answer over a websocket as typed JSON frames, coalescing tokens.
+
+    Tokens are buffered and sent together as one `token` frame once
+    `flush_bytes` have accumulated or `flush_interval` seconds after the
+    first of them arrived, whichever comes first. `think`, `stream_end` and `error`
+    frames are sent in order after the tokens written before them.
+
+    Frames are sent by a background task, so the producer keeps reading
+    from the LLM while a frame is in flight, and a slow client simply
+    receives larger frames. Once `max_buffer_bytes` are waiting, `write`
+    blocks until the client catches up, and a client that does not accept
+    a frame within `send_timeout` seconds fails the stream. A send error is
+    raised from the next call on the writer.
+    """
+
+    def __init__(
+        self,
+        websocket: Any,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        flush_bytes: int = DEFAULT_FLUSH_BYTES,
+        max_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES,
+        send_timeout: Optional[float] = DEFAULT_SEND_TIMEOUT_SECONDS,
+    ):
+        """
+        Initializes the StreamWriter and starts its sender. Must be called inside the running event loop.
+
+        Args:
+            websocket: The accepted websocket, anything with an async `send_json`.
+            flush_interval (float): Seconds a token may wait in the buffer. 0 sends every write at once.
+            flush_bytes (int): Buffered bytes that are sent without waiting for the interval.
+            max_buffer_bytes (int): Unsent bytes at which `write` waits for the client.
+            send_timeout (Optional[float]): Seconds the client may take to accept one frame. None waits forever.
+        """
+        if flush_bytes < 1 or max_buffer_bytes < flush_bytes:
+            raise ValueError("flush_bytes must be at least 1 and no larger than max_buffer_bytes.")
+
+        self.websocket = websocket
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.max_buffer_bytes = max_buffer_bytes
+        self.send_timeout = send_timeout
+        self.frames_sent = 0
+
+        self._buffer: List[str] = []
+        self._buffered_bytes = 0
+        self._pending_bytes = 0
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._wake = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._error: Optional[BaseException] = None
+        self._sender = asyncio.create_task(self._send_loop())
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _seal(self) -> None:
+        """
+        Turns the buffered tokens into a queued `token` frame.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer:
+            self._queue.append({'type': 'token', 'content': ''.join(self._buffer)})
+            self._buffer = []
+            self._buffered_bytes = 0
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                self._seal()
+                while self._queue:
+                    frame = self._queue.popleft()
+                    await asyncio.wait_for(self.websocket.send_json(frame), self.send_timeout)
+                    self.frames_sent += 1
+                    if frame['type'] == 'token':
+                        self._pending_bytes -= len(frame['content'].encode('utf-8'))
+                    if self._pending_bytes < self.max_buffer_bytes:
+                        self._drained.set()
+                if not self._buffer:
+                    self._idle.set()
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                logging.warning(f"Client did not accept a frame within {self.send_timeout} seconds. Giving up the stream.")
+            self._error = e
+            self._drained.set()
+            self._idle.set()
+
+    async def write(self, text: str) -> None:
+        """
+        Buffers streamed text, waiting first if too much is still unsent.
+        """
+        self._raise_if_failed()
+        if not text:
+            return
+
+        size = len(text.encode('utf-8'))
+        self._buffer.append(text)
+        self._buffered_bytes += size
+        self._pending_bytes += size
+        self._idle.clear()
+        if self._buffered_bytes >= self.flush_bytes or self.flush_interval <= 0:
+            self._wake.set()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._wake.set)
+
+        if self._pending_bytes >= self.max_buffer_bytes:
+            self._drained.clear()
+            await self._drained.wait()
+            self._raise_if_failed()
+
+    async def send(self, frame: Dict[str, Any]) -> None:
+        """
+        Queues a typed frame after everything written so far.
+        """
+        self._raise_if_failed()
+        self._seal()
+        self._queue.append(frame)
+        self._idle.clear()
+        self._wake.set()
+
+    async def think(self, message: str) -> None:
+        """
+        Queues a `think` frame reporting progress.
+        """
+        await self.send({'type': 'think', 'message': message})
+
+    async def end(self) -> None:
+        """
+        Queues the `stream_end` frame closing an answer.
+        """
+        await self.send({'type': 'stream_end'})
+
+    async def error(self, message: str) -> None:
+        """
+        Queues an `error` frame telling the client the answer failed.
+        """
+        await self.send({'type': 'error', 'message': message})
+
+    async def drain(self) -> None:
+        """
+        Sends everything buffered right away and waits until the client has accepted it.
+        """
+        self._raise_if_failed()
+        self._seal()
+        if self._queue:
+            self._wake.set()
+        await self._idle.wait()
+        self._raise_if_failed()
+
+    async def close(self) -> None:
+        """
+        Stops the sender, dropping anything not sent yet.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+        self._sender.cancel()
+        try:
+            await self._sender
+        except asyncio.CancelledError:
+            pass
+
+def build_stream_writer(websocket: Any) -> StreamWriter:
+    """
+    Builds a StreamWriter for a websocket, configured by StreamSettings.
+    """
+    settings = StreamSettings()
+    return StreamWriter(
+        websocket,
+        flush_interval=settings.stream_flush_interval_seconds,
+        flush_bytes=settings.stream_flush_bytes,
+        max_buffer_bytes=settings.stream_max_buffer_bytes,
+        send_timeout=settings.stream_send_timeout_seconds,
+    )
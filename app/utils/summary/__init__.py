@@ -1,2 +1,4 @@
-from .gen_summary import DocSummarizer
-from .llm import LLMSummaryGenerator
\ No newline at end of file
+from .gen_summary import DocSummarizer, SummarizerSettings, build_doc_summarizer
+from .extractive import ExtractiveSummarizer
+from .llm import LLMSummaryGenerator
+from .context_packer import ContextPacker, ContextSettings, PackedContext, build_context_packer
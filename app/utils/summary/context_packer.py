@@ -0,0 +1,217 @@
+import logging
+import threading
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .extractive import split_sentences
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/context_packer.log'
+)
+
+# Ungated copy of the llama3.2 tokenizer; the meta-llama repository requires a login.
+DEFAULT_TOKENIZER_NAME = 'unsloth/Llama-3.2-1B-Instruct'
+DEFAULT_CONTEXT_TOKEN_BUDGET = 3000
+DEFAULT_MIN_TRUNCATED_TOKENS = 64
+DEFAULT_SEPARATOR = '\n\n'
+# Rough characters per token for English text, used when the tokenizer cannot be loaded.
+APPROX_CHARS_PER_TOKEN = 4
+
+class ContextSettings(BaseSettings):
+    """
+    Deployment settings for the ContextPacker.
+    """
+    context_tokenizer_name: Optional[str] = Field(DEFAULT_TOKENIZER_NAME, description="Hugging Face tokenizer of the generation model. Unset estimates tokens from characters")
+    context_token_budget: int = Field(DEFAULT_CONTEXT_TOKEN_BUDGET, description="Maximum tokens of retrieved content passed to the generation prompt")
+    context_min_truncated_tokens: int = Field(DEFAULT_MIN_TRUNCATED_TOKENS, description="Smallest leftover budget worth filling with a truncated item")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+class PackedContext(BaseModel):
+    """
+    The outcome of packing ranked items into a token budget.
+    """
+    items: List[str] = Field(..., description="The included items, in rank order; the last one may be truncated")
+    included: List[int] = Field(..., description="Input positions of the included items")
+    truncated: Optional[int] = Field(None, description="Input position of the item that was cut to fit, if any")
+    dropped: List[int] = Field(..., description="Input positions of the items left out")
+    tokens: int = Field(..., description="Tokens used by the packed context, separators included")
+
+class ContextPacker:
+    """
+    Packs ranked pieces of content into a fixed token budget.
+
+    Items are taken greedily in rank order and counted with the generation
+    model's tokenizer, so the prompt size, and with it prefill time, stays
+    bounded however many pages were scraped. When the tokenizer is not
+    available, token counts are estimated from the text length.
+    """
+
+    def __init__(
+        self,
+        tokenizer_name: Optional[str] = DEFAULT_TOKENIZER_NAME,
+        token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET,
+        min_truncated_tokens: int = DEFAULT_MIN_TRUNCATED_TOKENS,
+        separator: str = DEFAULT_SEPARATOR,
+    ):
+        """
+        Initializes the ContextPacker.
+
+        Args:
+            tokenizer_name (Optional[str]): Hugging Face name or local path of the generation model's tokenizer.
+                                            None always estimates tokens from characters.
+            token_budget (int): Maximum number of tokens in the packed context.
+            min_truncated_tokens (int): An item that does not fit is cut down to the remaining
+                                        budget only if at least this many tokens are left.
+            separator (str): The string placed between packed items.
+        """
+        if token_budget < 1:
+            raise ValueError("token_budget must be at least 1.")
+        if min_truncated_tokens < 1:
+            raise ValueError("min_truncated_tokens must be at least 1.")
+
+        self.tokenizer_name = tokenizer_name
+        self.token_budget = token_budget
+        self.min_truncated_tokens = min_truncated_tokens
+        self.separator = separator
+        self._tokenizer = None
+        self._tokenizer_loaded = tokenizer_name is None
+        self._lock = threading.Lock()
+
+    def _get_tokenizer(self):
+        """
+        Loads the tokenizer on first use. A failed load falls back to estimation for good.
+        """
+        with self._lock:
+            if not self._tokenizer_loaded:
+                try:
+                    from transformers import AutoTokenizer
+
+                    self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name)
+                    logging.info(f"ContextPacker loaded tokenizer {self.tokenizer_name}")
+                except Exception as e:
+                    logging.warning(f"Could not load tokenizer {self.tokenizer_name}, estimating token counts instead: {e}")
+                self._tokenizer_loaded = True
+        return self._tokenizer
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Returns the number of tokens in a piece of text.
+        """
+        tokenizer = self._get_tokenizer()
+        if tokenizer is None:
+            return -(-len(text) // APPROX_CHARS_PER_TOKEN)
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Cuts a piece of text down to at most `max_tokens` tokens.
+        """
+        tokenizer = self._get_tokenizer()
+        if tokenizer is None:
+            return text[:max_tokens * APPROX_CHARS_PER_TOKEN]
+        token_ids = tokenizer.encode(text, add_special_tokens=False)[:max_tokens]
+        return tokenizer.decode(token_ids)
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """
+        Splits text into consecutive chunks of at most `max_tokens` tokens,
+        breaking between sentences where possible.
+
+        Args:
+            text (str): The text to split.
+            max_tokens (int): The token budget of each chunk.
+
+        Returns:
+            List[str]: The chunks, in order; a single chunk when the text already fits.
+        """
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1.")
+        if self.count_tokens(text) <= max_tokens:
+            return [text]
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for sentence in split_sentences(text):
+            sentence_tokens = self.count_tokens(sentence)
+            while sentence_tokens > max_tokens:
+                # A single sentence longer than a chunk is cut, at a space where possible,
+                # a little before the proportional token limit.
+                cut = max(1, int(len(sentence) * max_tokens / sentence_tokens * 0.9))
+                space = sentence.rfind(' ', 0, cut)
+                cut = space if space > 0 else cut
+                if current:
+                    chunks.append(' '.join(current))
+                    current, current_tokens = [], 0
+                chunks.append(sentence[:cut])
+                sentence = sentence[cut:].strip()
+                sentence_tokens = self.count_tokens(sentence)
+            if not sentence:
+                continue
+            if current and current_tokens + sentence_tokens > max_tokens:
+                chunks.append(' '.join(current))
+                current, current_tokens = [], 0
+            current.append(sentence)
+            # Joining adds a space, which may cost a token of its own.
+            current_tokens += sentence_tokens + 1
+        if current:
+            chunks.append(' '.join(current))
+        return chunks
+
+    def pack(self, items: List[str]) -> PackedContext:
+        """
+        Packs ranked items into the token budget.
+
+        Args:
+            items (List[str]): The items to pack, best first.
+
+        Returns:
+            PackedContext: The items that fit and a record of what was cut or dropped.
+        """
+        packed: List[str] = []
+        included: List[int] = []
+        dropped: List[int] = []
+        truncated: Optional[int] = None
+        used = 0
+        separator_tokens = self.count_tokens(self.separator) if self.separator else 0
+
+        for position, item in enumerate(items):
+            cost = self.count_tokens(item) + (separator_tokens if packed else 0)
+            if used + cost <= self.token_budget:
+                packed.append(item)
+                included.append(position)
+                used += cost
+                continue
+
+            remaining = self.token_budget - used - (separator_tokens if packed else 0)
+            if truncated is None and remaining >= self.min_truncated_tokens:
+                packed.append(self.truncate(item, remaining))
+                included.append(position)
+                truncated = position
+                used = self.token_budget
+            else:
+                dropped.append(position)
+
+        if dropped or truncated is not None:
+            logging.info(
+                f"Packed {len(included)} of {len(items)} items into {used}/{self.token_budget} tokens; "
+                f"truncated: {truncated}, dropped: {dropped}"
+            )
+        return PackedContext(items=packed, included=included, truncated=truncated, dropped=dropped, tokens=used)
+
+def build_context_packer() -> ContextPacker:
+    """
+    Builds the ContextPacker configured by ContextSettings.
+    """
+    settings = ContextSettings()
+    return ContextPacker(
+        tokenizer_name=settings.context_tokenizer_name,
+        token_budget=settings.context_token_budget,
+        min_truncated_tokens=settings.context_min_truncated_tokens,
+    )
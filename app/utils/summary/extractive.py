@@ -0,0 +1,165 @@
+import logging
+import math
+import re
+from collections import Counter
+from typing import List
+
+import numpy as np
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/extractive.log'
+)
+
+DEFAULT_SUMMARY_WORDS = 300
+DEFAULT_MIN_SENTENCE_WORDS = 5
+DEFAULT_DAMPING = 0.85
+PAGERANK_ITERATIONS = 50
+PAGERANK_TOLERANCE = 1e-6
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])|\n+")
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits text into sentences at sentence-ending punctuation followed by a
+    capitalized word, and at line breaks.
+    """
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence and sentence.strip()]
+
+class ExtractiveSummarizer:
+    """
+    Selects the most central sentences of a document without calling an LLM.
+
+    Sentences are represented as TF-IDF vectors and linked by their cosine
+    similarity. Each sentence is scored with PageRank over that graph
+    (TextRank/LexRank), and the best ones are returned verbatim in their
+    original order until the word budget is spent. The output honours the
+    same "verbatim sentences only" contract as the LLM prompt by
+    construction.
+    """
+
+    def __init__(
+        self,
+        max_words: int = DEFAULT_SUMMARY_WORDS,
+        min_sentence_words: int = DEFAULT_MIN_SENTENCE_WORDS,
+        damping: float = DEFAULT_DAMPING,
+    ):
+        """
+        Initializes the ExtractiveSummarizer.
+
+        Args:
+            max_words (int): Word budget of a summary.
+            min_sentence_words (int): Sentences shorter than this are never selected,
+                                      which skips headings, captions and navigation leftovers.
+            damping (float): PageRank damping factor.
+        """
+        if max_words < 1:
+            raise ValueError("max_words must be at least 1.")
+        if not 0.0 < damping < 1.0:
+            raise ValueError("damping must be in (0, 1).")
+
+        self.max_words = max_words
+        self.min_sentence_words = min_sentence_words
+        self.damping = damping
+
+    def _sentence_vectors(self, sentences: List[str]) -> np.ndarray:
+        """
+        Returns the L2-normalized TF-IDF vectors of sentences, with IDF computed over the document.
+
+        Only words shared by two or more sentences get a column: the others
+        never contribute to a similarity, so they are only counted in the norms.
+        This keeps the matrix small for long pages.
+        """
+        term_counts = [Counter(re.findall(r"\w+", sentence.lower())) for sentence in sentences]
+        document_frequency = Counter(term for counts in term_counts for term in counts)
+        idf = {term: math.log((1 + len(sentences)) / (1 + frequency)) + 1.0 for term, frequency in document_frequency.items()}
+
+        columns = {term: column for column, term in enumerate(term for term, frequency in document_frequency.items() if frequency > 1)}
+        vectors = np.zeros((len(sentences), len(columns)), dtype=np.float32)
+        norms = np.empty(len(sentences), dtype=np.float32)
+        for row, counts in enumerate(term_counts):
+            squared = 0.0
+            for term, count in counts.items():
+                weight = count * idf[term]
+                squared += weight * weight
+                if term in columns:
+                    vectors[row, columns[term]] = weight
+            norms[row] = math.sqrt(squared)
+        return vectors / np.maximum(norms, 1e-12)[:, None]
+
+    def _centrality(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Scores sentences with PageRank over their cosine-similarity graph.
+        """
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0.0)
+        row_sums = similarity.sum(axis=1, keepdims=True)
+        # Sentences sharing no words with any other get a uniform row, so the matrix stays stochastic.
+        transition = np.where(row_sums > 0, similarity / np.maximum(row_sums, 1e-12), np.float32(1.0 / len(vectors)))
+
+        count = len(vectors)
+        scores = np.full(count, 1.0 / count, dtype=np.float32)
+        for _ in range(PAGERANK_ITERATIONS):
+            updated = (1 - self.damping) / count + self.damping * (transition.T @ scores)
+            if np.abs(updated - scores).sum() < PAGERANK_TOLERANCE:
+                return updated
+            scores = updated
+        return scores
+
+    def _first_words(self, text: str) -> str:
+        """
+        Keeps the opening `max_words` words of a text, line by line.
+        """
+        kept: List[str] = []
+        used = 0
+        for line in text.strip().splitlines():
+            words = line.split()
+            if used + len(words) > self.max_words:
+                if used < self.max_words:
+                    kept.append(' '.join(words[:self.max_words - used]))
+                break
+            kept.append(line.strip())
+            used += len(words)
+        return '\n'.join(kept)
+
+    def summarize_text(self, document_text: str) -> str:
+        """
+        Builds an extractive summary of a document.
+
+        Text without any sentence worth selecting, such as a table or a list,
+        and a single sentence longer than the budget are cut to their first
+        `max_words` words, so a summary never exceeds the budget.
+
+        Args:
+            document_text (str): The full text of the document.
+
+        Returns:
+            str: The selected sentences, verbatim and in document order, one per line.
+        """
+        sentences = [
+            sentence for sentence in split_sentences(document_text)
+            if len(sentence.split()) >= self.min_sentence_words
+        ]
+        if not sentences:
+            return self._first_words(document_text)
+
+        word_counts = np.array([len(sentence.split()) for sentence in sentences])
+        if word_counts.sum() <= self.max_words:
+            return '\n'.join(sentences)
+
+        scores = self._centrality(self._sentence_vectors(sentences))
+        selected: List[int] = []
+        used = 0
+        for index in np.argsort(-scores, kind='stable'):
+            if used + word_counts[index] > self.max_words:
+                if selected:
+                    continue
+            selected.append(int(index))
+            used += int(word_counts[index])
+            if used >= self.max_words:
+                break
+
+        logging.info(f"Selected {len(selected)} of {len(sentences)} sentences ({used} words).")
+        return self._first_words('\n'.join(sentences[index] for index in sorted(selected)))
@@ -1,6 +1,17 @@
-import logging
 import asyncio
+import hashlib
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
+
 import ollama
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from ..cache import DEFAULT_CACHE_DIR, SQLiteCache
+from ..concurrency import bounded_map
+from ..llm_client import get_llm_client
+from .context_packer import ContextPacker
+from .extractive import DEFAULT_SUMMARY_WORDS, ExtractiveSummarizer
 
 logging.basicConfig(
     level=logging.INFO,
@@ -9,13 +20,101 @@ logging.basicConfig(
     filename='logs/gen_summary.log'
 )
 
+DEFAULT_MAX_CONCURRENT_SUMMARIES = 4
+DEFAULT_SUMMARY_TIMEOUT_SECONDS = 120.0
+DEFAULT_SUMMARY_DEADLINE_SECONDS = 180.0
+# Bump whenever the summarization prompt or messages change, so cached summaries made with the old prompt are not reused.
+SUMMARY_PROMPT_VERSION = 2
+SUMMARY_ENGINES = ('llm', 'extractive', 'auto')
+# DocReranker hands over at most `rerank_top_passages` x `rerank_passage_words` (4 x 128) words per document,
+# so 'auto' sends documents condensed to several passages to the extractive engine and short pages to the LLM.
+DEFAULT_AUTO_EXTRACTIVE_WORDS = 400
+# Tokens of document text per LLM call; the prompt around it takes about 500 more of the 8192-token context.
+DEFAULT_MAX_INPUT_TOKENS = 6000
+# Tokens per chunk of a document that does not fit in one call.
+DEFAULT_CHUNK_TOKENS = 1500
+DEFAULT_MAX_CONCURRENT_CHUNKS = 4
+MAX_MAP_REDUCE_DEPTH = 3
+
+# Identical for every call, so Ollama reuses its evaluated tokens; the document follows in the user message.
+EXTRACTIVE_SYSTEM_PROMPT = """
+You are an **expert extractive summarizer** with a critical mission: to identify and present the most significant and informative sentences **directly from the provided text**, ensuring no essential information for subsequent summarization stages is lost.
+
+**ABSOLUTELY CRITICAL RULE: DO NOT REPHRASE, PARAPHRASE, OR INTRODUCE ANY NEW INFORMATION. EVERY SINGLE WORD IN YOUR SUMMARY MUST BE AN EXACT, UNALTERED QUOTE FROM THE ORIGINAL DOCUMENT.**
+
+Your selection process should prioritize sentences that:
+* Clearly articulate **core concepts and central themes**.
+* Contain **key arguments and supporting evidence**.
+* Provide **critical details, facts, figures, or definitions**.
+* Represent **important conclusions or outcomes**.
+
+The goal is a summary that is as **concise as possible** while **retaining all essential, valuable information** needed for a comprehensive understanding of the original document. Focus intensely on **factual accuracy and the completeness of extracted facts**.
+
+Your output must consist solely of verbatim sentences from the original document, carefully selected for maximum information density and coverage. Do not add your own language in the response, strictly respond with the summary only.
+""".strip()
+
+class SummarizerSettings(BaseSettings):
+    """
+    Deployment settings for DocSummarizer.
+    """
+    summary_engine: str = Field('llm', description="'llm', 'extractive', or 'auto' to use the extractive engine for long documents")
+    summary_auto_extractive_words: int = Field(DEFAULT_AUTO_EXTRACTIVE_WORDS, description="Document length in words from which 'auto' picks the extractive engine")
+    summary_extractive_max_words: int = Field(DEFAULT_SUMMARY_WORDS, description="Word budget of an extractive summary")
+    summary_max_concurrency: int = Field(DEFAULT_MAX_CONCURRENT_SUMMARIES, description="Documents summarized at once for one answer")
+    summary_timeout_seconds: Optional[float] = Field(DEFAULT_SUMMARY_TIMEOUT_SECONDS, description="Time one document may take to summarize before it is skipped. Unset disables it")
+    summary_deadline_seconds: Optional[float] = Field(DEFAULT_SUMMARY_DEADLINE_SECONDS, description="Time budget for summarizing all documents of one answer. Unset disables it")
+    summary_max_input_tokens: int = Field(DEFAULT_MAX_INPUT_TOKENS, description="Tokens of document text per LLM summarization call; longer documents are map-reduced")
+    summary_chunk_tokens: int = Field(DEFAULT_CHUNK_TOKENS, description="Tokens per chunk of a map-reduced document")
+    summary_max_concurrent_chunks: int = Field(DEFAULT_MAX_CONCURRENT_CHUNKS, description="Chunks of one document summarized at once")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+class SummaryCacheSettings(BaseSettings):
+    """
+    Settings for the local cache of per-document summaries.
+    """
+    summary_cache_path: str = Field(f"{DEFAULT_CACHE_DIR}/summaries.db", description="SQLite file holding cached summaries")
+    summary_cache_ttl_seconds: Optional[float] = Field(None, description="How long cached summaries stay valid. Unset keeps them until evicted")
+    summary_cache_max_bytes: int = Field(256 * 1024 * 1024, description="Maximum total size of cached summaries")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+_summary_cache: Optional[SQLiteCache] = None
+
+def get_summary_cache() -> SQLiteCache:
+    """
+    Returns the shared summary cache, opening it on first use.
+    """
+    global _summary_cache
+    if _summary_cache is None:
+        settings = SummaryCacheSettings()
+        _summary_cache = SQLiteCache(
+            path=settings.summary_cache_path,
+            table='summaries',
+            ttl_seconds=settings.summary_cache_ttl_seconds,
+            max_bytes=settings.summary_cache_max_bytes,
+        )
+    return _summary_cache
+
 class DocSummarizer:
     """
     A class for generating extractive summaries of documents using an Ollama-compatible LLM.
     Exnsures strict adherence to extracting verbatim sentences form the input document.
     """
     
-    def __init__(self, model_name: str = 'llama3.2', temperature: float = 0.1):
+    def __init__(
+        self,
+        model_name: str = 'llama3.2',
+        temperature: float = 0.1,
+        use_cache: bool = True,
+        engine: str = 'llm',
+        auto_extractive_words: int = DEFAULT_AUTO_EXTRACTIVE_WORDS,
+        extractive_max_words: int = DEFAULT_SUMMARY_WORDS,
+        max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
+        chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        max_concurrent_chunks: int = DEFAULT_MAX_CONCURRENT_CHUNKS,
+        token_counter: Optional[ContextPacker] = None,
+    ):
         """
         Initializes the DocumentSummarizer with a specified LLM model and temperature.
 
@@ -24,20 +123,66 @@ class DocSummarizer:
                               Defaults to 'llama3.2'.
             temperature (float): The sampling temperature for the LLM. Lower values (e.g., 0.1)
                                  make the output more deterministic. Defaults to 0.1.
+            use_cache (bool): Whether to reuse summaries of identical text from the summary cache.
+                              Defaults to True.
+            engine (str): 'llm' prompts the model, 'extractive' selects central sentences with
+                          ExtractiveSummarizer, and 'auto' uses the extractive engine for documents
+                          of at least `auto_extractive_words` words. Defaults to 'llm'.
+            auto_extractive_words (int): Length in words from which 'auto' picks the extractive engine.
+            extractive_max_words (int): Word budget of an extractive summary.
+            max_input_tokens (int): Tokens of document text per LLM call. Longer documents are
+                                    split into chunks of `chunk_tokens` tokens that are summarized
+                                    concurrently, and the joined chunk summaries are summarized again
+                                    until they fit in one call.
+            chunk_tokens (int): Tokens per chunk of a map-reduced document.
+            max_concurrent_chunks (int): Chunks of one document summarized at once.
+            token_counter (Optional[ContextPacker]): Counts and splits tokens, usually the packer of the
+                                                     generation prompt. None estimates tokens from characters.
         """
+        if chunk_tokens < 1 or max_input_tokens < chunk_tokens:
+            raise ValueError("chunk_tokens must be between 1 and max_input_tokens.")
         if not model_name:
             raise ValueError("Model name cannot be empty.")
         if not isinstance(temperature, (int, float)) or not (0.0 <= temperature <= 1.0):
             raise ValueError("Temperature must be a float between 0.0 and 1.0.")
+        if engine not in SUMMARY_ENGINES:
+            raise ValueError(f"Engine must be one of {SUMMARY_ENGINES}.")
 
         self.model_name = model_name
         self.temperature = temperature
-        logging.info(f"DocumentSummarizer initialized with model: {self.model_name}, temperature: {self.temperature}")
+        self.use_cache = use_cache
+        self.engine = engine
+        self.auto_extractive_words = auto_extractive_words
+        self.extractive = ExtractiveSummarizer(max_words=extractive_max_words)
+        self.max_input_tokens = max_input_tokens
+        self.chunk_tokens = chunk_tokens
+        self.max_concurrent_chunks = max_concurrent_chunks
+        self.token_counter = token_counter or ContextPacker(tokenizer_name=None)
+        logging.info(f"DocumentSummarizer initialized with model: {self.model_name}, temperature: {self.temperature}, engine: {self.engine}")
         
+    def uses_extractive(self, document_text: str) -> bool:
+        """
+        Returns whether a document is summarized by the extractive engine rather than the LLM.
+        """
+        if self.engine == 'auto':
+            return len(document_text.split()) >= self.auto_extractive_words
+        return self.engine == 'extractive'
+
+    def _cache_key(self, document_text: str) -> str:
+        """
+        Builds the summary cache key of a document: its text hash together with
+        everything else that shapes the summary.
+        """
+        text_hash = hashlib.blake2b(document_text.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{self.model_name}:{self.temperature}:v{SUMMARY_PROMPT_VERSION}:t{self.max_input_tokens}:c{self.chunk_tokens}:{text_hash}"
+
     def _construct_prompt(self, document_text: str) -> str:
         """
         Constructs the user prompt for the extractive summarization task.
         
+        The instructions live in EXTRACTIVE_SYSTEM_PROMPT, so the prompt only
+        carries the document and every call shares the same prefix.
+
         Args:
             document_text(str): The full text of the document to be summarized.
             
@@ -48,25 +193,7 @@ class DocSummarizer:
         if not isinstance(document_text, str) or not document_text.strip():
             raise ValueError("Document text must be a non-empty string.")
 
-        prompt = f"""
-            You are an **expert extractive summarizer** with a critical mission: to identify and present the most significant and informative sentences **directly from the provided text**.
-
-            **ABSOLUTELY CRITICAL RULE: DO NOT REPHRASE, PARAPHRASE, OR INTRODUCE ANY NEW INFORMATION. EVERY SINGLE WORD IN YOUR SUMMARY MUST BE AN EXACT, UNALTERED QUOTE FROM THE ORIGINAL DOCUMENT.**
-
-            Your selection process should prioritize sentences that:
-            * Clearly articulate **core concepts and central themes**.
-            * Contain **key arguments and supporting evidence**.
-            * Provide **critical details, facts, figures, or definitions**.
-            * Represent **important conclusions or outcomes**.
-
-            The goal is a summary that is as **concise as possible** while **retaining all essential, valuable information** needed for a comprehensive understanding of the original document. Focus intensely on **factual accuracy and the completeness of extracted facts**.
-
-            Document:
-            {document_text}
-
-            Extractive Summary:
-        """
-        return prompt.strip()
+        return f"Document:\n{document_text.strip()}\n\nExtractive Summary:"
 
     async def summarize(self, document_text: str) -> str:
         """
@@ -87,25 +214,78 @@ class DocSummarizer:
             logging.error("Attempted to summarize with empty or invalid document_text.")
             raise ValueError("Document text cannot be empty or null.")
 
+        if self.uses_extractive(document_text):
+            return await asyncio.to_thread(self.extractive.summarize_text, document_text)
+
+        cache = get_summary_cache() if self.use_cache else None
+        cache_key = self._cache_key(document_text)
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                logging.info("Summary served from cache.")
+                return cached.decode('utf-8')
+
+        summary_content = await self._map_reduce(document_text)
+        if summary_content and cache is not None:
+            await asyncio.to_thread(cache.set, cache_key, summary_content.encode('utf-8'))
+        return summary_content
+
+    def _fits(self, text: str) -> bool:
+        # A token spans at least one character, so shorter texts fit without counting.
+        return len(text) <= self.max_input_tokens or self.token_counter.count_tokens(text) <= self.max_input_tokens
+
+    def _merge_chunks(self, chunks: List[str]) -> str:
+        """
+        Cuts every chunk to an equal share of one call and joins them in order.
+        """
+        share = max(1, self.max_input_tokens // len(chunks) - 1)
+        return '\n'.join(self.token_counter.truncate(chunk, share) for chunk in chunks)
+
+    async def _map_reduce(self, text: str, depth: int = 0) -> str:
+        """
+        Summarizes text that may not fit in one LLM call.
+
+        The text is split into chunks of at most `chunk_tokens` tokens, the
+        chunks are summarized concurrently, and their summaries, joined in
+        order, are summarized the same way until they fit in a single call.
+        If they still do not fit after MAX_MAP_REDUCE_DEPTH levels, every
+        chunk is cut to an equal share of one call and they are merged in a
+        final call, so the end of the document is never dropped.
+        """
+        if await asyncio.to_thread(self._fits, text):
+            return await self._summarize_with_llm(text)
+
+        chunks = await asyncio.to_thread(self.token_counter.split, text, self.chunk_tokens)
+        if depth >= MAX_MAP_REDUCE_DEPTH:
+            logging.warning(f"Summaries still span {len(chunks)} chunks after {depth} merge levels; merging an equal share of each.")
+            return await self._summarize_with_llm(await asyncio.to_thread(self._merge_chunks, chunks))
+
+        partials = {}
+        async for index, partial in bounded_map(self._summarize_with_llm, chunks, max_concurrency=self.max_concurrent_chunks):
+            if partial:
+                partials[index] = partial
+        if not partials:
+            raise RuntimeError(f"None of the {len(chunks)} chunks of the document could be summarized.")
+
+        merged = '\n'.join(partials[index] for index in sorted(partials))
+        logging.info(f"Map-reduce level {depth}: summarized {len(partials)} of {len(chunks)} chunks into {len(merged.split())} words.")
+        return await self._map_reduce(merged, depth + 1)
+
+    async def _summarize_with_llm(self, document_text: str) -> str:
+        """
+        Summarizes text that fits in a single LLM call.
+        """
         user_prompt = self._construct_prompt(document_text)
         
         messages = [
-            {'role': 'system',
-             'content': """
-                You are a highly skilled extractive summarizer. Your goal is to identify
-                and present the most critical sentences from a given text, ensuring no essential
-                information for subsequent summarization stages is lost. Your output must consist
-                solely of verbatim sentences from the original document, carefully selected
-                for maximum information density and coverage. STRICT ADHERENCE TO ORIGINAL WORDING IS PARAMOUNT.
-                Do not add your own language in the response, strictly respond with the summary only.
-                """},
+            {'role': 'system', 'content': EXTRACTIVE_SYSTEM_PROMPT},
             {'role': 'user', 'content': user_prompt}
         ]
         
         try:
             logging.info(f"Attempting to generate summary using model: {self.model_name}")
-            response = ollama.chat(
-                model='llama3.2',
+            response = await get_llm_client().chat(
+                model=self.model_name,
                 messages=messages,
                 options={'temperature': self.temperature}
             )
@@ -128,4 +308,50 @@ class DocSummarizer:
             raise RuntimeError(f"Ollama API communication error: {e}")
         except Exception as e:
             logging.exception(f"An unexpected error occurred during summarization: {e}")
-            raise RuntimeError(f"An unexpected error occurred: {e}")
\ No newline at end of file
+            raise RuntimeError(f"An unexpected error occurred: {e}")
+
+    async def summarize_many(
+        self,
+        documents: List[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENT_SUMMARIES,
+        timeout: Optional[float] = DEFAULT_SUMMARY_TIMEOUT_SECONDS,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Summarizes several documents concurrently, yielding each summary as soon as it is ready.
+
+        Documents that fail or time out are skipped, so the caller gets whatever
+        partial results are available and the total time follows the slowest
+        document instead of the sum of all of them. Documents still pending at
+        `deadline` are cancelled.
+
+        Args:
+            documents (List[str]): The document texts to summarize.
+            max_concurrency (int): The maximum number of summaries in flight at once.
+            timeout (Optional[float]): Per-document timeout in seconds. None disables it.
+            deadline (Optional[float]): Time budget in seconds for all documents. None disables it.
+
+        Yields:
+            Tuple[int, str]: The index of the document in `documents` and its summary.
+        """
+        async for index, summary_content in bounded_map(
+            self.summarize, documents, max_concurrency=max_concurrency, timeout=timeout, deadline=deadline
+        ):
+            if summary_content:
+                yield index, summary_content
+
+def build_doc_summarizer(token_counter: Optional[ContextPacker] = None) -> DocSummarizer:
+    """
+    Builds the DocSummarizer configured by SummarizerSettings, measuring
+    and splitting documents with `token_counter` when one is given.
+    """
+    settings = SummarizerSettings()
+    return DocSummarizer(
+        engine=settings.summary_engine,
+        auto_extractive_words=settings.summary_auto_extractive_words,
+        extractive_max_words=settings.summary_extractive_max_words,
+        max_input_tokens=settings.summary_max_input_tokens,
+        chunk_tokens=settings.summary_chunk_tokens,
+        max_concurrent_chunks=settings.summary_max_concurrent_chunks,
+        token_counter=token_counter,
+    )
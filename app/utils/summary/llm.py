@@ -3,6 +3,8 @@ import logging
 
 import ollama
 
+from ..llm_client import get_llm_client
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -10,6 +12,7 @@ logging.basicConfig(
     filename='logs/llm.log'
 )
 
+# Sent as the system message of every call so Ollama reuses its evaluated tokens; the context follows in the user message.
 SUMMARY_PROMPT = """
 **Do not mention or refer to the 'document,' 'text,' 'source,' or any similar term that indicates the information came from a provided source.**
 "Please generate a comprehensive and meticulously structured summary from the provided text. Your summary should not only capture the essence of the content but also provide insightful details, demonstrating a deep understanding. **Do not refer to the original source text (e.g., avoid phrases like 'according to the document,' 'from the text provided,' 'the document states,' or 'this document covers'). Present the information as if it is a standalone piece.** Adhere strictly to the following hierarchical structure and guidelines:
@@ -44,10 +47,10 @@ SUMMARY_PROMPT = """
 * **Adherence to Original Intent:** Your summary must accurately reflect the original content's arguments, emphasis, and perspective without introducing external interpretations or biases.
 * **Crucially, do not mention or refer to the 'document,' 'text,' 'source,' or any similar term that indicates the information came from a provided source. Write as if the summary itself is the primary source of the information.**"
 ---
+""".strip()
 
-**Text to Process:**
-'{context}'
-"""
+CONTEXT_TEMPLATE = """**Text to Process:**
+'{context}'"""
 
 class LLMSummaryGenerator:
     """
@@ -88,21 +91,22 @@ class LLMSummaryGenerator:
             RuntimeError: If there's an issue communicating with the LLM or parsing its response.
         """
 
-        prompt_message = SUMMARY_PROMPT.format(context=context)
+        prompt_message = CONTEXT_TEMPLATE.format(context=context)
         full_response_content = ""
         
         try:
             logging.info(f"Attempting to generate summary using model: {self.model_name}")
-            response_structured = ollama.chat(
+            response_structured = await get_llm_client().chat(
                 model=self.model_name,
                 messages=[
+                    {'role': 'system', 'content': SUMMARY_PROMPT},
                     {'role': 'user', 'content': prompt_message}
                 ],
                 options={'temperature': self.temperature},
                 stream=True
             )
             
-            for chunks in response_structured:
+            async for chunks in response_structured:
                 if 'message' in chunks and 'content' in chunks['message']:
                     partial_content = chunks['message']['content']
                     if partial_content:
@@ -0,0 +1,245 @@
+import logging
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .embedder import Embedder
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    filename='logs/tool_router.log'
+)
+
+WEB_SEARCH_TOOL = 'gen_query'
+DIRECT_TOOL = 'respond_directly'
+DEFAULT_MIN_MARGIN = 0.06
+DEFAULT_NEIGHBORS = 3
+
+# Example messages per tool. A message is routed to the tool whose examples it resembles most.
+DEFAULT_EXEMPLARS: Dict[str, List[str]] = {
+    WEB_SEARCH_TOOL: [
+        "What is the population of Brazil?",
+        "Who is the current CEO of Microsoft?",
+        "When was the Eiffel Tower built?",
+        "What are the side effects of ibuprofen?",
+        "How tall is Mount Kilimanjaro?",
+        "Who won the last football world cup?",
+        "What is the capital of Australia?",
+        "How does the new iPhone compare to the previous model?",
+        "What are the best restaurants in Lisbon?",
+        "Which countries border Switzerland?",
+        "What is the history of the Roman Empire?",
+        "How much does a Tesla Model 3 cost?",
+        "What did the central bank announce about interest rates?",
+        "Tell me about the James Webb Space Telescope discoveries.",
+        "What are the symptoms of vitamin D deficiency?",
+        "Who wrote the novel One Hundred Years of Solitude?",
+        "How do I renew my passport in the UK?",
+        "What is quantum computing and who is building quantum computers?",
+        "What are the opening hours of the Louvre?",
+        "Explain the causes of the 2008 financial crisis.",
+        "What is the difference between Python 3.11 and 3.12?",
+        "How many people live in Tokyo?",
+        "What are the rules of cricket?",
+        "Give me information about the Amazon rainforest.",
+    ],
+    DIRECT_TOOL: [
+        "Hello, how are you?",
+        "Thanks, that was helpful!",
+        "Who are you?",
+        "What can you do?",
+        "Write a short poem about autumn.",
+        "Tell me a joke.",
+        "Can you rephrase your last answer more simply?",
+        "Summarize our conversation so far.",
+        "Translate 'good morning' into Spanish.",
+        "What did you mean by that?",
+        "Make it shorter.",
+        "Can you explain the previous answer in more detail?",
+        "Write a Python function that reverses a string.",
+        "Fix the grammar in this sentence: he go to school yesterday.",
+        "What is 17 times 23?",
+        "Give me a list of ideas for a birthday party.",
+        "Help me write an email to my manager asking for a day off.",
+        "Convert this list into a table.",
+        "Continue the story.",
+        "Why did you say that?",
+        "Pretend you are a pirate and greet me.",
+        "Can you give me an example?",
+        "Okay, and what about the second point?",
+        "Write a haiku about coffee.",
+    ],
+}
+
+# A greeting or thanks followed only by filler words, so "hello, who won the game?" is not small talk.
+SMALL_TALK = re.compile(
+    r"^\s*(hi|hello|hey|yo|thanks|thank you|thx|ok(ay)?|cool|great|nice|bye|goodbye|good (morning|afternoon|evening|night))"
+    r"([\s,]+(there|everyone|all|again|so much|very much|a lot|you|buddy|friend|mate|bot))*[\s!.?]*$",
+    re.IGNORECASE,
+)
+CONVERSATION_TASK = re.compile(
+    r"^\s*(please\s+|can you\s+|could you\s+)?(write|rewrite|rephrase|reword|translate|proofread|shorten|expand on|continue|"
+    r"summari[sz]e (this|that|our|the above|the conversation)|explain (this|that|your)|fix (this|my|the following)|"
+    r"convert (this|that|it)|make it)\b",
+    re.IGNORECASE,
+)
+# Questions about things that change over time cannot be answered from the model's training data.
+RECENCY = re.compile(
+    r"\b(today|tonight|yesterday|tomorrow|this (week|month|year)|last (week|month|night)|latest|newest|recent(ly)?|"
+    r"current(ly)?|right now|at the moment|news|breaking|weather|forecast|score|stock price|exchange rate|"
+    r"upcoming|release date|20[2-9]\d)\b",
+    re.IGNORECASE,
+)
+EXPLICIT_SEARCH = re.compile(r"\b(search (for|the web)|look (it )?up|google|find (me )?(sources|articles|links)|on the (web|internet))\b", re.IGNORECASE)
+# Words that point back at earlier messages, so "what is his latest album?" cannot be searched as it stands.
+CONTEXT_REFERENCE = re.compile(
+    r"\b(he|she|it|its|they|them|their|him|his|her|this|that|these|those|there|the (former|latter|above|same|previous))\b",
+    re.IGNORECASE,
+)
+
+def is_standalone_search(message: str) -> bool:
+    """
+    Returns whether a message asks for a web search that does not depend on
+    earlier messages: it carries an explicit search or recency cue and no
+    word referring back to the conversation.
+    """
+    if not (EXPLICIT_SEARCH.search(message) or RECENCY.search(message)):
+        return False
+    # "this week" is a recency cue, not a reference.
+    return not CONTEXT_REFERENCE.search(RECENCY.sub(' ', message))
+
+class RouterSettings(BaseSettings):
+    """
+    Settings for the local tool router that replaces the routing LLM call.
+    """
+    tool_router_enabled: bool = Field(True, description="Pick the tool locally and only ask the LLM when unsure")
+    tool_router_min_margin: float = Field(DEFAULT_MIN_MARGIN, description="Lead in example similarity the best tool needs before the LLM is skipped. Re-measure with benchmarks/tool_router.py when changing it or the embedding model")
+    tool_router_neighbors: int = Field(DEFAULT_NEIGHBORS, description="Most similar examples averaged per tool")
+
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+class RouteDecision(BaseModel):
+    """
+    The tool picked for a message by the ToolRouter.
+    """
+    tool: str = Field(..., description="The name of the tool to call")
+    confidence: float = Field(..., description="1.0 for a keyword rule, otherwise the similarity lead over the other tool")
+    source: str = Field(..., description="'keyword' or 'embedding'")
+
+class ToolRouter:
+    """
+    Picks between web search and a direct answer without calling the LLM.
+
+    Keyword rules catch the clear cases first: small talk and requests to
+    rework the conversation are answered directly, while explicit search
+    requests and time-sensitive questions go to web search. Everything else
+    is embedded and compared with example messages of each tool; the tool
+    whose nearest examples are most similar wins if it leads by at least
+    `min_margin`. Otherwise the router abstains and the caller asks the LLM.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        exemplars: Optional[Dict[str, List[str]]] = None,
+        min_margin: float = DEFAULT_MIN_MARGIN,
+        neighbors: int = DEFAULT_NEIGHBORS,
+    ):
+        """
+        Initializes the ToolRouter and embeds the example messages.
+
+        Args:
+            embedder (Embedder): Embeds the messages.
+            exemplars (Optional[Dict[str, List[str]]]): Example messages per tool name. Defaults to DEFAULT_EXEMPLARS.
+            min_margin (float): Lead in mean example similarity the best tool needs; below it the router abstains.
+            neighbors (int): The number of most similar examples averaged per tool.
+        """
+        exemplars = exemplars or DEFAULT_EXEMPLARS
+        if len(exemplars) < 2:
+            raise ValueError("exemplars must cover at least two tools.")
+        if neighbors < 1 or any(len(examples) < neighbors for examples in exemplars.values()):
+            raise ValueError("Every tool needs at least `neighbors` examples.")
+
+        self.embedder = embedder
+        self.min_margin = min_margin
+        self.neighbors = neighbors
+        self.tools = list(exemplars)
+        self._vectors = {tool: embedder.encode(examples) for tool, examples in exemplars.items()}
+        self._lock = threading.Lock()
+        self._counts = {'keyword': 0, 'embedding': 0, 'fallback': 0}
+
+    @staticmethod
+    def _keyword_route(message: str) -> Optional[str]:
+        """
+        Applies the keyword rules, returning a tool name or None when no rule matches.
+        """
+        if SMALL_TALK.match(message) or CONVERSATION_TASK.match(message):
+            return DIRECT_TOOL
+        if EXPLICIT_SEARCH.search(message) or RECENCY.search(message):
+            return WEB_SEARCH_TOOL
+        return None
+
+    def scores(self, message: str) -> Dict[str, float]:
+        """
+        Returns, per tool, the mean cosine similarity of the message to its nearest examples.
+        """
+        embedding = self.embedder.encode([message])[0]
+        scores = {}
+        for tool, vectors in self._vectors.items():
+            similarities = vectors @ embedding
+            nearest = np.partition(similarities, len(similarities) - self.neighbors)[-self.neighbors:]
+            scores[tool] = float(nearest.mean())
+        return scores
+
+    def _count(self, source: str) -> None:
+        with self._lock:
+            self._counts[source] += 1
+
+    def route(self, message: str) -> Optional[RouteDecision]:
+        """
+        Picks the tool for a user message.
+
+        Args:
+            message (str): The latest user message.
+
+        Returns:
+            Optional[RouteDecision]: The picked tool, or None when the router is not confident
+                                     enough and the LLM should decide.
+        """
+        tool = self._keyword_route(message)
+        if tool is not None:
+            self._count('keyword')
+            return RouteDecision(tool=tool, confidence=1.0, source='keyword')
+
+        scores = self.scores(message)
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        margin = scores[ranked[0]] - scores[ranked[1]]
+        if margin < self.min_margin:
+            self._count('fallback')
+            logging.info(f"Router abstained on '{message[:80]}' (scores: {scores})")
+            return None
+
+        self._count('embedding')
+        return RouteDecision(tool=ranked[0], confidence=margin, source='embedding')
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns how many messages were routed by a keyword rule, by similarity, or left to the LLM.
+        """
+        with self._lock:
+            return dict(self._counts)
+
+def build_tool_router(embedder: Embedder) -> Optional[ToolRouter]:
+    """
+    Builds the ToolRouter configured by RouterSettings, or None when it is disabled.
+    """
+    settings = RouterSettings()
+    if not settings.tool_router_enabled:
+        return None
+    return ToolRouter(embedder, min_margin=settings.tool_router_min_margin, neighbors=settings.tool_router_neighbors)